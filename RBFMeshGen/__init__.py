@@ -1,11 +1,69 @@
+from .batch import MeshResult, generate_meshes
 from .geometry_utils import (
-    MeshPoint, Border, is_close, find_polygons
+    MeshPoint, Border, is_close, find_polygons, EndpointIndex
 )
+from .geometry_cache import GeometryCache, border_fingerprint, default_geometry_cache
 from .mesh_generation import (
     RBFMesh, exclude_nested_polygons, calculate_point_allocation,
     generate_regions, generate_points_within_polygons
 )
-from .visualization_tools import (
-    plot_each_polygon_separately, plot_all_polygons_in_one_figure, plot_points,
-    plot_borders_with_orientation, plot_mesh
+from .low_discrepancy import ScrambledHalton, ScrambledSobol
+from .mesh_io import (
+    PointFileWriter, MappedPoints, save_points, load_points, save_npz, load_npz
 )
+from .metrics import (
+    nearest_neighbour_distances, separation_distance, fill_distance, mesh_ratio, spacing_histograms, mesh_quality
+)
+from .ordering import node_order, hilbert_keys, morton_keys, rcm_order
+from .point_store import PointStore, PointView
+from .rbf_fd import (
+    rbf_fd_weights, differentiation_matrices, differentiation_matrix, interpolation_matrix, monomial_exponents
+)
+from .sampling import (
+    sample_points_in_polygon, sample_points_in_regions, iter_points_in_regions, triangulate_polygon,
+    TriangulatedRegion, poisson_disk_sample, poisson_disk_spacing, DensityEnvelope, BoundaryDistanceSpacing,
+    locate_regions, estimate_acceptance, DegenerateRegionError, DegenerateRegionWarning, sample_sequence_in_polygon
+)
+from .smoothing import repel_nodes
+from .spatial_index import GridIndex
+from .stencils import StencilBuilder, build_stencils, node_coordinates
+
+# The plotting functions are imported on first use, so that importing the package does not load matplotlib
+_VISUALIZATION_TOOLS = (
+    'plot_each_polygon_separately', 'plot_all_polygons_in_one_figure', 'plot_points',
+    'plot_borders_with_orientation', 'plot_mesh'
+)
+
+__all__ = [
+    'MeshResult', 'generate_meshes',
+    'MeshPoint', 'Border', 'is_close', 'find_polygons', 'EndpointIndex',
+    'GeometryCache', 'border_fingerprint', 'default_geometry_cache',
+    'RBFMesh', 'exclude_nested_polygons', 'calculate_point_allocation',
+    'generate_regions', 'generate_points_within_polygons',
+    'ScrambledHalton', 'ScrambledSobol',
+    'PointFileWriter', 'MappedPoints', 'save_points', 'load_points', 'save_npz', 'load_npz',
+    'nearest_neighbour_distances', 'separation_distance', 'fill_distance', 'mesh_ratio', 'spacing_histograms',
+    'mesh_quality',
+    'node_order', 'hilbert_keys', 'morton_keys', 'rcm_order',
+    'PointStore', 'PointView',
+    'rbf_fd_weights', 'differentiation_matrices', 'differentiation_matrix', 'interpolation_matrix',
+    'monomial_exponents',
+    'sample_points_in_polygon', 'sample_points_in_regions', 'iter_points_in_regions', 'triangulate_polygon',
+    'TriangulatedRegion', 'poisson_disk_sample', 'poisson_disk_spacing', 'DensityEnvelope', 'BoundaryDistanceSpacing',
+    'locate_regions', 'estimate_acceptance', 'DegenerateRegionError', 'DegenerateRegionWarning',
+    'sample_sequence_in_polygon',
+    'repel_nodes',
+    'GridIndex',
+    'StencilBuilder', 'build_stencils', 'node_coordinates',
+] + list(_VISUALIZATION_TOOLS)
+
+
+def __getattr__(name):
+    if name in _VISUALIZATION_TOOLS:
+        from . import visualization_tools
+        return getattr(visualization_tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_VISUALIZATION_TOOLS))
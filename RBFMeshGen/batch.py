@@ -0,0 +1,206 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .mesh_generation import RBFMesh
+from .mesh_io import load_points, save_points
+
+# Keys of a spec passed to the RBFMesh constructor. The other keys, besides 'borders', go to generate_points.
+MESH_OPTIONS = ('abs_tol', 'cache')
+
+# Name of the summary file written in the output directory of a batch
+SUMMARY_FILE = 'batch.json'
+
+# Specs of the batch served by a worker process and the shared flags it sets when it starts a job, which tell
+# the jobs a dead worker was running. Only `_init_worker` sets them, in the workers, so batches run at the same
+# time from different threads never share them.
+_specs = None
+_started = None
+
+
+class MeshResult:
+    def __init__(self, index, directory=None, num_points=0, time=0.0, stages=None, error=None, traceback=None):
+        """
+        Outcome of one job of `generate_meshes`.
+
+        Args:
+            index (int): Position of the job in the specs.
+            directory (str, optional): Directory holding the points, None when the job failed.
+            num_points (int, optional): Number of points written, border points included. Defaults to 0.
+            time (float, optional): Wall time of the job in seconds. Defaults to 0.0.
+            stages (dict, optional): Time in seconds of the 'construct', 'generate' and 'save' steps of the
+                                     job and of every stage recorded in `RBFMesh.stats`.
+            error (str, optional): Exception raised by the job, None when it succeeded.
+            traceback (str, optional): Formatted traceback of the exception.
+        """
+        self.index = index
+        self.directory = directory
+        self.num_points = num_points
+        self.time = time
+        self.stages = {} if stages is None else stages
+        self.error = error
+        self.traceback = traceback
+
+    def __repr__(self):
+        outcome = f'{self.num_points} points' if self.ok else f'error={self.error!r}'
+        return f'MeshResult(index={self.index}, {outcome}, time={self.time:.3f})'
+
+    @property
+    def ok(self):
+        """bool: Whether the job succeeded."""
+        return self.error is None
+
+    def load(self, mmap_mode='r'):
+        """
+        Opens the points of the job without copying them.
+
+        Args:
+            mmap_mode (str, optional): Memory-map mode of the columns. Defaults to 'r'.
+
+        Returns:
+            MappedPoints: The points.
+        """
+        if not self.ok:
+            raise ValueError(f'Job {self.index} failed: {self.error}')
+        return load_points(self.directory, mmap_mode)
+
+    def to_dict(self):
+        """Returns the fields of the result as a JSON-serializable dict."""
+        return {'index': self.index, 'directory': self.directory, 'num_points': self.num_points,
+                'time': self.time, 'stages': self.stages, 'error': self.error, 'traceback': self.traceback}
+
+
+def _run_job(index, directory, spec=None):
+    """Builds and fills the mesh of one spec, writes its points and returns the fields of its MeshResult."""
+    if _started is not None:
+        _started[index] = 1
+    spec = dict(_specs[index] if spec is None else spec)
+    start = time.perf_counter()
+    stages = {}
+    try:
+        borders = spec.pop('borders')
+        borders = borders() if callable(borders) else borders
+        options = {key: spec.pop(key) for key in MESH_OPTIONS if key in spec}
+
+        step = time.perf_counter()
+        mesh = RBFMesh(*borders, **options)
+        stages['construct'] = time.perf_counter() - step
+        step = time.perf_counter()
+        mesh.generate_points(**spec)
+        stages['generate'] = time.perf_counter() - step
+        step = time.perf_counter()
+        output = os.path.join(directory, f'{index:06d}')
+        save_points(output, mesh.point_store)
+        stages['save'] = time.perf_counter() - step
+        stages.update((name, record['time']) for name, record in mesh.stats.items())
+    except Exception as error:
+        return {'index': index, 'time': time.perf_counter() - start, 'stages': stages,
+                'error': ''.join(traceback.format_exception_only(type(error), error)).strip(),
+                'traceback': traceback.format_exc()}
+    return {'index': index, 'directory': output, 'num_points': len(mesh.point_store),
+            'time': time.perf_counter() - start, 'stages': stages}
+
+
+def _init_worker(started, specs):
+    global _specs, _started
+    _specs, _started = specs, started
+
+
+def _run_pool(specs, indices, directory, workers, context, started, on_result):
+    """Runs jobs on a process pool and returns their results and the jobs lost to a dead worker."""
+    results = {}
+    for index in indices:
+        started[index] = 0
+    # Forked workers inherit the specs through the initializer arguments, so borders built from lambdas or
+    # closures never need to be pickled. Other workers receive each spec pickled with its job.
+    shared = context.get_start_method() == 'fork'
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(started, specs if shared else None)) as executor:
+        futures = {executor.submit(_run_job, index, directory, None if shared else specs[index]): index
+                   for index in indices}
+        for future in as_completed(futures):
+            try:
+                result = MeshResult(**future.result())
+            except BrokenProcessPool:
+                continue
+            except Exception as error:  # Unpicklable spec or result
+                result = MeshResult(futures[future], error=f'{type(error).__name__}: {error}')
+            results[result.index] = result
+            if on_result is not None:
+                on_result(result)
+    return results, [index for index in indices if index not in results]
+
+
+def generate_meshes(specs, directory=None, workers=None, on_result=None):
+    """
+    Generates the points of many meshes, one job per spec, across a process pool.
+
+    Every job builds an RBFMesh, calls `generate_points` and writes the points to its own directory
+    of raw .npy columns, so the results come back as memory-mapped arrays through `MeshResult.load`
+    instead of pickled point lists. A job that raises is reported in its MeshResult and does not stop
+    the others. When a worker process dies, as on a crash or when killed for memory, the pool is
+    restarted for the jobs it took down. The jobs that were running then are run again one at a time,
+    and a job whose process dies on its own is reported as failed.
+
+    Workers are forked where the platform allows it, so specs whose borders are built from lambdas can
+    be used; with other start methods the specs must be picklable. Every batch hands its specs to its own
+    workers, so batches can run at the same time from several threads.
+
+    Args:
+        specs (list): One dict per mesh. 'borders' holds the list of Border objects, or a callable
+                      returning them, which runs in the worker. 'abs_tol' and 'cache' go to the RBFMesh
+                      constructor and the other keys, such as 'num_points', 'method' or 'seed', to
+                      `RBFMesh.generate_points`.
+        directory (str, optional): Directory receiving one sub-directory per job, named after the index of
+                                   its spec, and a summary of the batch in SUMMARY_FILE. Defaults to a new
+                                   temporary directory.
+        workers (int, optional): Number of worker processes. Defaults to None, which runs the jobs in the
+                                 calling process.
+        on_result (callable, optional): Called with each MeshResult as it completes, in completion order.
+
+    Returns:
+        list: One MeshResult per spec, in the order of the specs.
+    """
+    directory = tempfile.mkdtemp(prefix='rbfmesh-batch-') if directory is None else directory
+    os.makedirs(directory, exist_ok=True)
+    results = {}
+    specs = list(specs)
+    if workers is None or workers <= 1:
+        for index, spec in enumerate(specs):
+            results[index] = MeshResult(**_run_job(index, directory, spec))
+            if on_result is not None:
+                on_result(results[index])
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        started = context.Array('b', len(specs), lock=False)
+        queue, suspects = list(range(len(specs))), []
+        while queue or suspects:
+            # Jobs that were running when a worker died are run again alone, so that a crash there
+            # can only come from the job itself
+            isolated = not queue
+            done, lost = _run_pool(specs, suspects if isolated else queue, directory, 1 if isolated else workers,
+                                   context, started, on_result)
+            results.update(done)
+            crashed = [index for index in lost if started[index]]
+            if isolated or not (done or crashed):
+                failed = crashed if isolated and crashed else lost
+                for index in failed:
+                    results[index] = MeshResult(index, error='Worker process died while running the job')
+                    if on_result is not None:
+                        on_result(results[index])
+                suspects = [index for index in lost if index not in failed]
+                queue = []
+            else:
+                queue = [index for index in lost if not started[index]]
+                suspects += crashed
+
+    results = [results[index] for index in range(len(results))]
+    with open(os.path.join(directory, SUMMARY_FILE), 'w') as handle:
+        json.dump([result.to_dict() for result in results], handle, indent=1)
+    return results
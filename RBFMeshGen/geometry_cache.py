@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import shapely
+
+from .mesh_io import _decode_labels, _encode_labels
+
+
+def border_fingerprint(borders, abs_tol):
+    """
+    Hashes everything the geometry preprocessing of RBFMesh depends on.
+
+    The key covers the sampled coordinates of every border, including its end point, its label,
+    its border flag, its signed number of segments (which encodes the orientation) and `abs_tol`.
+    Two border lists with the same fingerprint produce the same polygons, regions and boundary points.
+
+    Args:
+        borders (list): Border objects, with their number of segments set.
+        abs_tol (float): Absolute tolerance of the mesh.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(float(abs_tol)).encode())
+    for border in borders:
+        digest.update(repr((border.label, bool(border.is_border), border.n_segments)).encode())
+        points = np.vstack((border.generate_points(), np.asarray(border.end_point, dtype=np.float64)))
+        digest.update(np.ascontiguousarray(points, dtype='<f8').tobytes())
+    return digest.hexdigest()
+
+
+def _pack_geometries(geometries):
+    """Packs shapely geometries into one uint8 WKB buffer and its offsets."""
+    blobs = [shapely.to_wkb(geometry) for geometry in geometries]
+    offsets = np.cumsum([0] + [len(blob) for blob in blobs])
+    return np.frombuffer(b''.join(blobs), dtype=np.uint8), offsets
+
+
+def _unpack_geometries(buffer, offsets):
+    buffer = buffer.tobytes()
+    return [shapely.from_wkb(buffer[start:stop]) for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+class GeometryCache:
+    def __init__(self, max_entries=32, directory=None):
+        """
+        Cache of the geometry preprocessing of RBFMesh, keyed by `border_fingerprint`.
+
+        Entries live in an in-memory LRU of at most `max_entries` items and, when `directory` is given,
+        also in one .npz file per key with the polygons stored as WKB, so they survive between processes.
+
+        Args:
+            max_entries (int, optional): Size of the in-memory LRU. Defaults to 32.
+            directory (str, optional): Directory of the on-disk store. Defaults to memory only.
+
+        Attributes:
+            hits (int): Number of lookups answered from memory or disk.
+            misses (int): Number of lookups that found nothing.
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key):
+        """
+        Looks up an entry, first in memory and then on disk.
+
+        Args:
+            key (str): Fingerprint of the borders.
+
+        Returns:
+            dict or None: The entry, or None when it is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self.directory is not None and os.path.exists(self._path(key)):
+            entry = self._read(self._path(key))
+            self._remember(key, entry)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, key, entry):
+        """
+        Stores an entry in memory and, if configured, on disk.
+
+        An entry that cannot be written to disk, for example because of a label that cannot be saved or
+        a full disk, is kept in memory only, with a warning.
+
+        Args:
+            key (str): Fingerprint of the borders.
+            entry (dict): Geometry with the keys 'outer_polygons', 'holes_polygons', 'region_polygons',
+                          'boundary_xy', 'boundary_codes', 'label_table' and 'junctions'.
+        """
+        self._remember(key, entry)
+        if self.directory is not None:
+            try:
+                self._write(self._path(key), entry)
+            except (TypeError, ValueError, OSError) as error:
+                warnings.warn(f"Geometry cache entry {key} was not written to '{self.directory}': {error}",
+                              RuntimeWarning, stacklevel=2)
+
+    def clear(self):
+        """Empties the in-memory LRU. The on-disk store is kept."""
+        self._entries.clear()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _write(path, entry):
+        arrays = {}
+        for name in ('outer_polygons', 'holes_polygons', 'region_polygons'):
+            arrays[f'{name}_wkb'], arrays[f'{name}_offsets'] = _pack_geometries(entry[name])
+        junctions = [(list(map(float, point)), list(map(int, indices))) for point, indices in entry['junctions']]
+        label_table, junctions = _encode_labels(entry['label_table']), json.dumps(junctions)
+        # Write to a temporary file first so that concurrent readers never see a partial entry
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as handle:
+                np.savez(handle, boundary_xy=entry['boundary_xy'], boundary_codes=entry['boundary_codes'],
+                         label_table=np.array(label_table), junctions=np.array(junctions), **arrays)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @staticmethod
+    def _read(path):
+        with np.load(path) as data:
+            entry = {name: _unpack_geometries(data[f'{name}_wkb'], data[f'{name}_offsets'])
+                     for name in ('outer_polygons', 'holes_polygons', 'region_polygons')}
+            entry['boundary_xy'] = data['boundary_xy']
+            entry['boundary_codes'] = data['boundary_codes']
+            entry['label_table'] = _decode_labels(str(data['label_table']))
+            entry['junctions'] = [(tuple(point), indices) for point, indices in json.loads(str(data['junctions']))]
+        return entry
+
+
+# Shared in-memory cache used by RBFMesh(..., cache=True)
+default_geometry_cache = GeometryCache()
@@ -1,3 +1,6 @@
+import math
+from collections import defaultdict, deque
+
 import numpy as np
 
 
@@ -34,12 +37,15 @@ class Border:
         self.label = label
         self.t_start = t_start
         self.t_end = t_end
-        # Calculate start and end points using the parametric function
-        self.start_point = parametric_function(t_start)
-        self.end_point = parametric_function(t_end)
+        # Calculate start and end points using the parametric function, once
+        self._t_start_point = parametric_function(t_start)
+        self._t_end_point = parametric_function(t_end)
+        self.start_point = self._t_start_point
+        self.end_point = self._t_end_point
         self.is_border = is_border
         self.n_segments = None
         self.reverse = False  # Attribute to control direction
+        self._points_cache = {}  # Sampled points keyed by (n_segments, reverse)
 
     def __call__(self, n):
         """
@@ -55,11 +61,9 @@ class Border:
         self.reverse = n < 0  # Set reverse flag based on the sign of n
         # Reverse start and end if n is negative
         if self.reverse:
-            self.start_point = self.parametric_function(self.t_end)
-            self.end_point = self.parametric_function(self.t_start)
+            self.start_point, self.end_point = self._t_end_point, self._t_start_point
         else:
-            self.start_point = self.parametric_function(self.t_start)
-            self.end_point = self.parametric_function(self.t_end)
+            self.start_point, self.end_point = self._t_start_point, self._t_end_point
         return self
 
     def get_midpoint(self):
@@ -72,19 +76,92 @@ class Border:
         mid_t = (self.t_start + self.t_end) / 2
         return self.parametric_function(mid_t)
 
+    def evaluate(self, t_values):
+        """
+        Evaluates the parametric function on an array of parameter values.
+
+        The function is first called on the whole array. If it does not accept arrays
+        (raises or returns something that cannot be broadcast to the input), it is
+        evaluated one value at a time.
+
+        Args:
+            t_values (numpy.ndarray): One dimensional array of parameter values.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(t_values), 2) with the coordinates.
+        """
+        t_values = np.asarray(t_values, dtype=np.float64)
+        try:
+            x, y = self.parametric_function(t_values)
+            x = np.broadcast_to(np.asarray(x, dtype=np.float64), t_values.shape)
+            y = np.broadcast_to(np.asarray(y, dtype=np.float64), t_values.shape)
+        except (TypeError, ValueError):
+            return np.array([self.parametric_function(t) for t in t_values.tolist()],
+                            dtype=np.float64).reshape(-1, 2)
+        return np.column_stack((x, y))
+
     def generate_points(self):
         """
         Generates mesh points along the border.
 
+        The last point (the end of the border) is left out so that consecutive borders do not
+        repeat their shared endpoint. Results are memoized per (n_segments, reverse).
+
         Returns:
-            list: A list of MeshPoint objects representing the generated points.
+            numpy.ndarray: Read-only array of shape (abs(n_segments), 2) with the coordinates of the points.
         """
-        t_values = np.linspace(self.t_start, self.t_end, abs(self.n_segments) + 1, endpoint=True)
-        points = [
-            MeshPoint(x, y, self.label, self.is_border)
-            for x, y in [self.parametric_function(t) for t in t_values]
-        ]
-        return points[:-1] if not self.reverse else points[::-1][:-1]
+        key = (self.n_segments, self.reverse)
+        points = self._points_cache.get(key)
+        if points is None:
+            t_values = np.linspace(self.t_start, self.t_end, abs(self.n_segments) + 1, endpoint=True)
+            points = self.evaluate(t_values)
+            points = points[:-1] if not self.reverse else points[::-1][:-1]
+            points = np.ascontiguousarray(points)
+            points.setflags(write=False)
+            self._points_cache[key] = points
+        return points
+
+
+class EndpointIndex:
+    def __init__(self, points, tolerance=1e-6):
+        """
+        Spatial hash of points bucketed on a grid whose cells are `tolerance` wide.
+
+        Any point closer than `tolerance` to a query point lies in the query cell or in one
+        of its eight neighbours, so a lookup only inspects nine buckets.
+
+        Args:
+            points (list): List of (x, y) tuples to index.
+            tolerance (float, optional): The tolerance for distance comparison. Defaults to 1e-6.
+        """
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.tolerance = tolerance
+        self.cell_size = tolerance if tolerance > 0 else 1.0
+        self._buckets = defaultdict(list)
+        for i, point in enumerate(self.points):
+            self._buckets[self._cell(point)].append(i)
+
+    def _cell(self, point):
+        return math.floor(point[0] / self.cell_size), math.floor(point[1] / self.cell_size)
+
+    def query(self, point):
+        """
+        Finds the indexed points that are close to a given point.
+
+        Args:
+            point (tuple): The coordinates of the query point.
+
+        Returns:
+            list: Indices of the close points, in insertion order.
+        """
+        cx, cy = self._cell(point)
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for i in self._buckets.get((cx + dx, cy + dy), ()):
+                    if is_close(self.points[i], point, self.tolerance):
+                        found.append(i)
+        return sorted(found)
 
 
 def find_next_border(current_end, remaining_borders, abs_tol=1e-6):
@@ -129,24 +206,34 @@ def is_close(point1, point2, tolerance=1e-6):
     Returns:
         bool: True if the points are close, False otherwise.
     """
-    distance = np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
+    distance = math.hypot(point1[0] - point2[0], point1[1] - point2[1])
     return distance < tolerance
 
 
-def find_polygons(borders: list[Border], tolerance=1e-6):
+def find_polygons(borders: list[Border], tolerance=1e-6, return_junctions=False):
     """
     Finds polygons formed by connected borders.
 
+    Border start points are indexed once in an `EndpointIndex`, so each link of a loop
+    is found in constant time. When several unused borders start at the end point of the
+    border being followed (a junction), the first one in input order is followed and the
+    border leading into the junction is queued again so that it can close a second loop,
+    as happens for a border shared by two adjacent regions.
+
     Args:
         borders (list[Border]): A list of Border objects representing the borders.
         tolerance (float, optional): The tolerance for distance comparison. Defaults to 1e-6.
+        return_junctions (bool, optional): Also return the junctions met while assembling. Defaults to False.
 
     Returns:
         list: A list of lists, where each inner list represents a group of connected borders forming a polygon.
+              If `return_junctions` is True, a tuple of that list and a list of (point, borders) tuples giving
+              each junction and the borders that start there.
     """
     standalone_polygons = []
     polygon_groups = []
     open_borders = []
+    junctions = []
 
     # Separate standalone polygons and open borders
     for border in borders:
@@ -156,26 +243,34 @@ def find_polygons(borders: list[Border], tolerance=1e-6):
             open_borders.append(border)
 
     # Form polygons from connected borders
-    while open_borders:
-        current = open_borders.pop(0)
-        polygon = [current]
-        found_multiple, next_border = find_next_border(current.end_point, open_borders, tolerance)
-        if found_multiple:
-            open_borders.append(current)
-        while next_border:
-            current = next_border
-            open_borders.remove(current)
-            polygon.append(current)
-            found_multiple, next_border = find_next_border(current.end_point, open_borders, tolerance)
-            if found_multiple:
-                open_borders.append(current)
-            # Close the loop if it connects back to the start
-            if next_border and is_close(next_border.end_point, polygon[0].start_point, tolerance):
-                polygon.append(next_border)
+    index = EndpointIndex([border.start_point for border in open_borders], tolerance)
+    used = [False] * len(open_borders)
+    # Queue entries carry a stamp so that a border queued again only starts a chain from its newest entry
+    stamps = [0] * len(open_borders)
+    queue = deque((i, 0) for i in range(len(open_borders)))
+    while queue:
+        current_index, stamp = queue.popleft()
+        if used[current_index] or stamp != stamps[current_index]:
+            continue
+        used[current_index] = True
+        polygon = [open_borders[current_index]]
+        # Follow the chain until it closes back on its start or runs out of borders
+        while not is_close(polygon[-1].end_point, polygon[0].start_point, tolerance):
+            candidates = [i for i in index.query(polygon[-1].end_point) if not used[i]]
+            if not candidates:
                 break
+            if len(candidates) > 1:
+                junctions.append((polygon[-1].end_point, [open_borders[i] for i in candidates]))
+                used[current_index] = False
+                stamps[current_index] += 1
+                queue.append((current_index, stamps[current_index]))
+            current_index = candidates[0]
+            used[current_index] = True
+            polygon.append(open_borders[current_index])
 
         if is_close(polygon[0].start_point, polygon[-1].end_point, tolerance):
             polygon_groups.append(polygon)
 
+    if return_junctions:
+        return standalone_polygons + polygon_groups, junctions
     return standalone_polygons + polygon_groups
-
@@ -0,0 +1,159 @@
+import numpy as np
+
+# Bits of the integer coordinates of ScrambledSobol points, which bounds a sequence to 2**SOBOL_BITS points
+SOBOL_BITS = 32
+
+
+def _sobol_directions():
+    """Direction numbers of the first two Sobol dimensions, as SOBOL_BITS-bit integers of shape (2, SOBOL_BITS)."""
+    k = np.arange(1, SOBOL_BITS + 1, dtype=np.uint64)
+    # Dimension 1 is the van der Corput sequence, m_k = 1
+    first = np.left_shift(np.uint64(1), np.uint64(SOBOL_BITS) - k)
+    # Dimension 2 follows the primitive polynomial x + 1: m_k = 2 m_{k-1} ^ m_{k-1}
+    m = [1]
+    while len(m) < SOBOL_BITS:
+        m.append((2 * m[-1]) ^ m[-1])
+    second = np.array(m, dtype=np.uint64) << (np.uint64(SOBOL_BITS) - k)
+    return np.stack((first, second))
+
+
+class ScrambledSobol:
+    def __init__(self, rng=None):
+        """
+        Two-dimensional Sobol sequence with random linear matrix scrambling and a random digital shift.
+
+        The scrambling keeps the net structure of the sequence, so every block of 2**m consecutive
+        points starting at a multiple of 2**m still has one point in each elementary box of area 2**-m,
+        while removing the alignments of the plain sequence.
+
+        Args:
+            rng (numpy.random.Generator, optional): Random generator of the scrambling. Defaults to a fresh
+                                                    ``default_rng()``.
+
+        Attributes:
+            index (int): Index of the next point returned by `random`.
+            directions (numpy.ndarray): Scrambled direction numbers, of shape (2, SOBOL_BITS).
+            shift (numpy.ndarray): Digital shift of each dimension.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        self.index = 0
+        directions = _sobol_directions()
+        # Bits of each direction number, most significant first
+        powers = np.uint64(1) << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+        self.directions = np.empty_like(directions)
+        for d in range(2):
+            bits = ((directions[d][:, None] & powers) > 0).astype(np.int64)
+            # Random lower triangular binary matrix with a unit diagonal
+            scramble = np.tril(rng.integers(0, 2, (SOBOL_BITS, SOBOL_BITS)), -1) + np.eye(SOBOL_BITS, dtype=np.int64)
+            scrambled = (bits @ scramble.T) % 2
+            self.directions[d] = (scrambled.astype(np.uint64) * powers).sum(axis=1)
+        self.shift = rng.integers(0, 2 ** SOBOL_BITS, 2, dtype=np.uint64)
+
+    def points(self, start, count):
+        """
+        Evaluates the points of a range of indices, without changing `index`.
+
+        Args:
+            start (int): Index of the first point.
+            count (int): Number of points.
+
+        Returns:
+            numpy.ndarray: Array of shape (count, 2) with coordinates in [0, 1).
+        """
+        if start + count > 2 ** SOBOL_BITS:
+            raise ValueError(f'ScrambledSobol holds at most 2**{SOBOL_BITS} points')
+        index = np.arange(start, start + count, dtype=np.uint64)
+        values = np.broadcast_to(self.shift, (count, 2)).copy()
+        for bit in range(int(start + count).bit_length()):
+            values ^= ((index >> np.uint64(bit)) & np.uint64(1))[:, None] * self.directions[:, bit]
+        return values * 2.0 ** -SOBOL_BITS
+
+    def random(self, count):
+        """
+        Returns the next `count` points of the sequence.
+
+        Args:
+            count (int): Number of points.
+
+        Returns:
+            numpy.ndarray: Array of shape (count, 2) with coordinates in [0, 1).
+        """
+        values = self.points(self.index, count)
+        self.index += count
+        return values
+
+
+class ScrambledHalton:
+    def __init__(self, rng=None, bases=(2, 3)):
+        """
+        Two-dimensional Halton sequence with random digit permutations.
+
+        Every digit position of every base gets its own random permutation of the digits, which breaks
+        the correlation between the dimensions of the plain sequence for larger bases.
+
+        Args:
+            rng (numpy.random.Generator, optional): Random generator of the permutations. Defaults to a fresh
+                                                    ``default_rng()``.
+            bases (tuple, optional): Coprime bases of the two dimensions. Defaults to (2, 3).
+
+        Attributes:
+            index (int): Index of the next point returned by `random`.
+            bases (tuple): The bases.
+            permutations (list): Array of shape (digits, base) with the digit permutations of each dimension.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        self.index = 0
+        self.bases = tuple(bases)
+        self.permutations = []
+        self._tails = []
+        for base in self.bases:
+            # Enough digits to resolve a double
+            digits = int(np.ceil(53 / np.log2(base))) + 1
+            permutations = np.argsort(rng.random((digits, base)), axis=1)
+            self.permutations.append(permutations)
+            # Digits beyond the last non-zero one are all 0, permuted: their contribution from each position on
+            weights = float(base) ** -np.arange(1, digits + 1)
+            self._tails.append(np.append(np.cumsum((permutations[:, 0] * weights)[::-1])[::-1], 0.0))
+
+    def points(self, start, count):
+        """
+        Evaluates the points of a range of indices, without changing `index`.
+
+        Args:
+            start (int): Index of the first point.
+            count (int): Number of points.
+
+        Returns:
+            numpy.ndarray: Array of shape (count, 2) with coordinates in [0, 1).
+        """
+        values = np.empty((count, 2))
+        for d, (base, permutations, tail) in enumerate(zip(self.bases, self.permutations, self._tails)):
+            remainder = np.arange(start, start + count, dtype=np.int64)
+            value = np.zeros(count)
+            weight = 1.0 / base
+            level = 0
+            while level < len(permutations) and start + count > base ** level:
+                value += permutations[level][remainder % base] * weight
+                remainder //= base
+                weight /= base
+                level += 1
+            values[:, d] = value + tail[level]
+        return np.minimum(values, np.nextafter(1.0, 0.0))
+
+    def random(self, count):
+        """
+        Returns the next `count` points of the sequence.
+
+        Args:
+            count (int): Number of points.
+
+        Returns:
+            numpy.ndarray: Array of shape (count, 2) with coordinates in [0, 1).
+        """
+        values = self.points(self.index, count)
+        self.index += count
+        return values
+
+
+# Low-discrepancy sequences by sampling method name
+SEQUENCES = {'halton': ScrambledHalton, 'sobol': ScrambledSobol}
@@ -1,8 +1,30 @@
-from .geometry_utils import MeshPoint, find_polygons, Border
-from shapely.geometry import Polygon, Point
+import logging
+import time
+import warnings
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .geometry_utils import MeshPoint, find_polygons, Border, EndpointIndex
+from .point_store import PointStore, PointView
+from .mesh_io import PointFileWriter, save_points, load_points
+from .geometry_cache import border_fingerprint, default_geometry_cache
+from .spatial_index import GridIndex
+from .ordering import node_order
+from .smoothing import repel_nodes
+from shapely.geometry import MultiPolygon, Polygon
 from shapely.ops import unary_union
-from shapely import prepare
-import random
+from shapely import STRtree, prepare
+import shapely
+from .sampling import (
+    sample_points_in_regions, iter_points_in_regions, poisson_disk_sample, poisson_disk_spacing, DensityEnvelope,
+    BoundaryDistanceSpacing, DEFAULT_TASK_SIZE, locate_regions, DegenerateRegionError, DegenerateRegionWarning
+)
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pieces of an overlay smaller than this fraction of the area of their polygon are rounding slivers
+SLIVER_AREA = 1e-9
 
 
 class RBFMesh:
@@ -12,30 +34,111 @@ class RBFMesh:
     Args:
         *borders: Variable length argument list of Border objects representing the borders of the polygons.
         abs_tol (float, optional): Absolute tolerance for geometric calculations. Defaults to 1e-04.
+        cache (GeometryCache or bool, optional): Cache of the geometry preprocessing, keyed by a fingerprint
+                                                 of the borders and `abs_tol`. True uses the shared in-memory
+                                                 cache. Defaults to None, which always reprocesses.
+        on_stage (callable, optional): Called as ``on_stage(stage, record)`` after every timed stage, with
+                                       the same record as ``stats[stage]``. Defaults to None.
 
     Attributes:
         borders (list): List of Border objects representing the borders of the polygons.
-        Points (list): List of generated MeshPoint objects.
-        Boundary_Points (list): List of generated MeshPoint objects on the boundary.
+        point_store (PointStore): Columnar storage holding both the interior and the boundary points.
+        Points (PointView): Lazy list-like view of the generated interior points as MeshPoint objects.
+        Boundary_Points (PointView): Lazy list-like view of the boundary points as MeshPoint objects.
+        xy (numpy.ndarray): Zero-copy (n, 2) view of the coordinates of all the points.
+        labels (numpy.ndarray): Zero-copy view of the int32 label codes of all the points.
+        label_table (list): Labels referenced by the label codes.
+        is_border (numpy.ndarray): Zero-copy view of the boolean border mask of all the points.
         outer_polygons (list): List of outer Polygon objects.
         holes_polygons (list): List of hole Polygon objects.
+        junctions (list): (point, borders) tuples for the points where several borders start, as
+                          reported by `find_polygons`.
         abs_tol (float): Absolute tolerance for geometric calculations.
+        cache (GeometryCache): The geometry cache, or None.
+        stats (dict): Timings and counters of the last run of each stage, keyed by stage name. Every
+                      record holds the elapsed 'time' in seconds and the counters of its stage, such as
+                      the polygons before and after each step of `process_polygons`, or the candidates
+                      drawn and accepted by the sampler in total and per region. Records are also logged
+                      at DEBUG level on the 'RBFMeshGen.mesh_generation' logger. The record of a
+                      stage that raised also holds the exception under 'error'.
+        on_stage (callable): The stage callback, or None.
     Methods:
-        generate_points(num_points): Generates random points within the polygons.
+        generate_points(num_points, boundary_distance, method, spacing): Generates random points within the polygons.
 
         find_and_orient_polygons(abs_tol): Finds and calculate the orientation of the polygons for the given borders.
     """
 
-    def __init__(self, *borders: Border, abs_tol=1e-04):
+    def __init__(self, *borders: Border, abs_tol=1e-04, cache=None, on_stage=None):
         self.borders = list(borders)
-        self.Points = []
-        self.Boundary_Points = []
+        self.point_store = PointStore()
+        self._point_views = None  # Interior and border PointViews of point_store, see _views
         self.outer_polygons = []
         self.holes_polygons = []
         self.region_polygons = []
+        self.junctions = []
         self.abs_tol = abs_tol
+        self._triangulations = {}  # TriangulatedRegion cache for method='triangulate'
+        self._sequences = {}  # Low-discrepancy sequence state of each region for method='halton' and 'sobol'
+        self.cache = default_geometry_cache if cache is True else cache
+        self._generation = None  # Settings of the last generate_points call, reused by the border edits
+        self._geometry_state = None  # Chains, pieces and boundary masks of the geometry, see _update_polygons
+        self.stats = {}
+        self.on_stage = on_stage
         self.process_polygons()  # Process polygons during initialization
 
+    def _views(self):
+        """Returns the interior and border PointViews, built again only when `point_store` is replaced."""
+        views = self._point_views
+        if views is None or views[0]._store is not self.point_store:
+            views = (PointView(self.point_store, is_border=False), PointView(self.point_store, is_border=True))
+            self._point_views = views
+        return views
+
+    @property
+    def Points(self):
+        return self._views()[0]
+
+    @property
+    def Boundary_Points(self):
+        return self._views()[1]
+
+    @property
+    def xy(self):
+        return self.point_store.xy
+
+    @property
+    def labels(self):
+        return self.point_store.labels
+
+    @property
+    def label_table(self):
+        return self.point_store.label_table
+
+    @property
+    def is_border(self):
+        return self.point_store.is_border
+
+    @contextmanager
+    def _stage(self, name, **counters):
+        """
+        Times a stage and records it in `stats` with the counters set before or inside the block.
+
+        A stage that raises is recorded too, with the exception under 'error', before the exception propagates.
+        """
+        record = dict(counters)
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as error:
+            record['error'] = f'{type(error).__name__}: {error}'
+            raise
+        finally:
+            record['time'] = time.perf_counter() - start
+            self.stats[name] = record
+            logger.debug('%s: %s', name, record)
+            if self.on_stage is not None:
+                self.on_stage(name, record)
+
     def process_polygons(self):
         """
         Processes polygons to prepare them for point generation by classifying
@@ -60,70 +163,794 @@ class RBFMesh:
             self.holes_polygons: List of shapely.geometry.Polygon objects representing the holes.
             self.region_polygons: List of shapely.geometry.Polygon objects representing the final regions
                                   after subtraction of holes from the outer polygons.
-            self.Boundary_Points: List of MeshPoint objects that are confirmed to be on the boundary of the
-                                  unified region, adjusted by the absolute tolerance.
+            self.point_store: Receives the boundary points that are confirmed to be on the boundary of the
+                              unified region, adjusted by the absolute tolerance.
 
         This setup is crucial for ensuring that the subsequent point generation by `generate_points`
         occurs within properly defined and non-overlapping geometric regions.
+
+        Each step is timed and counted in `stats`, under 'find_polygons', 'build_polygons',
+        'exclude_nested_polygons', 'resolve_multiple_overlaps', 'generate_regions' and 'boundary_filter',
+        or 'restore_geometry' when the geometry comes from the cache.
         """
-        polygons = find_polygons(self.borders, self.abs_tol)
+        self.stats = {}
+        self._geometry_state = None
+        key = None
+        if self.cache is not None:
+            with self._stage('restore_geometry') as record:
+                key = border_fingerprint(self.borders, self.abs_tol)
+                entry = self.cache.get(key)
+                record['hit'] = entry is not None
+                if entry is not None:
+                    self._restore_geometry(entry)
+                    record['regions'] = len(self.region_polygons)
+            if entry is not None:
+                return
+
+        with self._stage('find_polygons', borders=len(self.borders)) as record:
+            polygons, self.junctions = find_polygons(self.borders, self.abs_tol, return_junctions=True)
+            chains = [tuple(polygon) for polygon in polygons]
+            record['polygons'] = len(polygons)
+            record['junctions'] = len(self.junctions)
 
-        # Generate points along borders and classify them
-        polygons_with_points = []
-        tentative_boundary_points = []
+        with self._stage('build_polygons') as record:
+            # Generate points along borders and classify them
+            polygons_with_points = []
+            tentative_boundary_points = []
+            tentative_boundary_codes = []
+            tentative_borders = []
 
-        for polygon in polygons:
-            polygon_points = []
-            for border in polygon:
-                border_point = border.generate_points()
-                if border.is_border:
-                    tentative_boundary_points.extend(border_point)
-                polygon_points.extend([(p.x, p.y) for p in border_point])  # Add to polygon definition
-            polygons_with_points.append(polygon_points)
+            for polygon in polygons:
+                polygon_points = []
+                for border in polygon:
+                    border_point = border.generate_points()
+                    if border.is_border:
+                        tentative_borders.append(border)
+                        tentative_boundary_points.append(border_point)
+                        tentative_boundary_codes.append(np.full(len(border_point),
+                                                                self.point_store.label_code(border.label),
+                                                                dtype=np.int32))
+                    polygon_points.append(border_point)  # Add to polygon definition
+                polygons_with_points.append(np.concatenate(polygon_points))
 
-        # Filter out the holes based on orientation
-        polygons = [Polygon(poly) for poly in polygons_with_points]
+            # Filter out the holes based on orientation
+            polygons = [Polygon(poly) for poly in polygons_with_points]
 
-        # Determine orientation and classify as outer or holes
-        self.outer_polygons = [poly for poly in polygons if poly.exterior.is_ccw]
-        self.holes_polygons = [poly for poly in polygons if not poly.exterior.is_ccw]
+            # Determine orientation and classify as outer or holes
+            outer_keys = [_chain_key(chain) for chain, poly in zip(chains, polygons) if poly.exterior.is_ccw]
+            self.outer_polygons = [poly for poly in polygons if poly.exterior.is_ccw]
+            outers = list(self.outer_polygons)
+            self.holes_polygons = [poly for poly in polygons if not poly.exterior.is_ccw]
+            record.update(outer=len(self.outer_polygons), holes=len(self.holes_polygons),
+                          vertices=sum(len(points) for points in polygons_with_points))
 
         # Step 1: Exclude nested polygons
-        self.outer_polygons = exclude_nested_polygons(self.outer_polygons)
+        with self._stage('exclude_nested_polygons', polygons_before=len(self.outer_polygons)) as record:
+            self.outer_polygons = exclude_nested_polygons(self.outer_polygons)
+            record['polygons_after'] = len(self.outer_polygons)
 
         # Step 1.5: Resolve overlaps among multiple polygons
-        self.outer_polygons = resolve_multiple_overlaps(self.outer_polygons)
+        with self._stage('resolve_multiple_overlaps', polygons_before=len(self.outer_polygons)) as record:
+            self.outer_polygons = resolve_multiple_overlaps(self.outer_polygons)
+            record['polygons_after'] = len(self.outer_polygons)
 
         # Step 2: generate_regions
-        self.region_polygons = generate_regions(self.outer_polygons, self.holes_polygons)
+        with self._stage('generate_regions', outer=len(self.outer_polygons), holes=len(self.holes_polygons)) as record:
+            pieces = list(self.outer_polygons)
+            self.region_polygons = generate_regions(self.outer_polygons, self.holes_polygons)
+            self._triangulations = {}
+            self._sequences = {}
+            record['regions'] = len(self.region_polygons)
+
+        with self._stage('boundary_filter') as record:
+            # Unify the regions for boundary check
+            unified_region = unary_union([p.buffer(0) for p in self.region_polygons])
+
+            # Filter boundary points that are actually on the boundary of the unified region
+            boundary_line = unified_region.boundary
+            lengths = [len(points) for points in tentative_boundary_points]
+            tentative_boundary_points = np.concatenate(tentative_boundary_points or [np.empty((0, 2))])
+            tentative_boundary_codes = np.concatenate(tentative_boundary_codes or [np.empty(0, dtype=np.int32)])
+            on_boundary = boundary_point_mask(boundary_line, tentative_boundary_points, self.abs_tol)
+            self.point_store.append(tentative_boundary_points[on_boundary], tentative_boundary_codes[on_boundary],
+                                    True)
+            record.update(candidates=len(tentative_boundary_points), kept=int(on_boundary.sum()))
+
+        groups = _region_groups(outer_keys, outers, self.region_polygons) if self.region_polygons else []
+        if groups is not None:
+            masks = np.split(on_boundary, np.cumsum(lengths)[:-1]) if lengths else []
+            self._geometry_state = {
+                'chains': chains, 'polygons': polygons, 'pieces': pieces, 'groups': groups,
+                'masks': {id(border): mask for border, mask in zip(tentative_borders, masks)},
+            }
 
-        # Unify the regions for boundary check
-        unified_region = unary_union([p.buffer(0) for p in self.region_polygons])
+        if key is not None:
+            border_index = {id(border): i for i, border in reversed(list(enumerate(self.borders)))}
+            self.cache.put(key, {
+                'outer_polygons': list(self.outer_polygons),
+                'holes_polygons': list(self.holes_polygons),
+                'region_polygons': list(self.region_polygons),
+                'boundary_xy': tentative_boundary_points[on_boundary],
+                'boundary_codes': tentative_boundary_codes[on_boundary],
+                'label_table': list(self.point_store.label_table),
+                'junctions': [(tuple(point), [border_index[id(border)] for border in borders])
+                              for point, borders in self.junctions],
+            })
 
-        # Filter boundary points that are actually on the boundary of the unified region
-        boundary_line = unified_region.boundary
-        self.Boundary_Points = [p for p in tentative_boundary_points if
-                                boundary_line.distance(Point(p.x, p.y)) < self.abs_tol]
+    def _restore_geometry(self, entry):
+        """Sets up the polygons and boundary points from a GeometryCache entry."""
+        self.outer_polygons = list(entry['outer_polygons'])
+        self.holes_polygons = list(entry['holes_polygons'])
+        self.region_polygons = list(entry['region_polygons'])
+        self.junctions = [(point, [self.borders[i] for i in indices]) for point, indices in entry['junctions']]
+        self._triangulations = {}
+        self._sequences = {}
+        # Map the cached label codes to the codes of this mesh's label table
+        codes = np.array([self.point_store.label_code(label) for label in entry['label_table']], dtype=np.int32)
+        self.point_store.append(entry['boundary_xy'], codes[entry['boundary_codes']], True)
 
-    def generate_points(self, num_points, boundary_distance=1.0e-5):
+    def generate_points(self, num_points=None, boundary_distance=1.0e-5, method='rejection', spacing=None,
+                        seed=None, workers=None):
         """-
         Generates random points within the polygons defined by the borders.
 
         Args:
             boundary_distance:  distance from generated point to the boundary
-            num_points (int): Number of points to generate.
+            num_points (int): Number of points to generate. With method='poisson' it is a target used to
+                              choose the spacing and may be omitted when `spacing` is given.
+            method (str, optional): 'rejection' draws candidates over each region's bounds and keeps those
+                                    inside. 'triangulate' samples a cached triangulation of each region
+                                    directly, which avoids wasted candidates on thin or concave regions.
+                                    'poisson' places blue-noise nodes at least `spacing` apart from each
+                                    other and from the points already in the mesh. 'halton' and 'sobol'
+                                    draw scrambled low-discrepancy candidates over each region's bounds,
+                                    which cover the regions more evenly than independent draws. The
+                                    sequence of each region is kept, so later calls extend the points
+                                    instead of starting the sequence again; `seed` only scrambles the
+                                    sequences of the first call. Defaults to 'rejection'.
+            spacing (float or callable, optional): Minimum node distance for method='poisson'. Otherwise, a
+                                                   vectorized function ``h(x, y)`` giving the local node spacing;
+                                                   nodes are then drawn with density proportional to ``1 / h**2``
+                                                   through a DensityEnvelope of each region, and the regions get
+                                                   points in proportion to their integrated density.
+                                                   See `boundary_spacing`.
+            seed (int, optional): Seed of the random streams. A given seed yields the same points for
+                                  any number of workers. Defaults to fresh entropy.
+            workers (int, optional): Number of threads drawing the points of the regions, which are split
+                                     into sub-tasks when large. Not used by method='poisson'.
+                                     Defaults to a single thread.
 
         Returns:
-            list: List of generated MeshPoint objects.
+            PointView: List-like view of the generated interior points.
         """
+        if method == 'poisson':
+            if callable(spacing):
+                raise ValueError("method='poisson' needs a constant spacing")
+            if spacing is None:
+                if num_points is None:
+                    raise ValueError("method='poisson' needs num_points or spacing")
+                spacing = poisson_disk_spacing(self.region_polygons, num_points)
+            with self._stage('sample', method=method, spacing=spacing) as record:
+                coordinates, region_index = poisson_disk_sample(self.region_polygons, spacing, boundary_distance,
+                                                                fixed_points=self.xy,
+                                                                rng=np.random.default_rng(seed), stats=record)
+                record['acceptance'] = record['accepted'] / record['drawn'] if record.get('drawn') else None
+                record['regions'] = [{'accepted': int(count)} for count in
+                                     np.bincount(region_index, minlength=len(self.region_polygons))]
+            with self._stage('store', points=len(coordinates)):
+                self._append_region_points(coordinates, region_index)
+            self._generation = {'method': method, 'boundary_distance': boundary_distance, 'spacing': spacing}
+            return self.Points
+        if num_points is None:
+            raise ValueError(f"method='{method}' needs num_points")
+
         # Step 1: Calculate points allocation
-        points_allocation = calculate_point_allocation(self.region_polygons, num_points)
+        points_allocation, envelopes, sampling_seed, weights = self._sampling_plan(num_points, boundary_distance,
+                                                                                   spacing, seed)
+        self._generation = {'method': method, 'boundary_distance': boundary_distance, 'spacing': spacing,
+                            'scale': num_points / sum(weights) if envelopes is not None else None}
 
         # Step 2: Generate points
-        self.Points.extend(generate_points_within_polygons(self.region_polygons, points_allocation, boundary_distance))
+        with self._stage('sample', method=method, requested=num_points, workers=workers) as record:
+            coordinates, region_index = sample_points_in_regions(self.region_polygons, points_allocation,
+                                                                 boundary_distance, seed=sampling_seed,
+                                                                 method=method, triangulations=self._triangulations,
+                                                                 envelopes=envelopes, workers=workers, stats=record,
+                                                                 sequences=self._sequences)
+        with self._stage('store', points=len(coordinates)):
+            self._append_region_points(coordinates, region_index)
+
+        return self.Points
+
+    def iter_points(self, num_points, chunk_size=DEFAULT_TASK_SIZE, boundary_distance=1.0e-5, method='rejection',
+                    spacing=None, seed=None):
+        """
+        Generates interior points block by block, without storing them in the mesh.
+
+        Points are allocated to the regions as in `generate_points` and each region is drawn in blocks
+        of at most `chunk_size` points, so sinks such as files or solvers can consume meshes that do
+        not fit in memory. Blocks never span two regions. With the default `chunk_size` and the same
+        seed, the blocks concatenate to the points `generate_points` would add.
+
+        Args:
+            num_points (int): Total number of points to generate.
+            chunk_size (int, optional): Largest number of points in a block. Defaults to 200000.
+            boundary_distance (float, optional): Distance from generated point to the boundary. Defaults to 1.0e-5.
+            method (str, optional): 'rejection', 'triangulate', 'halton' or 'sobol', see `generate_points`.
+                                    Defaults to 'rejection'.
+            spacing (callable, optional): Vectorized spacing function ``h(x, y)``, see `generate_points`.
+            seed (int, optional): Seed of the random streams. Defaults to fresh entropy.
+
+        Yields:
+            tuple: An (n, 2) float array with the coordinates of the block and an (n,) int32 array with
+                   their label codes in `label_table`.
+        """
+        if method == 'poisson':
+            raise ValueError("method='poisson' places points globally and cannot be streamed")
+        points_allocation, envelopes, sampling_seed, _ = self._sampling_plan(num_points, boundary_distance, spacing,
+                                                                              seed)
+        region_codes = self._region_codes()
+        for i, coordinates in iter_points_in_regions(self.region_polygons, points_allocation, boundary_distance,
+                                                     seed=sampling_seed, method=method,
+                                                     triangulations=self._triangulations, envelopes=envelopes,
+                                                     chunk_size=chunk_size, sequences=self._sequences):
+            yield coordinates, np.full(len(coordinates), region_codes[i], dtype=np.int32)
+
+    def _sampling_plan(self, num_points, boundary_distance, spacing, seed):
+        """Returns the allocation, the density envelopes (or None), the seed of the sampling streams and the
+        weights of the regions (or None), recording the 'allocate' stage."""
+        with self._stage('allocate', requested=num_points, density=callable(spacing)) as record:
+            plan = self._allocate(num_points, boundary_distance, spacing, seed)
+            record['allocation'] = plan[0]
+        return plan
+
+    def _allocate(self, num_points, boundary_distance, spacing, seed):
+        density_seed, sampling_seed = np.random.SeedSequence(seed).spawn(2)
+        envelopes = weights = None
+        if callable(spacing):
+            def density(x, y):
+                return 1.0 / spacing(x, y) ** 2
+            envelopes = [DensityEnvelope(poly.buffer(-boundary_distance), density) for poly in self.region_polygons]
+            weights = [envelope.integral(rng=np.random.default_rng(child))
+                       for envelope, child in zip(envelopes, density_seed.spawn(len(envelopes)))]
+        # Regions that vanish when shrunk cannot hold points: warn and leave them out of the allocation
+        shrunk_areas = ([envelope.polygon.area for envelope in envelopes] if envelopes is not None else
+                        [poly.buffer(-boundary_distance).area for poly in self.region_polygons])
+        region_weights = [poly.area for poly in self.region_polygons] if weights is None else weights
+        degenerate = [i for i, (area, weight) in enumerate(zip(shrunk_areas, region_weights)) if area <= 0.0 < weight]
+        if degenerate:
+            warnings.warn(f"Regions {[i + 1 for i in degenerate]} vanish when shrunk by "
+                          f"boundary_distance={boundary_distance} and receive no points", DegenerateRegionWarning,
+                          stacklevel=4)
+            weights = [0.0 if area <= 0.0 else weight for weight, area in zip(region_weights, shrunk_areas)]
+        allocation = calculate_point_allocation(self.region_polygons, num_points, weights)
+        return allocation, envelopes, sampling_seed, weights
+
+    def smooth_nodes(self, iterations=10, k=7, step=0.1, rebuild_every=3, boundary_distance=None,
+                     chunk_size=100_000):
+        """
+        Evens out the interior points with nearest-neighbour repulsion, see `smoothing.repel_nodes`.
+
+        Boundary points repel but stay fixed. Each interior point stays in the region it belongs to,
+        shrunk by `boundary_distance`: moves that would leave it are pulled back. Points outside every
+        region are left untouched. Every `rebuild_every` iterations the neighbours are searched again
+        with one GridIndex build and batched kNN queries, and the other iterations only evaluate the
+        forces, so the pass scales to millions of points.
+
+        Args:
+            iterations (int, optional): Number of repulsion steps. Defaults to 10.
+            k (int, optional): Number of neighbours pushing each point. Defaults to 7.
+            step (float, optional): Step size, as a fraction of the local spacing. Defaults to 0.1.
+            rebuild_every (int, optional): Number of iterations between two neighbour searches. Defaults to 3.
+            boundary_distance (float, optional): Distance kept from the boundary of the regions. Defaults to
+                                                 the one of the last `generate_points` call, or 1.0e-5.
+            chunk_size (int, optional): Number of points whose neighbours are searched at once. Defaults to 100000.
+
+        Returns:
+            PointView: List-like view of the interior points.
+        """
+        if boundary_distance is None:
+            boundary_distance = (self._generation or {}).get('boundary_distance', 1.0e-5)
+        interior = np.flatnonzero(~self.point_store.is_border)
+        xy = self.point_store.xy[interior]
+        with self._stage('smooth_nodes', iterations=iterations, k=k, step=step, nodes=len(interior)) as record:
+            shrunk = [poly.buffer(-boundary_distance) for poly in self.region_polygons]
+            for poly in shrunk:
+                prepare(poly)
+            region_index = locate_regions(shrunk, xy[:, 0], xy[:, 1])
+            record['fixed'] = int((region_index < 0).sum())
+            moved = repel_nodes(xy, self.point_store.xy[self.point_store.is_border], shrunk, region_index,
+                                iterations=iterations, k=k, step=step, rebuild_every=rebuild_every,
+                                chunk_size=chunk_size, stats=record)
+            self.point_store.move(interior, moved)
+        return self.Points
+
+    def reorder(self, method='hilbert', border_first=True, bits=16, k=7):
+        """
+        Reorders the points in place so that points close in space are close in memory, see
+        `ordering.node_order`.
+
+        Stencils and differentiation matrices built on the reordered points touch nearby rows, which
+        improves the cache use of sparse matrix products. Data attached to the points can be moved to
+        the new order with ``data[order]``, and back with ``data[numpy.argsort(order)]``.
+
+        Args:
+            method (str, optional): 'hilbert', 'morton' or 'rcm'. Defaults to 'hilbert'.
+            border_first (bool, optional): Whether to keep the border points before the interior points,
+                                           each group following the order of the method. Defaults to True.
+            bits (int, optional): Bits per coordinate of the space-filling curve keys. Defaults to 16.
+            k (int, optional): Stencil size of the 'rcm' neighbour graph. Defaults to 7.
+
+        Returns:
+            numpy.ndarray: The permutation: the point now at position i was at position ``order[i]``.
+        """
+        with self._stage('reorder', method=method, nodes=len(self.point_store)):
+            order = node_order(self.point_store.xy, method, bits, k,
+                               self.point_store.is_border if border_first else None)
+            self.point_store.permute(order)
+        return order
+
+    def add_border(self, *borders):
+        """
+        Adds borders to the mesh and updates the geometry and the points, see `update_geometry`.
 
+        Args:
+            *borders: Border objects to add, with their number of segments set.
+
+        Returns:
+            PointView: List-like view of the interior points.
+        """
+        return self.update_geometry(self.borders + list(borders))
+
+    def remove_border(self, *borders):
+        """
+        Removes borders from the mesh and updates the geometry and the points, see `update_geometry`.
+
+        Args:
+            *borders: Border objects of the mesh to remove.
+
+        Returns:
+            PointView: List-like view of the interior points.
+        """
+        removed = {id(border) for border in borders}
+        if len(removed & {id(border) for border in self.borders}) != len(removed):
+            raise ValueError('Only borders of the mesh can be removed')
+        return self.update_geometry([border for border in self.borders if id(border) not in removed])
+
+    def update_border(self, old_border, new_border):
+        """
+        Replaces a border, e.g. a moved or re-discretized one, and updates the geometry and the points,
+        see `update_geometry`.
+
+        Args:
+            old_border (Border): Border of the mesh to replace.
+            new_border (Border): The replacement, with its number of segments set.
+
+        Returns:
+            PointView: List-like view of the interior points.
+        """
+        positions = [i for i, border in enumerate(self.borders) if border is old_border]
+        if not positions:
+            raise ValueError('Only borders of the mesh can be updated')
+        borders = list(self.borders)
+        borders[positions[0]] = new_border
+        return self.update_geometry(borders)
+
+    def update_geometry(self, borders, seed=None):
+        """
+        Switches the mesh to a new list of borders, redoing only the geometry and the points of the changed area.
+
+        The geometry is updated by `_update_polygons`: `find_polygons` only runs on the borders linked to
+        the added or removed ones, the other chains keep their polygons, and only the regions meeting
+        the changed area are patched or rebuilt. Its stages are timed in `stats` under 'find_polygons',
+        'build_polygons', 'update_regions' and 'boundary_filter'. When the geometry came from the `cache`
+        or was never processed by this mesh, `process_polygons` runs over all the borders instead.
+
+        The points are updated incrementally: the boundary points are only tested again near the changed
+        area, the triangulations and low-discrepancy sequences of regions that did not change are kept,
+        and interior points keep their region away from the changed area. Elsewhere, they are relabelled
+        after the new region containing them, and dropped when they fall outside the regions or closer
+        than the generation `boundary_distance` to the new boundary. The area that was not covered by any
+        region before is filled with the settings of the last `generate_points` call: the same spacing
+        function, or the current uniform density. After method='poisson', points closer than the spacing
+        to the new boundary points are dropped too, and every gap is refilled by dart throwing around the
+        kept points.
+
+        Args:
+            borders (list): The new Border objects.
+            seed (int, optional): Seed of the points filling the new area. Defaults to fresh entropy.
+
+        Returns:
+            PointView: List-like view of the interior points.
+        """
+        previous_borders = self.borders
+        old_regions = list(self.region_polygons)
+        old_triangulations = self._triangulations
+        old_sequences = self._sequences
+        old_area = sum(poly.area for poly in old_regions)
+        # Region each interior point was labelled after, -1 for other labels
+        region_of_code = np.full(len(self.label_table), -1, dtype=np.int64)
+        old_codes = self.region_codes()
+        region_of_code[old_codes[old_codes >= 0]] = np.flatnonzero(old_codes >= 0)
+        interior = ~self.point_store.is_border
+        xy = self.point_store.xy[interior].copy()
+        old_index = region_of_code[self.point_store.labels[interior]]
+
+        self.borders = list(borders)
+        self.point_store.clear()
+        update = self._update_polygons(previous_borders)
+        if update is None:
+            self.process_polygons()
+            # Regions that did not change are found by their WKB
+            new_index = {shapely.to_wkb(poly): i for i, poly in enumerate(self.region_polygons)}
+            region_map = np.array([new_index.get(shapely.to_wkb(poly), -1) for poly in old_regions], dtype=np.int64)
+            changed_area = None
+        else:
+            changed_area, region_map = update
+            self._triangulations = {}
+            self._sequences = {}
+
+        # Keep the triangulations and sequences of the regions that did not change
+        unchanged = {j: i for j, i in enumerate(region_map.tolist())
+                     if i >= 0 and (changed_area is None or self.region_polygons[i] is old_regions[j])}
+        for (j, distance), region in old_triangulations.items():
+            if j in unchanged:
+                self._triangulations[(unchanged[j], distance)] = region
+        for (j, method), sequence in old_sequences.items():
+            if j in unchanged:
+                self._sequences[(unchanged[j], method)] = sequence
+
+        settings = self._generation or {}
+        boundary_distance = settings.get('boundary_distance', 1.0e-5)
+        # Points of a kept region farther than boundary_distance from the changed area stay where they are
+        region_index = np.append(region_map, -1)[old_index]
+        if changed_area is not None and not changed_area.is_empty and len(xy):
+            prepare(changed_area)
+            region_index[shapely.dwithin(changed_area, shapely.points(xy), boundary_distance)] = -1
+        tree = STRtree(self.region_polygons)
+        relocated = np.flatnonzero(region_index < 0)
+        region_index[relocated] = self._locate_interior(xy[relocated], boundary_distance, tree)
+        kept = region_index >= 0
+        if settings.get('method') == 'poisson' and len(self.point_store):
+            # Keep the minimum separation from the new boundary points
+            kept[kept] = ~GridIndex(self.point_store.xy).any_within(xy[kept], settings['spacing'])
+        self._append_region_points(xy[kept], region_index[kept])
+        if not len(xy):
+            return self.Points
+
+        if settings.get('method') == 'poisson':
+            # Dart throwing only adds points where there is room, which also closes the gaps left by
+            # the points dropped near the new boundary
+            coordinates, region_index = poisson_disk_sample(self.region_polygons, settings['spacing'],
+                                                            boundary_distance, fixed_points=self.xy,
+                                                            rng=np.random.default_rng(seed))
+            self._append_region_points(coordinates, region_index)
+            return self.Points
+
+        if changed_area is None:
+            added = unary_union([p.buffer(0) for p in self.region_polygons]).difference(
+                unary_union([p.buffer(0) for p in old_regions]))
+        elif changed_area.is_empty:
+            return self.Points
+        else:
+            # Outside the changed area the regions cover the same ground as before
+            added = _covered_area(self.region_polygons, tree, changed_area).difference(
+                _covered_area(old_regions, STRtree(old_regions), changed_area))
+        if not added.is_empty and added.area > 0.0:
+            self._fill_area(added, len(xy) / old_area if old_area > 0 else 0.0, settings, seed, tree)
         return self.Points
 
+    def _update_polygons(self, previous_borders):
+        """
+        Updates the polygons, the regions and the boundary points after the borders changed from
+        `previous_borders` to `borders`, redoing only the part of the geometry the change reaches.
+
+        `find_polygons` only runs on the borders linked to an added or removed border through shared
+        endpoints, and the other chains keep their polygons. The outer polygons are grouped by
+        overlap, and the regions of a group only depend on its outer polygons and on the holes: a group
+        whose outer polygons did not change has its regions patched inside the added and removed holes,
+        a group made of a single outer polygon that replaced another one is patched inside the difference
+        of the two, and any other new group is rebuilt alone. Boundary points are only tested again
+        close to the area where the regions changed.
+
+        Args:
+            previous_borders (list): The borders before the change.
+
+        Returns:
+            tuple: The area outside of which the regions did not change, and an int64 array with the new
+                   index of each previous region, or -1 for the removed and rebuilt ones. None when the
+                   chains of the previous geometry are not known, as after a cache hit.
+        """
+        state = self._geometry_state
+        if state is None:
+            return None
+        self.stats = {}
+        current = {id(border) for border in self.borders}
+        previous = {id(border) for border in previous_borders}
+        changed = ([border for border in previous_borders if id(border) not in current] +
+                   [border for border in self.borders if id(border) not in previous])
+
+        with self._stage('find_polygons') as record:
+            linked = _connected_borders(self.borders, changed, self.abs_tol)
+            touched = {id(border) for border in linked + changed}
+            found, junctions = find_polygons(linked, self.abs_tol, return_junctions=True)
+            chains = [chain for chain in state['chains'] if touched.isdisjoint(map(id, chain))]
+            chains += [tuple(chain) for chain in found]
+            self.junctions = [(point, borders) for point, borders in self.junctions
+                              if touched.isdisjoint(map(id, borders))] + junctions
+            record.update(borders=len(linked), polygons=len(found), junctions=len(junctions))
+
+        with self._stage('build_polygons') as record:
+            old_polygons = {_chain_key(chain): poly for chain, poly in zip(state['chains'], state['polygons'])}
+            keys = [_chain_key(chain) for chain in chains]
+            polygons = [old_polygons.get(key) for key in keys]
+            for i, chain in enumerate(chains):
+                if polygons[i] is None:
+                    polygons[i] = Polygon(np.concatenate([border.generate_points() for border in chain]))
+            dropped = {key: poly for key, poly in old_polygons.items() if key not in set(keys)}
+            added = {key: poly for key, poly in zip(keys, polygons) if key not in old_polygons}
+            record.update(dropped=len(dropped), added=len(added))
+
+        with self._stage('update_regions') as record:
+            outer_keys = [key for key, poly in zip(keys, polygons) if poly.exterior.is_ccw]
+            outers = [poly for poly in polygons if poly.exterior.is_ccw]
+            holes = [poly for poly in polygons if not poly.exterior.is_ccw]
+            hole_tree = STRtree(holes)
+            changed_holes = [poly for poly in list(dropped.values()) + list(added.values()) if not poly.exterior.is_ccw]
+            hole_change = unary_union(changed_holes) if changed_holes else None
+
+            old_regions, old_pieces = self.region_polygons, state['pieces']
+            old_members = defaultdict(list)
+            for j, group in enumerate(state['groups']):
+                old_members[group].append(j)
+            patched = {}  # Previous region index -> (region, piece, group)
+            rebuilt = []  # (regions, pieces, group) of the groups built again
+            changed_areas = []
+
+            def patch(members, area, pieces, group):
+                """Patches the regions of a previous group inside `area`, returns False if one cannot be patched."""
+                touched = [piece.intersects(area) for piece in pieces]
+                regions = [_patch_region(old_regions[j], piece, area, holes, hole_tree) if touches else old_regions[j]
+                           for j, piece, touches in zip(members, pieces, touched)]
+                if any(region is None for region in regions):
+                    return False
+                patched.update((j, (region, piece, group)) for j, region, piece in zip(members, regions, pieces))
+                if any(touched):
+                    changed_areas.append(area)
+                return True
+
+            for group in dict.fromkeys(_overlap_groups(outer_keys, outers) if outers else []):
+                members = old_members.pop(group, None)
+                if members is not None:
+                    # Same outer polygons: only the holes added or removed inside the group change its regions
+                    pieces = [old_pieces[j] for j in members]
+                    if patch(members, Polygon() if hole_change is None else hole_change, pieces, group):
+                        continue
+                    changed_areas += pieces
+                elif len(group) == 1 and next(iter(group)) in added:
+                    # A single outer polygon, e.g. an outline with a moved border, replacing a single other one
+                    new_outer = polygons[keys.index(next(iter(group)))]
+                    replaced = [old for old in old_members
+                                if len(old) == 1 and next(iter(old)) in dropped
+                                and dropped[next(iter(old))].intersects(new_outer)]
+                    if len(replaced) == 1:
+                        members = old_members.pop(replaced[0])
+                        area = dropped[next(iter(replaced[0]))].symmetric_difference(new_outer)
+                        if hole_change is not None:
+                            area = area.union(hole_change)
+                        if patch(members, area, [new_outer] * len(members), group):
+                            continue
+                        changed_areas += [old_pieces[j] for j in members]
+                group_outers = [poly for key, poly in zip(outer_keys, outers) if key in group]
+                pieces = resolve_multiple_overlaps(exclude_nested_polygons(group_outers))
+                nearby = np.unique(hole_tree.query(group_outers, predicate='intersects')[1]).tolist()
+                rebuilt.append((generate_regions(list(pieces), [holes[i] for i in nearby]), pieces, group))
+                changed_areas += group_outers
+            # Groups that are gone leave their area changed
+            for members in old_members.values():
+                changed_areas += [old_pieces[j] for j in members]
+
+            regions, pieces, groups = [], [], []
+            region_map = np.full(len(old_regions), -1, dtype=np.int64)
+            for j in range(len(old_regions)):
+                if j in patched:
+                    region_map[j] = len(regions)
+                    region, piece, group = patched[j]
+                    regions.append(region)
+                    pieces.append(piece)
+                    groups.append(group)
+            for group_regions, group_pieces, group in rebuilt:
+                regions += group_regions
+                pieces += group_pieces
+                groups += [group] * len(group_regions)
+            self.outer_polygons = self.region_polygons = regions
+            self.holes_polygons = holes
+            changed_area = unary_union(changed_areas) if changed_areas else Polygon()
+            record.update(patched=int((region_map >= 0).sum()), rebuilt=len(rebuilt), regions=len(regions))
+
+        with self._stage('boundary_filter') as record:
+            borders = [border for chain in chains for border in chain if border.is_border]
+            points = [border.generate_points() for border in borders]
+            lengths = [len(border_points) for border_points in points]
+            candidates = np.concatenate(points or [np.empty((0, 2))])
+            codes = np.concatenate([np.full(length, self.point_store.label_code(border.label), dtype=np.int32)
+                                    for border, length in zip(borders, lengths)] or [np.empty(0, dtype=np.int32)])
+            known = [state['masks'].get(id(border)) for border in borders]
+            on_boundary = np.concatenate([np.zeros(length, dtype=bool) if mask is None else mask
+                                          for mask, length in zip(known, lengths)] or [np.empty(0, dtype=bool)])
+            # Points of new borders, and points close to the changed area, are tested again
+            check = np.repeat([mask is None for mask in known], lengths).astype(bool)
+            if not changed_area.is_empty and len(candidates):
+                check |= boundary_point_mask(changed_area, candidates, self.abs_tol)
+            if check.any():
+                # The union of the regions clipped to a window around the tested points, which leaves
+                # the boundary within abs_tol of them unchanged
+                margin = 4 * self.abs_tol
+                window = (*(candidates[check].min(axis=0) - margin), *(candidates[check].max(axis=0) + margin))
+                nearby = STRtree(regions).query(shapely.box(*window), predicate='intersects')
+                local = unary_union([shapely.clip_by_rect(regions[i], *window).buffer(0) for i in sorted(nearby.tolist())])
+                on_boundary[check] = (boundary_point_mask(local.boundary, candidates[check], self.abs_tol)
+                                      if not local.is_empty else False)
+            self.point_store.append(candidates[on_boundary], codes[on_boundary], True)
+            record.update(candidates=len(candidates), tested=int(check.sum()), kept=int(on_boundary.sum()))
+
+        masks = np.split(on_boundary, np.cumsum(lengths)[:-1]) if lengths else []
+        self._geometry_state = {
+            'chains': chains, 'polygons': polygons, 'pieces': pieces, 'groups': groups,
+            'masks': {id(border): mask for border, mask in zip(borders, masks)},
+        }
+        return changed_area, region_map
+
+    def _locate_interior(self, xy, boundary_distance, tree):
+        """Index of the region holding each point farther than `boundary_distance` from its boundary, or -1."""
+        region_index = np.full(len(xy), -1, dtype=np.int64)
+        if not len(xy) or not self.region_polygons:
+            return region_index
+        points = shapely.points(xy)
+        point_index, candidate = tree.query(points, predicate='within')
+        lines = np.empty(len(self.region_polygons), dtype=object)
+        used = np.unique(candidate)
+        lines[used] = [self.region_polygons[i].boundary for i in used.tolist()]
+        prepare(lines[used])
+        far = ~shapely.dwithin(lines[candidate], points[point_index], boundary_distance)
+        point_index, candidate = point_index[far], candidate[far]
+        # The first region holding a point wins, as in `locate_regions`
+        order = np.lexsort((-candidate, point_index))
+        region_index[point_index[order]] = candidate[order]
+        return region_index
+
+    def _fill_area(self, area, uniform_density, settings, seed, tree):
+        """Draws interior points in `area` following the settings of the last generate_points call."""
+        nearby = np.sort(tree.query(area, predicate='intersects'))
+        pieces = [self.region_polygons[i].intersection(area) for i in nearby.tolist()]
+        boundary_distance = settings.get('boundary_distance', 1.0e-5)
+        method = settings.get('method', 'rejection')
+        spacing = settings.get('spacing')
+
+        density_seed, sampling_seed = np.random.SeedSequence(seed).spawn(2)
+        envelopes = None
+        if callable(spacing):
+            def density(x, y):
+                return 1.0 / spacing(x, y) ** 2
+            envelopes = [DensityEnvelope(piece.buffer(-boundary_distance), density) for piece in pieces]
+            counts = [settings['scale'] * envelope.integral(rng=np.random.default_rng(child))
+                      for envelope, child in zip(envelopes, density_seed.spawn(len(envelopes)))]
+        else:
+            counts = [uniform_density * piece.area for piece in pieces]
+        allocation = [int(round(count)) if piece.buffer(-boundary_distance).area > 0.0 else 0
+                      for piece, count in zip(pieces, counts)]
+        coordinates, piece_index = sample_points_in_regions(pieces, allocation, boundary_distance,
+                                                            seed=sampling_seed, method=method, envelopes=envelopes)
+        self._append_region_points(coordinates, nearby[piece_index])
+
+    def save(self, path):
+        """
+        Writes the points of the mesh, see `mesh_io.save_points`.
+
+        Args:
+            path (str): An .npz file, or a directory that receives one raw .npy file per column.
+        """
+        save_points(path, self.point_store)
+
+    def load(self, path):
+        """
+        Replaces the points of the mesh with the ones written by `save`. The geometry is not stored and
+        still comes from the borders of the mesh.
+
+        Args:
+            path (str): An .npz file or a directory written by `save` or `save_streaming`.
+
+        Returns:
+            RBFMesh: The mesh itself.
+        """
+        points = load_points(path)
+        self.point_store = points if isinstance(points, PointStore) else points.to_store()
+        return self
+
+    def save_streaming(self, directory, num_points, chunk_size=DEFAULT_TASK_SIZE, append=False, **kwargs):
+        """
+        Writes the border points and `num_points` new interior points to a directory, one block at a time.
+
+        The interior points come from `iter_points` and go straight to disk, so the mesh never holds
+        them. Interior points already generated in the mesh are not written. The result can be opened without copies with ``mesh_io.load_points(directory)``.
+
+        Args:
+            directory (str): Destination directory.
+            num_points (int): Number of interior points to generate.
+            chunk_size (int, optional): Largest number of points in a block. Defaults to 200000.
+            append (bool, optional): Whether to add the new interior points to an existing directory
+                                     instead of writing the border points. Labels missing from the table of
+                                     the directory are added to it. Defaults to False.
+            **kwargs: Options passed to `iter_points`, such as `method`, `spacing` or `seed`.
+
+        Returns:
+            int: Number of points in the directory.
+        """
+        with PointFileWriter(directory, label_table=self.label_table, append=append) as writer:
+            if not append:
+                # Only the border points: interior points already held by the mesh are not part of the new set
+                border = self.is_border
+                writer.append(self.xy[border], self.labels[border], True)
+            for coordinates, codes in self.iter_points(num_points, chunk_size=chunk_size, **kwargs):
+                writer.append(coordinates, codes, False)
+            return len(writer)
+
+    def boundary_spacing(self, h_min, h_max, width=None):
+        """
+        Builds a spacing function that refines the nodes near the boundary.
+
+        Args:
+            h_min (float): Spacing on the boundary of the regions.
+            h_max (float): Spacing far from the boundary.
+            width (float, optional): Distance over which the spacing grows from `h_min` to `h_max`.
+                                     Defaults to ``10 * h_max``.
+
+        Returns:
+            BoundaryDistanceSpacing: Vectorized spacing function to pass as `spacing` to `generate_points`.
+        """
+        boundary = unary_union([p.buffer(0) for p in self.region_polygons]).boundary
+        return BoundaryDistanceSpacing(boundary, h_min, h_max, 10 * h_max if width is None else width)
+
+    def region_codes(self):
+        """
+        Returns the label code of the interior points of each region, without changing the label table.
+
+        Interior points are labelled 'region i' after the i-th region they belong to.
+
+        Returns:
+            numpy.ndarray: int32 array with the code of each region in `label_table`, or -1 for a region
+                           whose label is not in the table yet, as before its first points are generated.
+        """
+        return np.array([self.point_store.find_label_code(f'region {i + 1}')
+                         for i in range(len(self.region_polygons))], dtype=np.int32)
+
+    def _append_region_points(self, coordinates, region_index):
+        """Stores interior points labelled 'region i' after the region they belong to."""
+        self.point_store.append(coordinates, self._region_codes()[region_index], False)
+
+    def _region_codes(self):
+        """Returns the label code of each region, 'region i' for the i-th one."""
+        return np.array([self.point_store.label_code(f'region {i + 1}')
+                         for i in range(len(self.region_polygons))], dtype=np.int32)
+
+
+def polygonal_part(geometry, min_area=0.0):
+    """
+    Keeps the polygons of a geometry whose area exceeds `min_area`, dropping lines, points and slivers.
+
+    Args:
+        geometry (shapely.geometry.base.BaseGeometry): Result of an overlay, such as a GeometryCollection.
+        min_area (float, optional): Largest area of the dropped polygons. Defaults to 0.0.
+
+    Returns:
+        shapely.geometry.Polygon or shapely.geometry.MultiPolygon: The kept polygons, or None when there
+        are none.
+    """
+    parts = [part for part in shapely.get_parts(geometry) if part.geom_type == 'Polygon' and part.area > min_area]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else MultiPolygon(parts)
+
 
 def resolve_multiple_overlaps(polygons):
     """
@@ -131,37 +958,49 @@ def resolve_multiple_overlaps(polygons):
     This method ensures that intersections are only counted once by subtracting the cumulative
     intersection areas found in previous steps from the current calculations.
 
+    Polygons are indexed in a `shapely.STRtree`, so each polygon is only combined with the
+    polygons it actually intersects and with the intersections those polygons already claimed.
+
     Args:
         polygons (list of shapely.geometry.Polygon): List of Polygon objects that might overlap.
 
     Returns:
         list of shapely.geometry.Polygon: List of disjoint Polygon objects including unique areas and individual intersection areas without duplicates.
+                                          Pieces with no area, or below SLIVER_AREA times the area of their polygon, are left out.
     """
     unique_areas = []  # List to hold unique areas of each polygon
     intersections = []  # List to hold intersections
+    claimed = [None] * len(polygons)  # Intersection area claimed by each polygon
 
-    # First, calculate the union of all polygons to get the complete coverage area
+    tree = STRtree(polygons)
     for i, polygon in enumerate(polygons):
-        # Calculate the intersection with the union of all other polygons
-        others = [p for j, p in enumerate(polygons) if j != i]
-        if others:
-            union_of_others = unary_union(others)
-            intersections_union = unary_union(intersections) if intersections else None
-
-            # Calculate the new intersection, ensuring no double-counting
-            new_intersection = polygon.intersection(union_of_others)
-            if intersections_union:
-                new_intersection = new_intersection.difference(intersections_union)
-
-            unique_area = polygon.difference(union_of_others)
-
-            if not new_intersection.is_empty:
-                intersections.append(new_intersection)
-            if not unique_area.is_empty:
-                unique_areas.append(unique_area)
-        else:
-            # If no other polygons, the polygon itself is unique
+        # Only the polygons that intersect this one contribute to its intersection and difference
+        neighbours = sorted(j for j in tree.query(polygon, predicate='intersects').tolist() if j != i)
+        if not neighbours:
+            # If no other polygons overlap, the polygon itself is unique
             unique_areas.append(polygon)
+            continue
+
+        union_of_others = unary_union([polygons[j] for j in neighbours])
+        previous = [claimed[j] for j in neighbours if j < i and claimed[j] is not None]
+
+        # Calculate the new intersection, ensuring no double-counting
+        new_intersection = polygon.intersection(union_of_others)
+        if previous:
+            new_intersection = new_intersection.difference(unary_union(previous))
+
+        unique_area = polygon.difference(union_of_others)
+
+        if not new_intersection.is_empty:
+            claimed[i] = new_intersection
+        # Overlays leave rounding slivers and the lines where polygons touch, which are not regions
+        min_area = SLIVER_AREA * polygon.area
+        new_intersection = polygonal_part(new_intersection, min_area)
+        unique_area = polygonal_part(unique_area, min_area)
+        if new_intersection is not None:
+            intersections.append(new_intersection)
+        if unique_area is not None:
+            unique_areas.append(unique_area)
 
     # Combine unique areas and non-duplicated intersections into a single list
     result = unique_areas + intersections
@@ -173,6 +1012,8 @@ def exclude_nested_polygons(outer_polygons):
     """
     refactor the nested polygons into disjoint polygons.
 
+    Containment candidates come from a `shapely.STRtree` query instead of an all-pairs loop.
+
     Args:
         outer_polygons (list): List of outer Polygon objects.
 
@@ -181,26 +1022,66 @@ def exclude_nested_polygons(outer_polygons):
     """
     # Sort polygons by area in descending order to handle larger polygons first
     outer_polygons = sorted(outer_polygons, key=lambda p: abs(p.area), reverse=True)
+    tree = STRtree(outer_polygons)
     for i in range(len(outer_polygons)):
-        for j in range(i + 1, len(outer_polygons)):
-            if outer_polygons[i].contains(outer_polygons[j]):
+        # Polygons contained in the original outline; the outline shrinks as nested polygons are removed
+        for j in sorted(tree.query(outer_polygons[i], predicate='contains').tolist()):
+            if j > i and outer_polygons[i].contains(outer_polygons[j]):
                 outer_polygons[i] = outer_polygons[i].difference(outer_polygons[j])
     return outer_polygons
 
 
-def calculate_point_allocation(region_polygons, num_points):
+def boundary_point_mask(boundary_line, points, abs_tol):
+    """
+    Flags the points lying closer than `abs_tol` to a boundary line, in one vectorized query.
+
+    Args:
+        boundary_line (shapely.geometry.base.BaseGeometry): The boundary, prepared in place.
+        points (numpy.ndarray): Array of shape (n, 2) with the candidate points.
+        abs_tol (float): Absolute tolerance. Points at exactly `abs_tol` are rejected.
+
+    Returns:
+        numpy.ndarray: Boolean mask of the points on the boundary.
+    """
+    prepare(boundary_line)
+    # dwithin tests distance <= tolerance, the largest double below abs_tol makes it distance < abs_tol
+    return shapely.dwithin(boundary_line, shapely.points(points), np.nextafter(abs_tol, 0.0))
+
+
+def calculate_point_allocation(region_polygons, num_points, weights=None):
     """
     Calculates the point allocation for each region_polygons based on their area.
 
+    Quotas are rounded with the largest remainder method, so the allocation always adds up to `num_points`.
+
     Args:
         region_polygons (list): List of outer Polygon objects.
         num_points (int): Number of points to allocate.
+        weights (list, optional): Weight of each region, such as its integrated node density,
+                                  used instead of the area. Defaults to the areas.
 
     Returns:
         list: List of integers representing the point allocation for each outer polygon.
+
+    Raises:
+        ValueError: If `num_points` is negative.
+        DegenerateRegionError: If the regions have no area.
     """
-    total_area = sum(poly.area for poly in region_polygons)
-    return [int((poly.area / total_area) * num_points) for poly in region_polygons]
+    if num_points < 0:
+        raise ValueError(f'Cannot allocate a negative number of points: {num_points}')
+    if weights is None:
+        weights = [poly.area for poly in region_polygons]
+    weights = np.asarray(weights, dtype=np.float64)
+    total_weight = weights.sum()
+    if not total_weight > 0.0:
+        raise DegenerateRegionError(f'Cannot allocate {num_points} points: the regions have no area')
+
+    # Largest remainder: truncate the quotas, then give the missing points to the largest remainders
+    quotas = weights / total_weight * num_points
+    allocation = np.floor(quotas).astype(np.int64)
+    missing = int(num_points - allocation.sum())
+    allocation[np.argsort(allocation - quotas, kind='stable')[:missing]] += 1
+    return allocation.tolist()
 
 
 def generate_regions(outer_polygons, hole_polygons):
@@ -231,34 +1112,128 @@ def generate_regions(outer_polygons, hole_polygons):
     return outer_polygons
 
 
-def generate_points_within_polygons(region_polygons, points_allocation, boundary_distance=1.0e-5):
+def generate_points_within_polygons(region_polygons, points_allocation, boundary_distance=1.0e-5, seed=None,
+                                    workers=None, method='rejection'):
     """
     Generates random points within the outer polygons.
 
+    Candidates are drawn in NumPy blocks and tested with vectorized shapely predicates,
+    see `sampling.sample_points_in_regions`.
+
     Args:
         region_polygons (list): List of outer Polygon objects.
         points_allocation (list): List of integers representing the point allocation for each outer polygon.
         boundary_distance (float, optional): Distance to buffer the polygons. Defaults to 1.0e-5.
+        seed (int, optional): Seed of the random streams. Defaults to fresh entropy.
+        workers (int, optional): Number of threads drawing the points. Defaults to a single thread.
+        method (str, optional): 'rejection', 'triangulate', 'halton' or 'sobol', see
+                                `sampling.sample_points_in_regions`. Defaults to 'rejection'.
 
     Returns:
         list: List of generated MeshPoint objects.
     """
-    points = []
-    total_points_generated = 0
+    coordinates, region_index = sample_points_in_regions(region_polygons, points_allocation, boundary_distance,
+                                                         seed=seed, method=method, workers=workers)
+    return [MeshPoint(x, y, f'region {i + 1}', False)
+            for (x, y), i in zip(coordinates.tolist(), region_index.tolist())]
+
+
+def _chain_key(chain):
+    """Identifies a chain of borders returned by `find_polygons` by the borders it links, in order."""
+    return tuple(id(border) for border in chain)
+
+
+def _connected_borders(borders, changed, tolerance):
+    """
+    Finds the borders linked to an endpoint of the `changed` borders through borders sharing endpoints.
+
+    `find_polygons` only links borders whose endpoints are closer than `tolerance`, so running it on these
+    borders gives the same chains as running it on all of them, for the chains that involve them.
 
-    for i, (poly, num_pts) in enumerate(zip(region_polygons, points_allocation)):
-        poly = poly.buffer(-boundary_distance)  # Apply a buffer to slightly shrink the polygon
-        prepare(poly)  # Optional: prepare the polygon for faster operations if supported
-        target_points_count = total_points_generated + num_pts
-        min_x, min_y, max_x, max_y = poly.bounds
+    Args:
+        borders (list): Border objects to search.
+        changed (list): Border objects whose endpoints start the search. They need not be in `borders`.
+        tolerance (float): The tolerance for distance comparison.
 
-        while len(points) < target_points_count:
-            x = random.uniform(min_x, max_x)
-            y = random.uniform(min_y, max_y)
-            point = Point(x, y)
-            if poly.contains_properly(point):
-                points.append(MeshPoint(x, y, f'region {i + 1}', False))
+    Returns:
+        list: The linked borders, in the order of `borders`.
+    """
+    endpoints = [point for border in borders for point in (border.start_point, border.end_point)]
+    index = EndpointIndex(endpoints, tolerance)
+    reached = [False] * len(borders)
+    pending = [point for border in changed for point in (border.start_point, border.end_point)]
+    while pending:
+        for i in index.query(pending.pop()):
+            linked = i // 2
+            if not reached[linked]:
+                reached[linked] = True
+                pending += endpoints[2 * linked:2 * linked + 2]
+    return [border for border, linked in zip(borders, reached) if linked]
+
+
+def _overlap_groups(keys, polygons):
+    """
+    Groups polygons connected through intersections, which `exclude_nested_polygons` and
+    `resolve_multiple_overlaps` only ever combine with each other.
+
+    Args:
+        keys (list): Key of each polygon.
+        polygons (list): The polygons.
+
+    Returns:
+        list: The frozenset of the keys of the group of each polygon.
+    """
+    parent = list(range(len(polygons)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*STRtree(polygons).query(polygons, predicate='intersects').tolist()):
+        parent[root(i)] = root(j)
+    members = defaultdict(list)
+    for i, key in enumerate(keys):
+        members[root(i)].append(key)
+    groups = {i: frozenset(group) for i, group in members.items()}
+    return [groups[root(i)] for i in range(len(polygons))]
+
+
+def _region_groups(keys, outers, regions):
+    """
+    Finds the group of outer polygons, see `_overlap_groups`, that each region was cut from.
+
+    Returns:
+        list: The frozenset of the keys of the group of each region, or None if a region lies in no outer polygon.
+    """
+    groups = _overlap_groups(keys, outers)
+    region_index, outer_index = STRtree(outers).query(shapely.point_on_surface(regions), predicate='intersects')
+    first = {}
+    for i, j in zip(region_index.tolist(), outer_index.tolist()):
+        first.setdefault(i, j)
+    if len(first) < len(regions):
+        return None
+    return [groups[first[i]] for i in range(len(regions))]
+
+
+def _patch_region(region, piece, area, holes, hole_tree):
+    """
+    Redoes a region inside `area`: the part of its outer piece there, minus the holes, replaces the old part.
+
+    Returns:
+        shapely.geometry.base.BaseGeometry: The patched region, or None when it comes out empty or invalid,
+        where `generate_regions` would have kept the hole out, so that the region has to be rebuilt.
+    """
+    inside = piece.intersection(area)
+    nearby = hole_tree.query(area, predicate='intersects')
+    if len(nearby):
+        inside = inside.difference(unary_union([holes[i] for i in sorted(nearby.tolist())]))
+    patched = region.difference(area).union(inside)
+    return None if patched.is_empty or not patched.is_valid else patched
 
-        total_points_generated += num_pts
 
-    return points
+def _covered_area(regions, tree, area):
+    """Union of the parts of the regions inside `area`, using the STRtree of the regions."""
+    nearby = tree.query(area, predicate='intersects')
+    return unary_union([regions[i].intersection(area) for i in sorted(nearby.tolist())])
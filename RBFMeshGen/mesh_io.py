@@ -0,0 +1,322 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from .point_store import PointStore
+
+# Columns of the memory-mapped layout, one raw .npy file each
+COLUMNS = {'x': '<f8', 'y': '<f8', 'labels': '<i4', 'is_border': '|b1'}
+
+# Name of the label table file of the memory-mapped layout
+LABEL_TABLE_FILE = 'label_table.json'
+
+# Size in bytes of the .npy headers written by PointFileWriter. Fixing it lets the header be
+# rewritten in place as the files grow.
+NPY_HEADER_SIZE = 128
+
+
+def _npy_header(dtype, length):
+    """Returns a version 1.0 .npy header of exactly NPY_HEADER_SIZE bytes for a 1-D array."""
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False,
+                   'shape': (length,)})
+    header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + '\n'
+    return np.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def _encode_label(label):
+    """Converts a label to JSON types, writing tuples as lists and numpy scalars as Python scalars."""
+    if isinstance(label, np.generic):
+        label = label.item()
+    if isinstance(label, tuple):
+        return [_encode_label(item) for item in label]
+    if label is None or isinstance(label, (str, bool, int, float)):
+        return label
+    raise TypeError(f'Label {label!r} of type {type(label).__name__} cannot be saved: labels must be str, int, '
+                    f'float, bool, None or tuples of them')
+
+
+def _decode_label(label):
+    # Lists are not hashable and so never labels: they are the saved tuples
+    return tuple(_decode_label(item) for item in label) if isinstance(label, list) else label
+
+
+def _encode_labels(label_table):
+    """
+    Encodes a label table as JSON, keeping tuple labels apart from the other types.
+
+    Raises:
+        TypeError: If a label is not a str, int, float, bool, None or a tuple of them.
+    """
+    return json.dumps([_encode_label(label) for label in label_table])
+
+
+def _decode_labels(text):
+    """Decodes a label table written by `_encode_labels`."""
+    return [_decode_label(label) for label in json.loads(text)]
+
+
+def save_npz(path, store, compressed=False):
+    """
+    Writes a point set to a NumPy .npz archive.
+
+    Args:
+        path (str): Destination file.
+        store (PointStore or MappedPoints): The points.
+        compressed (bool, optional): Whether to compress the archive. Defaults to False.
+
+    Raises:
+        TypeError: If a label is not a str, int, float, bool, None or a tuple of them.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    label_table = _encode_labels(store.label_table)
+    save(path, x=np.asarray(store.x, dtype='<f8'), y=np.asarray(store.y, dtype='<f8'),
+         labels=np.asarray(store.labels, dtype='<i4'), is_border=np.asarray(store.is_border, dtype=bool),
+         label_table=np.array(label_table))
+
+
+def load_npz(path):
+    """
+    Reads a point set written by `save_npz`.
+
+    Args:
+        path (str): The .npz file.
+
+    Returns:
+        PointStore: The points.
+    """
+    with np.load(path) as data:
+        return PointStore.from_arrays(np.column_stack((data['x'], data['y'])), data['labels'], data['is_border'],
+                                      _decode_labels(str(data['label_table'])))
+
+
+class PointFileWriter:
+    def __init__(self, directory, label_table=None, append=False):
+        """
+        Writes a point set to a directory of raw .npy columns, one block at a time.
+
+        The directory holds ``x.npy``, ``y.npy``, ``labels.npy``, ``is_border.npy`` and the label table
+        as JSON. Blocks are appended at the end of each column and the fixed-size headers are rewritten
+        after every block, so the files are always valid and can be opened with `load_points` while
+        they grow.
+
+        When appending, a `label_table` that starts with the table of the directory is written as is.
+        Any other table is merged into the table of the directory: its new labels are added at the end
+        and the codes of the appended blocks are translated accordingly.
+
+        Args:
+            directory (str): Destination directory, created if needed.
+            label_table (list, optional): Labels referenced by the label codes. The list is written again
+                                          after every block, so passing ``mesh.label_table`` keeps labels
+                                          registered while streaming. Defaults to an empty table, or to
+                                          the table of the directory when appending.
+            append (bool, optional): Whether to continue the files of an existing directory. Defaults to False.
+
+        Raises:
+            ValueError: If the directory was not written by PointFileWriter.
+            TypeError: If a label is not a str, int, float, bool, None or a tuple of them.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.length = 0
+        # Codes of the labels of `label_table` in the written table, when the two differ
+        self._source = None
+        self._codes = None
+        self._label_codes = None
+        if append and os.path.exists(os.path.join(directory, 'x.npy')):
+            existing = load_points(directory)
+            if any(column.offset != NPY_HEADER_SIZE for column in existing.columns.values()):
+                raise ValueError(f"'{directory}' was not written by PointFileWriter and cannot be appended to")
+            self.length = len(existing)
+            if label_table is None:
+                label_table = existing.label_table
+            elif list(label_table[:len(existing.label_table)]) != existing.label_table:
+                self._source, label_table = label_table, list(existing.label_table)
+                self._codes = []
+                self._label_codes = {label: code for code, label in enumerate(label_table)}
+            del existing
+        self.label_table = [] if label_table is None else label_table
+        self._files = {}
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(directory, f'{name}.npy')
+            handle = open(path, 'r+b' if self.length else 'w+b')
+            handle.seek(NPY_HEADER_SIZE + self.length * np.dtype(dtype).itemsize)
+            self._files[name] = handle
+        self._flush_headers()
+
+    def __len__(self):
+        return self.length
+
+    def append(self, xy, codes, is_border):
+        """
+        Appends a block of points.
+
+        Args:
+            xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+            codes (int or numpy.ndarray): Label code of every point, or a single code for the whole block.
+            is_border (bool or numpy.ndarray): Border status of every point, or a single value for the block.
+
+        Raises:
+            ValueError: If the codes are merged into the table of an existing directory and one of them is
+                        not a code of `label_table`.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        n = len(xy)
+        if self._source is not None:
+            codes = self._translate(codes)
+        columns = {'x': xy[:, 0], 'y': xy[:, 1], 'labels': np.broadcast_to(codes, n),
+                   'is_border': np.broadcast_to(is_border, n)}
+        for name, dtype in COLUMNS.items():
+            self._files[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        self.length += n
+        self._flush_headers()
+
+    def _merge_labels(self):
+        """Adds the labels registered in the caller's label table since the last call to the written table."""
+        for label in self._source[len(self._codes):]:
+            code = self._label_codes.get(label)
+            if code is None:
+                code = self._label_codes[label] = len(self.label_table)
+                self.label_table.append(label)
+            self._codes.append(code)
+
+    def _translate(self, codes):
+        """Maps codes of the caller's label table to codes of the written table."""
+        self._merge_labels()
+        codes = np.asarray(codes)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(self._codes)):
+            raise ValueError(f'Label codes must be between 0 and {len(self._codes) - 1}')
+        return np.asarray(self._codes, dtype=np.int32)[codes]
+
+    def _flush_headers(self):
+        if self._source is not None:
+            self._merge_labels()
+        for name, dtype in COLUMNS.items():
+            handle = self._files[name]
+            position = handle.tell()
+            handle.seek(0)
+            handle.write(_npy_header(dtype, self.length))
+            handle.seek(position)
+            handle.flush()
+        label_table = _encode_labels(self.label_table)
+        with open(os.path.join(self.directory, LABEL_TABLE_FILE), 'w') as handle:
+            handle.write(label_table)
+
+    def close(self):
+        """Writes the final headers and closes the files."""
+        if self._files:
+            self._flush_headers()
+            for handle in self._files.values():
+                handle.close()
+            self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MappedPoints:
+    def __init__(self, directory, mmap_mode='r'):
+        """
+        Point set opened from a directory written by `PointFileWriter`, without copying the columns.
+
+        Exposes the same column attributes as PointStore, backed by `numpy.memmap` arrays, so other
+        processes can share a large node set through the page cache.
+
+        Args:
+            directory (str): Directory holding the columns.
+            mmap_mode (str, optional): Memory-map mode passed to `numpy.load`. Defaults to 'r'.
+
+        Attributes:
+            columns (dict): The memory-mapped columns by name.
+            label_table (list): Labels referenced by the integer label codes.
+        """
+        self.directory = directory
+        self.columns = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                        for name in COLUMNS}
+        with open(os.path.join(directory, LABEL_TABLE_FILE)) as handle:
+            self.label_table = _decode_labels(handle.read())
+
+    def __len__(self):
+        return len(self.columns['x'])
+
+    @property
+    def x(self):
+        """numpy.memmap: The x coordinates."""
+        return self.columns['x']
+
+    @property
+    def y(self):
+        """numpy.memmap: The y coordinates."""
+        return self.columns['y']
+
+    @property
+    def xy(self):
+        """numpy.ndarray: (n, 2) array with the coordinates. Unlike the columns, it is a copy."""
+        return np.column_stack((self.x, self.y))
+
+    @property
+    def labels(self):
+        """numpy.memmap: The int32 label codes."""
+        return self.columns['labels']
+
+    @property
+    def is_border(self):
+        """numpy.memmap: The boolean border mask."""
+        return self.columns['is_border']
+
+    def decoded_labels(self, codes=None):
+        """
+        Translates label codes back into the original labels.
+
+        Args:
+            codes (numpy.ndarray, optional): Codes to translate. Defaults to all the stored labels.
+
+        Returns:
+            list: The labels of the points.
+        """
+        codes = self.labels if codes is None else codes
+        return [self.label_table[code] for code in np.asarray(codes).tolist()]
+
+    def to_store(self):
+        """
+        Copies the points into memory.
+
+        Returns:
+            PointStore: The points.
+        """
+        return PointStore.from_arrays(self.xy, self.labels, self.is_border, self.label_table)
+
+
+def save_points(path, store):
+    """
+    Writes a point set as an .npz archive when `path` ends with '.npz', or as a directory of raw .npy columns.
+
+    Args:
+        path (str): Destination file or directory.
+        store (PointStore or MappedPoints): The points.
+    """
+    if str(path).endswith('.npz'):
+        save_npz(path, store)
+        return
+    with PointFileWriter(path, label_table=store.label_table) as writer:
+        writer.append(np.column_stack((store.x, store.y)), store.labels, store.is_border)
+
+
+def load_points(path, mmap_mode='r'):
+    """
+    Reads a point set written by `save_points` or `PointFileWriter`.
+
+    Args:
+        path (str): An .npz file or a directory of raw .npy columns.
+        mmap_mode (str, optional): Memory-map mode of the columns of a directory. Defaults to 'r'.
+
+    Returns:
+        PointStore or MappedPoints: The points, in memory for an .npz file and memory-mapped for a directory.
+    """
+    if os.path.isdir(path):
+        return MappedPoints(path, mmap_mode)
+    return load_npz(path)
@@ -0,0 +1,174 @@
+import numpy as np
+
+from .mesh_generation import calculate_point_allocation
+from .sampling import sample_points_in_regions
+from .spatial_index import GridIndex
+from .stencils import node_coordinates
+
+
+def nearest_neighbour_distances(nodes, index=None, chunk_size=1_000_000):
+    """
+    Distance from each node to the closest other node, the local spacing of the node set.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        index (GridIndex, optional): Index over the same nodes, reused instead of building one.
+        chunk_size (int, optional): Number of nodes queried at once. Defaults to 1000000.
+
+    Returns:
+        numpy.ndarray: Float array with one distance per node, inf for a node set of one node.
+    """
+    xy = node_coordinates(nodes)
+    index = GridIndex(xy) if index is None else index
+    return index.nearest_distance(chunk_size=chunk_size)
+
+
+def separation_distance(nodes, spacing=None):
+    """
+    Separation distance q = min |x_i - x_j| / 2 over the pairs of distinct nodes.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        spacing (numpy.ndarray, optional): The `nearest_neighbour_distances` of the nodes, when known.
+
+    Returns:
+        float: The separation distance, inf for fewer than two nodes.
+    """
+    spacing = nearest_neighbour_distances(nodes) if spacing is None else spacing
+    return float(spacing.min()) / 2 if len(spacing) else np.inf
+
+
+def fill_distance(nodes, region_polygons, num_probes=1_000_000, seed=None, index=None, chunk_size=1_000_000):
+    """
+    Estimates the fill distance h = sup over the domain of the distance to the closest node.
+
+    The supremum is taken over uniform probe points drawn inside the regions, allocated by area, so
+    the estimate is a lower bound that tightens as `num_probes` grows.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        region_polygons (list): Region Polygon objects making up the domain.
+        num_probes (int, optional): Number of probe points. Defaults to 1000000.
+        seed (int, optional): Seed of the probe points. Defaults to fresh entropy.
+        index (GridIndex, optional): Index over the same nodes, reused instead of building one.
+        chunk_size (int, optional): Number of probes queried at once. Defaults to 1000000.
+
+    Returns:
+        float: The estimated fill distance, 0.0 when no probe is drawn.
+    """
+    xy = node_coordinates(nodes)
+    index = GridIndex(xy) if index is None else index
+    probes, _ = sample_points_in_regions(region_polygons, calculate_point_allocation(region_polygons, num_probes),
+                                         boundary_distance=0.0, seed=seed)
+    if not len(probes):
+        return 0.0
+    return float(index.nearest_distance(probes, chunk_size=chunk_size).max())
+
+
+def mesh_ratio(fill, separation):
+    """
+    Mesh ratio h / q, which is 1 for the most even node sets and grows with clustering and gaps.
+
+    Args:
+        fill (float): The fill distance.
+        separation (float): The separation distance.
+
+    Returns:
+        float: The mesh ratio, inf when the separation distance is 0.
+    """
+    return fill / separation if separation > 0 else np.inf
+
+
+def spacing_histograms(spacing, region_index, num_regions, bins=32, bin_edges=None):
+    """
+    Histograms of the local spacing of the nodes of each region, on shared bins.
+
+    Args:
+        spacing (numpy.ndarray): Local spacing of each node.
+        region_index (numpy.ndarray): Region of each node. Nodes with a negative index are left out.
+        num_regions (int): Number of regions.
+        bins (int, optional): Number of bins. Defaults to 32.
+        bin_edges (numpy.ndarray, optional): Edges of the bins. Defaults to `bins` equal bins between
+                                             0 and the largest finite spacing.
+
+    Returns:
+        tuple: An (num_regions, bins) integer array of counts and the bin edges.
+    """
+    spacing = np.asarray(spacing, dtype=np.float64)
+    region_index = np.asarray(region_index)
+    counted = (region_index >= 0) & np.isfinite(spacing)
+    if bin_edges is None:
+        upper = float(spacing[counted].max()) if counted.any() else 1.0
+        bin_edges = np.linspace(0.0, upper if upper > 0 else 1.0, bins + 1)
+    bins = len(bin_edges) - 1
+    column = np.clip(np.searchsorted(bin_edges, spacing[counted], side='right') - 1, 0, bins - 1)
+    counts = np.bincount(region_index[counted] * bins + column, minlength=num_regions * bins)
+    return counts.reshape(num_regions, bins), bin_edges
+
+
+def mesh_quality(mesh, num_probes=None, bins=32, seed=None, chunk_size=1_000_000):
+    """
+    Quality metrics of the node set of a mesh, cheap enough to gate mesh generation.
+
+    All the nodes, border points included, are indexed once in a GridIndex that serves both the
+    nearest-neighbour distances of the nodes and the fill distance probes, so the cost grows linearly
+    with the number of nodes and probes.
+
+    Args:
+        mesh (RBFMesh): The mesh, with its points generated.
+        num_probes (int, optional): Number of probe points of the fill distance. Defaults to one per node,
+                                    between 10000 and 1000000.
+        bins (int, optional): Number of bins of the spacing histograms. Defaults to 32.
+        seed (int, optional): Seed of the probe points. Defaults to fresh entropy.
+        chunk_size (int, optional): Number of nodes or probes queried at once. Defaults to 1000000.
+
+    Returns:
+        dict: The 'nodes' and 'probes' counts, the 'separation_distance', 'fill_distance' and 'mesh_ratio',
+              the 'min_spacing', 'mean_spacing' and 'max_spacing' of all the nodes, the 'bin_edges' of the
+              histograms and, under 'regions', one dict per region with the number of its interior 'nodes',
+              their 'min_spacing', 'mean_spacing', 'max_spacing' and spacing 'histogram'.
+    """
+    xy = node_coordinates(mesh)
+    if num_probes is None:
+        num_probes = int(np.clip(len(xy), 10_000, 1_000_000))
+    index = GridIndex(xy)
+    spacing = nearest_neighbour_distances(xy, index, chunk_size)
+    separation = separation_distance(xy, spacing)
+    fill = fill_distance(xy, mesh.region_polygons, num_probes, seed, index, chunk_size)
+
+    # Interior points carry the label code of their region
+    codes = mesh.region_codes()
+    region_of_code = np.full(len(mesh.label_table), -1, dtype=np.int64)
+    registered = codes >= 0
+    region_of_code[codes[registered]] = np.flatnonzero(registered)
+    region_index = np.where(mesh.is_border, -1, region_of_code[mesh.labels])
+    counts, bin_edges = spacing_histograms(spacing, region_index, len(codes), bins)
+
+    finite = np.isfinite(spacing)
+    counted = (region_index >= 0) & finite
+    members = np.bincount(region_index[region_index >= 0], minlength=len(codes))
+    total = np.bincount(region_index[counted], spacing[counted], minlength=len(codes))
+    measured = np.bincount(region_index[counted], minlength=len(codes))
+    smallest, largest = np.full(len(codes), np.inf), np.full(len(codes), -np.inf)
+    np.minimum.at(smallest, region_index[counted], spacing[counted])
+    np.maximum.at(largest, region_index[counted], spacing[counted])
+    regions = [{
+        'nodes': int(members[i]),
+        'min_spacing': float(smallest[i]) if measured[i] else None,
+        'mean_spacing': float(total[i] / measured[i]) if measured[i] else None,
+        'max_spacing': float(largest[i]) if measured[i] else None,
+        'histogram': counts[i],
+    } for i in range(len(codes))]
+    finite = spacing[finite]
+    return {
+        'nodes': len(xy),
+        'probes': num_probes,
+        'separation_distance': separation,
+        'fill_distance': fill,
+        'mesh_ratio': mesh_ratio(fill, separation),
+        'min_spacing': float(finite.min()) if len(finite) else None,
+        'mean_spacing': float(finite.mean()) if len(finite) else None,
+        'max_spacing': float(finite.max()) if len(finite) else None,
+        'bin_edges': bin_edges,
+        'regions': regions,
+    }
@@ -0,0 +1,129 @@
+import numpy as np
+
+from .spatial_index import _spread_bits
+from .stencils import build_stencils, node_coordinates
+
+# Orderings accepted by `node_order`
+ORDERINGS = ('hilbert', 'morton', 'rcm')
+
+
+def _grid_coordinates(xy, bits):
+    """Integer coordinates of the points on a 2**bits x 2**bits grid over their bounding square."""
+    lower = xy.min(axis=0)
+    extent = float((xy.max(axis=0) - lower).max())
+    scale = (2 ** bits - 1) / extent if extent > 0 else 0.0
+    grid = np.floor((xy - lower) * scale).astype(np.uint64)
+    return grid[:, 0], grid[:, 1]
+
+
+def morton_keys(xy, bits=16):
+    """
+    Z-order (Morton) keys of points, interleaving the bits of their quantized coordinates.
+
+    Args:
+        xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+        bits (int, optional): Bits per coordinate, at most 32. Defaults to 16.
+
+    Returns:
+        numpy.ndarray: uint64 array with the key of each point.
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    if not len(xy):
+        return np.empty(0, dtype=np.uint64)
+    x, y = _grid_coordinates(xy, bits)
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+def hilbert_keys(xy, bits=16):
+    """
+    Hilbert curve keys of points, the distance along the curve of their quantized coordinates.
+
+    Unlike the Morton curve, the Hilbert curve never jumps between distant cells, so points with
+    close keys are always close in space.
+
+    Args:
+        xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+        bits (int, optional): Bits per coordinate, at most 31. Defaults to 16.
+
+    Returns:
+        numpy.ndarray: uint64 array with the key of each point.
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    if not len(xy):
+        return np.empty(0, dtype=np.uint64)
+    x, y = _grid_coordinates(xy, bits)
+    keys = np.zeros(len(xy), dtype=np.uint64)
+    last = np.uint64(2 ** bits - 1)
+    for level in range(bits - 1, -1, -1):
+        s = np.uint64(1 << level)
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx.astype(np.uint64)) ^ ry.astype(np.uint64))
+        # Rotate the quadrant so that the curve inside it starts and ends where the parent curve expects
+        flip = rx & ~ry
+        x = np.where(flip, last - x, x)
+        y = np.where(flip, last - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+    return keys
+
+
+def rcm_order(xy, k=7, chunk_size=100_000):
+    """
+    Reverse Cuthill-McKee ordering of the graph joining every point to its k - 1 nearest neighbours.
+
+    Requires scipy, like the sparse matrices of `rbf_fd`.
+
+    Args:
+        xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+        k (int, optional): Size of the stencils, the point itself included. Defaults to 7.
+        chunk_size (int, optional): Number of points whose stencils are built at once. Defaults to 100000.
+
+    Returns:
+        numpy.ndarray: The permutation, as indices of the points in their new order.
+    """
+    try:
+        import scipy.sparse
+        from scipy.sparse.csgraph import reverse_cuthill_mckee
+    except ImportError as error:
+        raise ImportError("scipy is required for the 'rcm' ordering, install it with "
+                          "'pip install RBFMeshGen[sparse]'") from error
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    n = len(xy)
+    if n <= 1:
+        return np.arange(n)
+    stencils, _ = build_stencils(xy, min(k, n), chunk_size)
+    rows = np.repeat(np.arange(n), stencils.shape[1])
+    graph = scipy.sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, stencils.ravel())), shape=(n, n))
+    return np.asarray(reverse_cuthill_mckee((graph + graph.T).tocsr(), symmetric_mode=True), dtype=np.int64)
+
+
+def node_order(nodes, method='hilbert', bits=16, k=7, is_border=None):
+    """
+    Computes a locality-preserving order of a node set.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        method (str, optional): 'hilbert' or 'morton' to sort the nodes along a space-filling curve, or
+                                'rcm' for the reverse Cuthill-McKee order of their kNN graph, which
+                                minimizes the bandwidth of stencil matrices. Defaults to 'hilbert'.
+        bits (int, optional): Bits per coordinate of the curve keys. Defaults to 16.
+        k (int, optional): Stencil size of the 'rcm' graph. Defaults to 7.
+        is_border (numpy.ndarray, optional): Border mask. When given, border nodes are put first and
+                                             each group follows the order of the method.
+
+    Returns:
+        numpy.ndarray: int64 permutation such that ``xy[order]`` is the reordered node set.
+    """
+    xy = node_coordinates(nodes)
+    if method == 'hilbert':
+        order = np.argsort(hilbert_keys(xy, bits), kind='stable')
+    elif method == 'morton':
+        order = np.argsort(morton_keys(xy, bits), kind='stable')
+    elif method == 'rcm':
+        order = rcm_order(xy, k)
+    else:
+        raise ValueError(f"Unknown ordering '{method}', expected one of {ORDERINGS}")
+    if is_border is not None:
+        border = np.asarray(is_border, dtype=bool)[order]
+        order = np.concatenate((order[border], order[~border]))
+    return order
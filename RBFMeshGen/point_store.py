@@ -0,0 +1,297 @@
+import numpy as np
+
+from .geometry_utils import MeshPoint
+
+
+class PointStore:
+    def __init__(self, capacity=0):
+        """
+        Columnar storage for mesh points.
+
+        Coordinates are kept in a single (2, capacity) float64 buffer so that the x and y
+        columns are contiguous and ``xy`` is an (n, 2) view of the same memory. Labels are
+        stored as int32 codes into ``label_table`` and the border status as a boolean mask.
+
+        Args:
+            capacity (int, optional): Number of points to preallocate. Defaults to 0.
+
+        Attributes:
+            label_table (list): Labels referenced by the integer label codes.
+        """
+        self._coords = np.empty((2, capacity), dtype=np.float64)
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._border = np.empty(capacity, dtype=bool)
+        self._size = 0
+        self._version = 0
+        self.label_table = []
+        self._label_codes = {}
+
+    @classmethod
+    def from_arrays(cls, xy, codes, is_border, label_table):
+        """
+        Builds a store from column arrays.
+
+        Args:
+            xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+            codes (numpy.ndarray): Label code of every point.
+            is_border (numpy.ndarray): Border status of every point.
+            label_table (list): Labels referenced by the codes.
+
+        Returns:
+            PointStore: The new store.
+        """
+        store = cls(len(xy))
+        for label in label_table:
+            store.label_code(label)
+        store.append(xy, codes, is_border)
+        return store
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def x(self):
+        """numpy.ndarray: Zero-copy view of the x coordinates."""
+        return self._coords[0, :self._size]
+
+    @property
+    def y(self):
+        """numpy.ndarray: Zero-copy view of the y coordinates."""
+        return self._coords[1, :self._size]
+
+    @property
+    def xy(self):
+        """numpy.ndarray: Zero-copy (n, 2) view of the coordinates."""
+        return self._coords[:, :self._size].T
+
+    @property
+    def labels(self):
+        """numpy.ndarray: Zero-copy view of the int32 label codes."""
+        return self._codes[:self._size]
+
+    @property
+    def is_border(self):
+        """numpy.ndarray: Zero-copy view of the boolean border mask."""
+        return self._border[:self._size]
+
+    def label_code(self, label):
+        """
+        Returns the integer code of a label, registering it in the label table if needed.
+
+        Args:
+            label (str or int): The label.
+
+        Returns:
+            int: The code of the label in `label_table`.
+        """
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self.label_table)
+            self.label_table.append(label)
+            self._label_codes[label] = code
+        return code
+
+    def find_label_code(self, label):
+        """
+        Returns the integer code of a label without registering it.
+
+        Args:
+            label (str or int): The label.
+
+        Returns:
+            int: The code of the label in `label_table`, or -1 when the label is not in the table.
+        """
+        return self._label_codes.get(label, -1)
+
+    def decoded_labels(self, codes=None):
+        """
+        Translates label codes back into the original labels.
+
+        Args:
+            codes (numpy.ndarray, optional): Codes to translate. Defaults to all the stored labels.
+
+        Returns:
+            list: The labels of the points.
+        """
+        codes = self.labels if codes is None else codes
+        return [self.label_table[code] for code in codes.tolist()]
+
+    def reserve(self, capacity):
+        """
+        Grows the buffers so that they can hold at least `capacity` points.
+
+        Args:
+            capacity (int): Required capacity.
+        """
+        if capacity <= self._coords.shape[1]:
+            return
+        capacity = max(capacity, 2 * self._coords.shape[1])
+        coords = np.empty((2, capacity), dtype=np.float64)
+        codes = np.empty(capacity, dtype=np.int32)
+        border = np.empty(capacity, dtype=bool)
+        coords[:, :self._size] = self._coords[:, :self._size]
+        codes[:self._size] = self._codes[:self._size]
+        border[:self._size] = self._border[:self._size]
+        self._coords, self._codes, self._border = coords, codes, border
+
+    def append(self, xy, codes, is_border):
+        """
+        Appends a block of points.
+
+        Args:
+            xy (numpy.ndarray): Array of shape (n, 2) with the coordinates.
+            codes (int or numpy.ndarray): Label code of every point, or a single code for the whole block.
+            is_border (bool or numpy.ndarray): Border status of every point, or a single value for the block.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        start, stop = self._size, self._size + len(xy)
+        self.reserve(stop)
+        self._coords[:, start:stop] = xy.T
+        self._codes[start:stop] = codes
+        self._border[start:stop] = is_border
+        self._size = stop
+        self._version += 1
+
+    def extend(self, points):
+        """
+        Appends MeshPoint objects.
+
+        Args:
+            points (iterable): MeshPoint objects to store.
+        """
+        points = list(points)
+        self.append([(p.x, p.y) for p in points],
+                    np.array([self.label_code(p.label) for p in points], dtype=np.int32),
+                    np.array([p.is_border for p in points], dtype=bool))
+
+    def move(self, index, xy):
+        """
+        Overwrites the coordinates of some points, keeping their labels and border status.
+
+        Args:
+            index (numpy.ndarray): Positions of the points in the store.
+            xy (numpy.ndarray): Array of shape (len(index), 2) with the new coordinates.
+        """
+        self._coords[:, index] = np.asarray(xy, dtype=np.float64).reshape(-1, 2).T
+        self._version += 1
+
+    def permute(self, order):
+        """
+        Reorders the points in place.
+
+        Args:
+            order (numpy.ndarray): Permutation of ``range(len(self))``; the point at position ``order[i]``
+                                   moves to position i.
+        """
+        order = np.asarray(order)
+        if len(order) != self._size:
+            raise ValueError(f'The permutation has {len(order)} entries for {self._size} points')
+        self._coords[:, :self._size] = self._coords[:, order]
+        self._codes[:self._size] = self._codes[order]
+        self._border[:self._size] = self._border[order]
+        self._version += 1
+
+    def keep(self, mask):
+        """
+        Keeps only the points selected by a boolean mask, preserving their order.
+
+        Args:
+            mask (numpy.ndarray): Boolean array of length ``len(self)``.
+        """
+        index = np.flatnonzero(mask)
+        size = len(index)
+        self._coords[:, :size] = self._coords[:, index]
+        self._codes[:size] = self._codes[index]
+        self._border[:size] = self._border[index]
+        self._size = size
+        self._version += 1
+
+    def clear(self):
+        """Removes every point while keeping the label table."""
+        self._size = 0
+        self._version += 1
+
+    def __getitem__(self, i):
+        if not -self._size <= i < self._size:
+            raise IndexError('point index out of range')
+        i = i % self._size
+        return MeshPoint(float(self._coords[0, i]), float(self._coords[1, i]),
+                         self.label_table[self._codes[i]], bool(self._border[i]))
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+
+class PointView:
+    def __init__(self, store, is_border):
+        """
+        Lazy, list-like view over the interior or the border points of a PointStore.
+
+        Items are materialized as MeshPoint objects only when accessed, so code written
+        against lists of MeshPoint objects keeps working.
+
+        Args:
+            store (PointStore): The underlying store.
+            is_border (bool): Whether the view selects the border or the interior points.
+        """
+        self._store = store
+        self._is_border = is_border
+        self._cache = (None, None)
+
+    @property
+    def index(self):
+        """numpy.ndarray: Positions of the selected points in the store."""
+        version, index = self._cache
+        if version != self._store._version:
+            index = np.flatnonzero(self._store.is_border == self._is_border)
+            self._cache = (self._store._version, index)
+        return index
+
+    @property
+    def xy(self):
+        """numpy.ndarray: (n, 2) array with the coordinates of the selected points."""
+        return self._store.xy[self.index]
+
+    @property
+    def labels(self):
+        """numpy.ndarray: Label codes of the selected points."""
+        return self._store.labels[self.index]
+
+    @property
+    def is_border(self):
+        """numpy.ndarray: Border mask of the selected points."""
+        return self._store.is_border[self.index]
+
+    @property
+    def label_table(self):
+        """list: Labels referenced by the label codes."""
+        return self._store.label_table
+
+    def decoded_labels(self):
+        """
+        Returns the labels of the selected points.
+
+        Returns:
+            list: The labels of the points.
+        """
+        return self._store.decoded_labels(self.labels)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._store[j] for j in self.index[i].tolist()]
+        return self._store[int(self.index[i])]
+
+    def __iter__(self):
+        for j in self.index.tolist():
+            yield self._store[j]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        kind = 'border' if self._is_border else 'interior'
+        return f'<PointView of {len(self)} {kind} points>'
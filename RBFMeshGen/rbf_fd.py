@@ -0,0 +1,222 @@
+import numpy as np
+
+from .stencils import StencilBuilder, node_coordinates
+
+# Operators supported by the RBF-FD weights, with their derivative order, which is also the
+# smallest polynomial degree they need
+OPERATORS = {'interpolate': 0, 'dx': 1, 'dy': 1, 'laplacian': 2}
+
+# Default memory budget of the local systems solved at once, in bytes
+DEFAULT_MAX_MEMORY = 256 * 2 ** 20
+
+
+def monomial_exponents(degree):
+    """
+    Lists the exponents (a, b) of the bivariate monomials ``x**a * y**b`` of total degree up to `degree`.
+
+    Args:
+        degree (int): Polynomial degree.
+
+    Returns:
+        numpy.ndarray: Integer array of shape (M, 2) with ``M = (degree + 1) * (degree + 2) / 2``.
+    """
+    return np.array([(total - b, b) for total in range(degree + 1) for b in range(total + 1)], dtype=np.int64)
+
+
+def _kernel_rhs(operator, xi, r, phs_order):
+    """Operator applied to the PHS kernel centred at each stencil node, evaluated at the origin."""
+    m = phs_order
+    if operator == 'interpolate':
+        return r ** m
+    if operator == 'dx':
+        return -m * r ** (m - 2) * xi[..., 0]
+    if operator == 'dy':
+        return -m * r ** (m - 2) * xi[..., 1]
+    return m * m * r ** (m - 2)
+
+
+def _polynomial_rhs(operator, exponents):
+    """Operator applied to each monomial, evaluated at the origin."""
+    a, b = exponents[:, 0], exponents[:, 1]
+    if operator == 'interpolate':
+        return ((a == 0) & (b == 0)).astype(np.float64)
+    if operator == 'dx':
+        return ((a == 1) & (b == 0)).astype(np.float64)
+    if operator == 'dy':
+        return ((a == 0) & (b == 1)).astype(np.float64)
+    return 2.0 * (((a == 2) & (b == 0)) | ((a == 0) & (b == 2)))
+
+
+def rbf_fd_weights(points, stencils, operators=('laplacian',), centres=None, phs_order=3, poly_degree=2,
+                   chunk_size=None, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Computes RBF-FD weights with polyharmonic spline (PHS) kernels and polynomial augmentation.
+
+    For every stencil the local system ``[[Phi, P], [P.T, 0]]`` is assembled in coordinates shifted
+    to the centre and scaled by the stencil radius, with ``Phi = r**phs_order`` and ``P`` the monomials
+    up to `poly_degree`. The systems of a chunk of stencils are stacked into one array and solved with
+    a single `numpy.linalg.solve` call, for all the requested operators at once.
+
+    Args:
+        points (numpy.ndarray): Array of shape (n, 2) with the node coordinates.
+        stencils (numpy.ndarray): Integer array of shape (m, k) with the node indices of each stencil.
+        operators (tuple, optional): Operators among 'interpolate', 'dx', 'dy' and 'laplacian'.
+                                     Defaults to ('laplacian',).
+        centres (numpy.ndarray, optional): Array of shape (m, 2) with the points where the operators are
+                                           evaluated. Defaults to the first node of each stencil.
+        phs_order (int, optional): Odd exponent of the PHS kernel. Defaults to 3.
+        poly_degree (int, optional): Degree of the polynomial augmentation. Defaults to 2.
+        chunk_size (int, optional): Number of stencils solved at once. Defaults to the largest chunk
+                                    fitting in `max_memory`.
+        max_memory (int, optional): Memory budget of a chunk in bytes. Defaults to 256 MiB.
+
+    Returns:
+        dict: Maps each operator to an (m, k) float array with the weights of the stencil nodes.
+    """
+    points = node_coordinates(points)
+    stencils = np.asarray(stencils)
+    m_stencils, k = stencils.shape
+    for operator in operators:
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown operator '{operator}', expected one of {list(OPERATORS)}")
+        if poly_degree < OPERATORS[operator]:
+            raise ValueError(f"Operator '{operator}' needs poly_degree >= {OPERATORS[operator]}")
+    if phs_order < 1 or phs_order % 2 == 0:
+        raise ValueError('phs_order must be a positive odd integer')
+    if phs_order < 3 and set(operators) - {'interpolate'}:
+        raise ValueError('Derivative operators need phs_order >= 3')
+    exponents = monomial_exponents(poly_degree)
+    n_poly = len(exponents)
+    if k < n_poly:
+        raise ValueError(f'Stencils of {k} nodes are too small for poly_degree={poly_degree} ({n_poly} monomials)')
+    if centres is None:
+        centres = points[stencils[:, 0]]
+    centres = np.asarray(centres, dtype=np.float64).reshape(-1, 2)
+
+    size = k + n_poly
+    if chunk_size is None:
+        # Local matrix, pairwise differences and distances, plus the copies made by the solver
+        chunk_size = max(1, int(max_memory // (8 * (3 * size * size + 3 * k * k + size * len(operators)))))
+    poly_rhs = np.stack([_polynomial_rhs(operator, exponents) for operator in operators], axis=1)
+    weights = {operator: np.empty((m_stencils, k), dtype=np.float64) for operator in operators}
+
+    for start in range(0, m_stencils, chunk_size):
+        stop = min(start + chunk_size, m_stencils)
+        xi = points[stencils[start:stop]] - centres[start:stop, None, :]
+        scale = np.sqrt(np.einsum('ijk,ijk->ij', xi, xi).max(axis=1))
+        scale[scale == 0.0] = 1.0
+        xi /= scale[:, None, None]
+
+        delta = xi[:, :, None, :] - xi[:, None, :, :]
+        system = np.zeros((stop - start, size, size), dtype=np.float64)
+        system[:, :k, :k] = np.sqrt(np.einsum('ijkl,ijkl->ijk', delta, delta)) ** phs_order
+        monomials = xi[:, :, None, 0] ** exponents[:, 0] * xi[:, :, None, 1] ** exponents[:, 1]
+        system[:, :k, k:] = monomials
+        system[:, k:, :k] = monomials.transpose(0, 2, 1)
+
+        r = np.sqrt(np.einsum('ijk,ijk->ij', xi, xi))
+        rhs = np.empty((stop - start, size, len(operators)), dtype=np.float64)
+        for column, operator in enumerate(operators):
+            rhs[:, :k, column] = _kernel_rhs(operator, xi, r, phs_order)
+        rhs[:, k:, :] = poly_rhs
+
+        try:
+            solution = np.linalg.solve(system, rhs)
+        except np.linalg.LinAlgError:
+            # Duplicated nodes make some systems singular: fall back to least squares for the chunk
+            solution = np.linalg.pinv(system) @ rhs
+
+        for column, operator in enumerate(operators):
+            # Undo the scaling of the coordinates: derivatives of order p scale as 1 / scale**p
+            weights[operator][start:stop] = solution[:, :k, column] / scale[:, None] ** OPERATORS[operator]
+
+    return weights
+
+
+def _csr(weights, stencils, n_columns):
+    """Packs (m, k) weights into an (m, n_columns) CSR matrix."""
+    try:
+        import scipy.sparse
+    except ImportError as error:
+        raise ImportError("scipy is required to build sparse matrices, install it with "
+                          "'pip install RBFMeshGen[sparse]'") from error
+    m, k = stencils.shape
+    return scipy.sparse.csr_matrix((weights.ravel(), stencils.ravel(), np.arange(0, m * k + 1, k)),
+                                   shape=(m, n_columns))
+
+
+def differentiation_matrices(nodes, operators=('laplacian',), stencil_size=None, stencils=None, phs_order=3,
+                             poly_degree=2, chunk_size=None, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Builds sparse RBF-FD differentiation matrices over the nodes of a mesh.
+
+    Row i of each matrix holds the weights that apply the operator at node i from the nodes of its
+    stencil, so ``D @ u`` approximates the operator applied to the nodal values ``u``.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes. For an RBFMesh the rows and
+                                                                  columns follow ``mesh.xy``.
+        operators (tuple, optional): Operators among 'interpolate', 'dx', 'dy' and 'laplacian'.
+                                     Defaults to ('laplacian',).
+        stencil_size (int, optional): Number of nodes in each stencil. Defaults to twice the number of
+                                      monomials plus one.
+        stencils (numpy.ndarray, optional): Precomputed (n, k) stencils, e.g. from `build_stencils`.
+        phs_order (int, optional): Odd exponent of the PHS kernel. Defaults to 3.
+        poly_degree (int, optional): Degree of the polynomial augmentation. Defaults to 2.
+        chunk_size (int, optional): Number of stencils solved at once. Defaults to the budget of `max_memory`.
+        max_memory (int, optional): Memory budget of a chunk in bytes. Defaults to 256 MiB.
+
+    Returns:
+        dict: Maps each operator to an (n, n) ``scipy.sparse.csr_matrix``.
+    """
+    points = node_coordinates(nodes)
+    if stencils is None:
+        if stencil_size is None:
+            stencil_size = 2 * len(monomial_exponents(poly_degree)) + 1
+        stencils, _ = StencilBuilder(points).build(stencil_size)
+    weights = rbf_fd_weights(points, stencils, operators, phs_order=phs_order, poly_degree=poly_degree,
+                             chunk_size=chunk_size, max_memory=max_memory)
+    return {operator: _csr(w, stencils, len(points)) for operator, w in weights.items()}
+
+
+def differentiation_matrix(nodes, operator='laplacian', **kwargs):
+    """
+    Builds a single sparse RBF-FD differentiation matrix, see `differentiation_matrices`.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        operator (str, optional): 'interpolate', 'dx', 'dy' or 'laplacian'. Defaults to 'laplacian'.
+        **kwargs: Options passed to `differentiation_matrices`.
+
+    Returns:
+        scipy.sparse.csr_matrix: The (n, n) matrix.
+    """
+    return differentiation_matrices(nodes, (operator,), **kwargs)[operator]
+
+
+def interpolation_matrix(nodes, points, stencil_size=None, phs_order=3, poly_degree=1, chunk_size=None,
+                         max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Builds a sparse RBF-FD matrix interpolating nodal values at arbitrary points.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        points (numpy.ndarray): Array of shape (m, 2) with the evaluation points.
+        stencil_size (int, optional): Number of nodes in each stencil. Defaults to twice the number of
+                                      monomials plus one.
+        phs_order (int, optional): Odd exponent of the PHS kernel. Defaults to 3.
+        poly_degree (int, optional): Degree of the polynomial augmentation. Defaults to 1.
+        chunk_size (int, optional): Number of stencils solved at once. Defaults to the budget of `max_memory`.
+        max_memory (int, optional): Memory budget of a chunk in bytes. Defaults to 256 MiB.
+
+    Returns:
+        scipy.sparse.csr_matrix: The (m, n) matrix.
+    """
+    nodes = node_coordinates(nodes)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if stencil_size is None:
+        stencil_size = 2 * len(monomial_exponents(poly_degree)) + 1
+    stencils, _ = StencilBuilder(nodes).query(points, stencil_size)
+    weights = rbf_fd_weights(nodes, stencils, ('interpolate',), centres=points, phs_order=phs_order,
+                             poly_degree=poly_degree, chunk_size=chunk_size, max_memory=max_memory)
+    return _csr(weights['interpolate'], stencils, len(nodes))
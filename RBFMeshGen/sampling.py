@@ -0,0 +1,872 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import shapely
+from shapely import prepare
+from shapely.ops import triangulate
+
+from .low_discrepancy import SEQUENCES
+from .spatial_index import GridIndex
+
+# Number of minimum-separation points per unit area for spacing 1, for a maximal
+# Poisson-disk set; used to turn a target count into a spacing.
+POISSON_DISK_DENSITY = 0.69
+
+# Largest number of points drawn by one task of `sample_points_in_regions`.
+DEFAULT_TASK_SIZE = 200_000
+
+# Candidate budget of the rejection samplers, as a multiple of the expected number of candidates
+CANDIDATE_BUDGET_FACTOR = 100
+
+
+class DegenerateRegionError(ValueError):
+    def __init__(self, message, region=None, stats=None):
+        """
+        Raised when a region cannot receive points, e.g. because shrinking it by the boundary distance
+        leaves nothing, or because rejection sampling exhausts its candidate budget.
+
+        Args:
+            message (str): Description of the problem.
+            region (int, optional): Index of the region. Defaults to None.
+            stats (dict, optional): Sampling statistics such as drawn and accepted candidates and elapsed time.
+
+        Attributes:
+            region (int): Index of the region, or None.
+            stats (dict): Sampling statistics.
+        """
+        super().__init__(message)
+        self.region = region
+        self.stats = {} if stats is None else stats
+
+
+class DegenerateRegionWarning(RuntimeWarning):
+    """Warns about regions that receive no points because they vanish when shrunk."""
+
+
+def estimate_acceptance(polygon):
+    """
+    Estimates the fraction of candidates drawn over the bounds of a polygon that fall inside it.
+
+    Args:
+        polygon (shapely.geometry.Polygon or MultiPolygon): The region.
+
+    Returns:
+        float: Area of the polygon over the area of its bounding box, 0 for an empty polygon.
+    """
+    if polygon.is_empty:
+        return 0.0
+    min_x, min_y, max_x, max_y = polygon.bounds
+    bounds_area = (max_x - min_x) * (max_y - min_y)
+    return polygon.area / bounds_area if bounds_area > 0 else 0.0
+
+
+def _count(stats, **counters):
+    """Adds counters to a statistics dict, if one was given."""
+    if stats is not None:
+        for name, value in counters.items():
+            stats[name] = stats.get(name, 0) + value
+
+
+def _budget_exceeded(num_points, accepted, drawn, expected, start):
+    elapsed = time.perf_counter() - start
+    stats = {'requested': num_points, 'accepted': accepted, 'drawn': drawn, 'expected_acceptance': expected,
+             'observed_acceptance': accepted / drawn if drawn else 0.0, 'elapsed': elapsed}
+    return DegenerateRegionError(
+        f"Accepted {accepted} of {num_points} points after {drawn} candidates in {elapsed:.3f} s "
+        f"(acceptance {stats['observed_acceptance']:.3g}, expected {expected:.3g}); the region is probably "
+        f"invalid or too thin", stats=stats)
+
+
+def sample_points_in_polygon(polygon, num_points, rng=None, max_batch=1_000_000, max_candidates=None, stats=None):
+    """
+    Draws points uniformly inside a polygon using batched rejection sampling.
+
+    Candidates are drawn in blocks over the polygon bounds and tested all at once with
+    ``shapely.contains_xy``. The size of each block is derived from the acceptance rate
+    observed so far, starting from `estimate_acceptance`.
+
+    Args:
+        polygon (shapely.geometry.Polygon or MultiPolygon): Region to sample. It is prepared in place.
+        num_points (int): Number of points to draw.
+        rng (numpy.random.Generator, optional): Random generator. Defaults to a fresh ``default_rng()``.
+        max_batch (int, optional): Upper bound on the number of candidates drawn per block. Defaults to 1e6.
+        max_candidates (int, optional): Number of candidates after which sampling gives up. Defaults to
+                                        CANDIDATE_BUDGET_FACTOR times the expected number of candidates.
+        stats (dict, optional): Receives the number of candidates 'drawn' and 'accepted', added to any
+                                counts already present.
+
+    Returns:
+        numpy.ndarray: Array of shape (num_points, 2) with the accepted coordinates.
+
+    Raises:
+        DegenerateRegionError: If the polygon is empty or the candidate budget runs out.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    points = np.empty((num_points, 2), dtype=np.float64)
+    if num_points == 0:
+        return points
+    acceptance = expected = estimate_acceptance(polygon)
+    if acceptance <= 0.0:
+        raise DegenerateRegionError("Cannot sample points inside an empty polygon")
+    if max_candidates is None:
+        max_candidates = CANDIDATE_BUDGET_FACTOR * int(np.ceil(num_points / expected)) + max_batch
+
+    prepare(polygon)
+    min_x, min_y, max_x, max_y = polygon.bounds
+    start = time.perf_counter()
+    drawn = 0
+    accepted = 0
+
+    while accepted < num_points:
+        if drawn >= max_candidates:
+            raise _budget_exceeded(num_points, accepted, drawn, expected, start)
+        remaining = num_points - accepted
+        # Oversample slightly so that most regions are filled in a single block
+        batch = min(max_batch, int(np.ceil(1.1 * remaining / acceptance)) + 16)
+        x = rng.uniform(min_x, max_x, batch)
+        y = rng.uniform(min_y, max_y, batch)
+        inside = np.flatnonzero(shapely.contains_xy(polygon, x, y))[:remaining]
+
+        n_inside = len(inside)
+        points[accepted:accepted + n_inside, 0] = x[inside]
+        points[accepted:accepted + n_inside, 1] = y[inside]
+        accepted += n_inside
+        drawn += batch
+        acceptance = max(accepted / drawn, 1.0 / batch)
+
+    _count(stats, drawn=drawn, accepted=accepted)
+    return points
+
+
+def sample_sequence_in_polygon(polygon, num_points, sequence, bounds=None, max_batch=1_000_000, max_candidates=None,
+                               stats=None):
+    """
+    Draws points inside a polygon from a low-discrepancy sequence, by batched rejection.
+
+    Blocks of consecutive points of `sequence` are mapped onto `bounds` and tested all at once with
+    ``shapely.contains_xy``. The sequence is advanced to just after the last point kept, so a later
+    call continues the same sequence and the points of both calls together stay evenly spread.
+
+    Args:
+        polygon (shapely.geometry.Polygon or MultiPolygon): Region to sample. It is prepared in place.
+        num_points (int): Number of points to draw.
+        sequence (ScrambledHalton or ScrambledSobol): Sequence of candidates in the unit square.
+        bounds (tuple, optional): (min_x, min_y, max_x, max_y) box the unit square is mapped onto. It must
+                                  be the same from one call to the next. Defaults to the polygon bounds.
+        max_batch (int, optional): Upper bound on the number of candidates drawn per block. Defaults to 1e6.
+        max_candidates (int, optional): Number of candidates after which sampling gives up. Defaults to
+                                        CANDIDATE_BUDGET_FACTOR times the expected number of candidates.
+        stats (dict, optional): Receives the number of candidates 'drawn' and 'accepted', added to any
+                                counts already present.
+
+    Returns:
+        numpy.ndarray: Array of shape (num_points, 2) with the accepted coordinates.
+
+    Raises:
+        DegenerateRegionError: If the polygon is empty or the candidate budget runs out.
+    """
+    points = np.empty((num_points, 2), dtype=np.float64)
+    if num_points == 0:
+        return points
+    min_x, min_y, max_x, max_y = polygon.bounds if bounds is None else bounds
+    box_area = (max_x - min_x) * (max_y - min_y)
+    acceptance = expected = polygon.area / box_area if box_area > 0 else 0.0
+    if acceptance <= 0.0:
+        raise DegenerateRegionError("Cannot sample points inside an empty polygon")
+    if max_candidates is None:
+        max_candidates = CANDIDATE_BUDGET_FACTOR * int(np.ceil(num_points / expected)) + max_batch
+
+    prepare(polygon)
+    start = time.perf_counter()
+    drawn = 0
+    accepted = 0
+
+    while accepted < num_points:
+        if drawn >= max_candidates:
+            raise _budget_exceeded(num_points, accepted, drawn, expected, start)
+        remaining = num_points - accepted
+        batch = min(max_batch, int(np.ceil(1.1 * remaining / acceptance)) + 16)
+        first = sequence.index
+        unit = sequence.random(batch)
+        x = min_x + unit[:, 0] * (max_x - min_x)
+        y = min_y + unit[:, 1] * (max_y - min_y)
+        inside = np.flatnonzero(shapely.contains_xy(polygon, x, y))
+        if len(inside) > remaining:
+            # Hand the candidates after the last kept one back to the sequence
+            inside = inside[:remaining]
+            sequence.index = first + int(inside[-1]) + 1
+            batch = sequence.index - first
+
+        n_inside = len(inside)
+        points[accepted:accepted + n_inside, 0] = x[inside]
+        points[accepted:accepted + n_inside, 1] = y[inside]
+        accepted += n_inside
+        drawn += batch
+        acceptance = max(accepted / drawn, 1.0 / batch)
+
+    _count(stats, drawn=drawn, accepted=accepted)
+    return points
+
+
+def triangulate_polygon(polygon):
+    """
+    Splits a polygon into triangles that cover it exactly.
+
+    Uses the constrained Delaunay triangulation of shapely >= 2.1. On older versions the
+    Delaunay triangulation of the vertices is clipped to the polygon and the clipped pieces
+    are triangulated again.
+
+    Args:
+        polygon (shapely.geometry.Polygon or MultiPolygon): Polygon to triangulate.
+
+    Returns:
+        numpy.ndarray: Array of shape (m, 3, 2) with the vertices of the triangles.
+    """
+    if hasattr(shapely, 'constrained_delaunay_triangles'):
+        triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(polygon))
+    else:
+        triangles = []
+        for triangle in triangulate(polygon):
+            if triangle.within(polygon):
+                triangles.append(triangle)
+                continue
+            for piece in shapely.get_parts(triangle.intersection(polygon)):
+                if piece.geom_type == 'Polygon':
+                    triangles.extend(t for t in triangulate(piece) if t.representative_point().within(piece))
+    if len(triangles) == 0:
+        return np.empty((0, 3, 2), dtype=np.float64)
+    return shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3]
+
+
+class TriangulatedRegion:
+    def __init__(self, polygon):
+        """
+        Triangulation of a region with the cumulative area distribution of its triangles.
+
+        Points are drawn by picking triangles with probability proportional to their area and
+        then uniform barycentric coordinates, so the cost does not depend on how thin or
+        concave the region is.
+
+        Args:
+            polygon (shapely.geometry.Polygon or MultiPolygon): Region to sample. It is prepared in place.
+        """
+        self.polygon = polygon
+        prepare(polygon)
+        self.triangles = triangulate_polygon(polygon)
+        a, b, c = self.triangles[:, 0], self.triangles[:, 1], self.triangles[:, 2]
+        areas = 0.5 * np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+        self.area = areas.sum()
+        self.cdf = np.cumsum(areas) / self.area if self.area > 0 else areas
+
+    def sample(self, num_points, rng=None, stats=None):
+        """
+        Draws points uniformly inside the region.
+
+        Points landing exactly on the region boundary are redrawn, so every point is
+        strictly inside the polygon.
+
+        Args:
+            num_points (int): Number of points to draw.
+            rng (numpy.random.Generator, optional): Random generator. Defaults to a fresh ``default_rng()``.
+            stats (dict, optional): Receives the number of points 'drawn', redraws included, and 'accepted'.
+
+        Returns:
+            numpy.ndarray: Array of shape (num_points, 2) with the coordinates.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        points = np.empty((num_points, 2), dtype=np.float64)
+        if num_points == 0:
+            return points
+        if self.area <= 0.0:
+            raise DegenerateRegionError("Cannot sample points inside an empty polygon")
+
+        missing = np.arange(num_points)
+        drawn = 0
+        for _ in range(64):
+            if not len(missing):
+                break
+            n = len(missing)
+            drawn += n
+            index = np.minimum(np.searchsorted(self.cdf, rng.random(n), side='right'), len(self.cdf) - 1)
+            a, b, c = self.triangles[index, 0], self.triangles[index, 1], self.triangles[index, 2]
+            r1 = np.sqrt(rng.random(n))[:, None]
+            r2 = rng.random(n)[:, None]
+            points[missing] = (1.0 - r1) * a + r1 * (1.0 - r2) * b + r1 * r2 * c
+            inside = shapely.contains_xy(self.polygon, points[missing, 0], points[missing, 1])
+            missing = missing[~inside]
+        else:
+            if len(missing):
+                # Only points on the boundary are redrawn, so persistent misses mean a broken triangulation
+                raise DegenerateRegionError(f"{len(missing)} of {num_points} points stayed outside the "
+                                            f"triangulated region after 64 rounds",
+                                            stats={'requested': num_points, 'missing': len(missing)})
+
+        _count(stats, drawn=drawn, accepted=num_points)
+        return points
+
+
+class DensityEnvelope:
+    def __init__(self, polygon, density, resolution=128, safety=1.5):
+        """
+        Piecewise-constant upper bound of a node density over a region, used to draw points that
+        follow the density by vectorized thinning.
+
+        The region bounds are split into about ``resolution**2`` square cells. Cells that do not
+        intersect the region are dropped, and each remaining cell gets the largest density found at
+        its corners and centre, times `safety`, as its bound. Candidates are drawn cell by cell in
+        proportion to bound times cell area and kept with probability ``density / bound``, so the
+        acceptance rate stays high even when the density varies by orders of magnitude.
+
+        Args:
+            polygon (shapely.geometry.Polygon or MultiPolygon): Region to sample. It is prepared in place.
+            density (callable): Vectorized function ``density(x, y)`` returning non-negative values.
+            resolution (int, optional): Number of cells along the side of a square region. Defaults to 128.
+            safety (float, optional): Factor applied to the sampled maxima. Defaults to 1.5.
+        """
+        self.polygon = polygon
+        self.density = density
+        prepare(polygon)
+        if polygon.is_empty or polygon.area <= 0.0:
+            self.cells = np.empty((0, 2))
+            self.bound = np.empty(0)
+            self.total_mass = 0.0
+            return
+
+        min_x, min_y, max_x, max_y = polygon.bounds
+        self.cell_size = np.sqrt((max_x - min_x) * (max_y - min_y)) / resolution
+        nx = max(int(np.ceil((max_x - min_x) / self.cell_size)), 1)
+        ny = max(int(np.ceil((max_y - min_y) / self.cell_size)), 1)
+        i, j = np.meshgrid(np.arange(nx), np.arange(ny))
+        x0 = min_x + i.ravel() * self.cell_size
+        y0 = min_y + j.ravel() * self.cell_size
+        keep = shapely.intersects(polygon, shapely.box(x0, y0, x0 + self.cell_size, y0 + self.cell_size))
+        keep_i, keep_j = i.ravel()[keep], j.ravel()[keep]
+        self.cells = np.column_stack((x0[keep], y0[keep]))
+
+        # Density at every grid node and cell centre, then the maximum around each kept cell
+        gx, gy = np.meshgrid(min_x + np.arange(nx + 1) * self.cell_size, min_y + np.arange(ny + 1) * self.cell_size)
+        nodes = density(gx.ravel(), gy.ravel()).reshape(ny + 1, nx + 1)
+        centres = density(self.cells[:, 0] + 0.5 * self.cell_size, self.cells[:, 1] + 0.5 * self.cell_size)
+        corners = np.maximum(np.maximum(nodes[keep_j, keep_i], nodes[keep_j, keep_i + 1]),
+                             np.maximum(nodes[keep_j + 1, keep_i], nodes[keep_j + 1, keep_i + 1]))
+        self.bound = safety * np.maximum(corners, centres)
+        self.total_mass, self.cdf = self._cdf(self.bound)
+
+    def _cdf(self, bound):
+        mass = bound * self.cell_size ** 2
+        total = float(mass.sum())
+        return total, (np.cumsum(mass) / total if total > 0 else mass)
+
+    def _candidates(self, n, rng, bound, cdf):
+        """
+        Draws n candidates from the envelope and returns them with their acceptance ratio.
+
+        `bound` is raised in place where the density exceeds it, and the returned flag tells the
+        caller to rebuild `cdf`. Callers pass their own copy so that concurrent draws never share state.
+        """
+        cell = np.minimum(np.searchsorted(cdf, rng.random(n), side='right'), len(cdf) - 1)
+        xy = self.cells[cell] + rng.random((n, 2)) * self.cell_size
+        inside = shapely.contains_xy(self.polygon, xy[:, 0], xy[:, 1])
+        ratio = np.zeros(n)
+        values = self.density(xy[inside, 0], xy[inside, 1])
+        ratio[inside] = values / bound[cell[inside]]
+        exceeded = ratio > 1.0
+        if exceeded.any():
+            # The bound missed a peak of the density: raise it for the following draws
+            np.maximum.at(bound, cell[exceeded], values[exceeded[inside]] * 1.5)
+            return xy, ratio, True
+        return xy, ratio, False
+
+    def integral(self, num_probes=4096, rng=None):
+        """
+        Estimates the integral of the density over the region.
+
+        Args:
+            num_probes (int, optional): Number of envelope candidates used for the estimate. Defaults to 4096.
+            rng (numpy.random.Generator, optional): Random generator. Defaults to a fresh ``default_rng()``.
+
+        Returns:
+            float: The estimated integral.
+        """
+        if self.total_mass <= 0.0:
+            return 0.0
+        if rng is None:
+            rng = np.random.default_rng()
+        _, ratio, _ = self._candidates(num_probes, rng, self.bound.copy(), self.cdf)
+        return self.total_mass * float(np.minimum(ratio, 1.0).mean())
+
+    def sample(self, num_points, rng=None, max_batch=1_000_000, max_candidates=None, stats=None):
+        """
+        Draws points inside the region following the density.
+
+        Args:
+            num_points (int): Number of points to draw.
+            rng (numpy.random.Generator, optional): Random generator. Defaults to a fresh ``default_rng()``.
+            max_batch (int, optional): Upper bound on the number of candidates drawn per block. Defaults to 1e6.
+            max_candidates (int, optional): Number of candidates after which sampling gives up. Defaults to
+                                            CANDIDATE_BUDGET_FACTOR times the expected number of candidates.
+            stats (dict, optional): Receives the number of candidates 'drawn' and 'accepted'.
+
+        Returns:
+            numpy.ndarray: Array of shape (num_points, 2) with the coordinates.
+
+        Raises:
+            DegenerateRegionError: If the region is empty or the candidate budget runs out.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        points = np.empty((num_points, 2), dtype=np.float64)
+        if num_points == 0:
+            return points
+        if self.total_mass <= 0.0:
+            raise DegenerateRegionError("Cannot sample points inside an empty polygon")
+        expected = 0.5
+        if max_candidates is None:
+            max_candidates = CANDIDATE_BUDGET_FACTOR * int(np.ceil(num_points / expected)) + max_batch
+        bound, cdf = self.bound.copy(), self.cdf
+        acceptance = expected
+        start = time.perf_counter()
+        drawn = 0
+        accepted = 0
+
+        while accepted < num_points:
+            if drawn >= max_candidates:
+                raise _budget_exceeded(num_points, accepted, drawn, expected, start)
+            remaining = num_points - accepted
+            batch = min(max_batch, int(np.ceil(1.1 * remaining / acceptance)) + 16)
+            xy, ratio, raised = self._candidates(batch, rng, bound, cdf)
+            if raised:
+                _, cdf = self._cdf(bound)
+            kept = np.flatnonzero(rng.random(batch) < ratio)[:remaining]
+
+            points[accepted:accepted + len(kept)] = xy[kept]
+            accepted += len(kept)
+            drawn += batch
+            acceptance = max(accepted / drawn, 1.0 / batch)
+
+        _count(stats, drawn=drawn, accepted=accepted)
+        return points
+
+
+def _region_tasks(region_polygons, points_allocation, boundary_distance, seed, method, triangulations, envelopes,
+                  task_size, sequences=None):
+    """Splits the allocation into (region index, count, draw function, seed sequence) tasks."""
+    if method not in ('rejection', 'triangulate') + tuple(SEQUENCES):
+        raise ValueError(f"Unknown sampling method '{method}'")
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    region_seeds = seed_sequence.spawn(len(region_polygons))
+    triangulations = {} if triangulations is None else triangulations
+    sequences = {} if sequences is None else sequences
+    tasks = []
+
+    for i, (poly, num_pts) in enumerate(zip(region_polygons, points_allocation)):
+        if num_pts < 0:
+            raise ValueError(f'Cannot draw a negative number of points in region {i}: {num_pts}')
+        if num_pts == 0:
+            continue
+        if envelopes is not None:
+            draw = envelopes[i].sample
+            area = envelopes[i].polygon.area
+        elif method == 'rejection':
+            poly = poly.buffer(-boundary_distance)  # Apply a buffer to slightly shrink the polygon
+            prepare(poly)
+            area = poly.area
+
+            def draw(n, rng, stats=None, poly=poly):
+                return sample_points_in_polygon(poly, n, rng, stats=stats)
+        elif method in SEQUENCES:
+            sequence = sequences.get((i, method))
+            if sequence is None:
+                sequence = SEQUENCES[method](np.random.default_rng(region_seeds[i]))
+                sequences[(i, method)] = sequence
+            bounds = poly.bounds  # Candidates cover the unshrunk region, whatever the boundary_distance
+            poly = poly.buffer(-boundary_distance)
+            area = poly.area
+
+            def draw(n, rng, stats=None, poly=poly, sequence=sequence, bounds=bounds):
+                return sample_sequence_in_polygon(poly, n, sequence, bounds, stats=stats)
+        else:
+            region = triangulations.get((i, boundary_distance))
+            if region is None:
+                region = TriangulatedRegion(poly.buffer(-boundary_distance))
+                triangulations[(i, boundary_distance)] = region
+            draw = region.sample
+            area = region.area
+        if area <= 0.0:
+            raise DegenerateRegionError(f"Region {i + 1} vanishes when shrunk by "
+                                        f"boundary_distance={boundary_distance} but was allocated {num_pts} points",
+                                        region=i, stats={'area': region_polygons[i].area, 'requested': num_pts})
+
+        # Large regions are split into several tasks, each with its own child stream
+        counts = [task_size] * (num_pts // task_size) + ([num_pts % task_size] if num_pts % task_size else [])
+        for count, task_seed in zip(counts, region_seeds[i].spawn(len(counts))):
+            tasks.append((i, count, draw, task_seed))
+
+    return tasks
+
+
+def _run_task(task, stats=None):
+    """Draws the points of a task, naming its region in sampling errors and timing it into `stats`."""
+    i, count, draw, task_seed = task
+    start = time.perf_counter()
+    try:
+        points = draw(count, np.random.default_rng(task_seed), stats=stats)
+    except DegenerateRegionError as error:
+        raise DegenerateRegionError(f'Region {i + 1}: {error}', region=i, stats=error.stats) from error
+    _count(stats, time=time.perf_counter() - start)
+    return points
+
+
+def _region_stats(points_allocation, tasks, task_stats):
+    """Sums the counters of the tasks per region."""
+    regions = [{'requested': int(num_pts), 'drawn': 0, 'accepted': 0, 'time': 0.0} for num_pts in points_allocation]
+    for (i, _, _, _), counters in zip(tasks, task_stats):
+        for name, value in counters.items():
+            regions[i][name] += value
+    for region in regions:
+        region['acceptance'] = region['accepted'] / region['drawn'] if region['drawn'] else None
+    drawn = sum(region['drawn'] for region in regions)
+    accepted = sum(region['accepted'] for region in regions)
+    return {'drawn': drawn, 'accepted': accepted, 'acceptance': accepted / drawn if drawn else None,
+            'regions': regions}
+
+
+def iter_points_in_regions(region_polygons, points_allocation, boundary_distance=1.0e-5, seed=None,
+                           method='rejection', triangulations=None, envelopes=None, chunk_size=DEFAULT_TASK_SIZE,
+                           sequences=None):
+    """
+    Draws points inside each region one block at a time.
+
+    The blocks are the tasks of `sample_points_in_regions`, drawn in order in the calling thread, so
+    with ``chunk_size == task_size`` and the same seed the concatenated blocks equal its output. Only
+    one block is held in memory at a time.
+
+    Args:
+        region_polygons (list): List of region Polygon objects.
+        points_allocation (list): Number of points to draw in each region.
+        boundary_distance (float, optional): Distance to buffer the polygons. Defaults to 1.0e-5.
+        seed (int or numpy.random.SeedSequence, optional): Seed of the random streams. Defaults to fresh entropy.
+        method (str, optional): 'rejection', 'triangulate', 'halton' or 'sobol', see `sample_points_in_regions`.
+                                Defaults to 'rejection'.
+        triangulations (dict, optional): Cache of TriangulatedRegion objects, see `sample_points_in_regions`.
+        envelopes (list, optional): DensityEnvelope of each region, see `sample_points_in_regions`.
+        chunk_size (int, optional): Largest number of points in a block. Defaults to 200000.
+        sequences (dict, optional): Low-discrepancy sequence of each region, see `sample_points_in_regions`.
+
+    Yields:
+        tuple: The index of the region and an (n, 2) array with the coordinates of the block.
+    """
+    for task in _region_tasks(region_polygons, points_allocation, boundary_distance, seed, method, triangulations,
+                              envelopes, chunk_size, sequences):
+        yield task[0], _run_task(task)
+
+
+def sample_points_in_regions(region_polygons, points_allocation, boundary_distance=1.0e-5, seed=None,
+                             method='rejection', triangulations=None, envelopes=None, workers=None,
+                             task_size=DEFAULT_TASK_SIZE, stats=None, sequences=None):
+    """
+    Draws points inside each region.
+
+    The work is split into tasks of at most `task_size` points, one or more per region, and every
+    task draws from its own `numpy.random.SeedSequence` child stream. The geometry a task needs is
+    buffered, prepared or triangulated beforehand, so the tasks only run vectorized numpy and shapely
+    calls, which release the GIL, and can run on a thread pool. As the streams depend only on the
+    seed and the allocation, the result is the same for any number of workers. With the 'halton' and
+    'sobol' methods every region is a single task, as its sequence has to be consumed in order.
+
+    Args:
+        region_polygons (list): List of region Polygon objects.
+        points_allocation (list): Number of points to draw in each region.
+        boundary_distance (float, optional): Distance to buffer the polygons. Defaults to 1.0e-5.
+        seed (int or numpy.random.SeedSequence, optional): Seed of the random streams. Defaults to fresh entropy.
+        method (str, optional): 'rejection' for batched rejection sampling over the region bounds,
+                                'triangulate' for direct sampling of a triangulation of the region, or
+                                'halton' and 'sobol' for rejection sampling of scrambled low-discrepancy
+                                candidates over the region bounds. Defaults to 'rejection'.
+        triangulations (dict, optional): Cache of TriangulatedRegion objects keyed by
+                                         (region index, boundary_distance), filled as regions are triangulated.
+        envelopes (list, optional): DensityEnvelope of each region. When given, points follow the density
+                                    of the envelopes instead of being uniform, and `method` is not used.
+        workers (int, optional): Number of threads running the tasks. Defaults to None, which runs
+                                 them in the calling thread.
+        task_size (int, optional): Largest number of points drawn by a single task. Defaults to 200000.
+        stats (dict, optional): Receives the total candidates 'drawn' and 'accepted', the overall
+                                'acceptance' rate and, under 'regions', one dict per region with the points
+                                'requested', the candidates 'drawn' and 'accepted', the 'acceptance' rate
+                                and the sampling 'time' summed over its tasks.
+        sequences (dict, optional): Low-discrepancy sequences of the 'halton' and 'sobol' methods keyed by
+                                    (region index, method). Regions missing from it get a sequence scrambled
+                                    from their seed stream, which is added, and the sequences are advanced
+                                    past the candidates used, so passing the same dict again extends the
+                                    points instead of repeating them.
+
+    Returns:
+        tuple: An (n, 2) coordinate array and an (n,) integer array with the index of the region
+               each point belongs to.
+    """
+    if method in SEQUENCES and envelopes is None:
+        # The candidates of a region come from one sequence, consumed in order by a single task
+        task_size = max(max(points_allocation, default=0), 1)
+    tasks = _region_tasks(region_polygons, points_allocation, boundary_distance, seed, method, triangulations,
+                          envelopes, task_size, sequences)
+    task_stats = [{} for _ in tasks]
+
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        coordinates = [_run_task(task, counters) for task, counters in zip(tasks, task_stats)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            coordinates = list(executor.map(_run_task, tasks, task_stats))
+    if stats is not None:
+        stats.update(_region_stats(points_allocation, tasks, task_stats))
+
+    if not coordinates:
+        return np.empty((0, 2), dtype=np.float64), np.empty(0, dtype=np.int32)
+    region_index = [np.full(count, i, dtype=np.int32) for i, count, _, _ in tasks]
+    return np.concatenate(coordinates), np.concatenate(region_index)
+
+
+class BoundaryDistanceSpacing:
+    def __init__(self, boundary, h_min, h_max, width):
+        """
+        Node spacing that grows linearly with the distance to a boundary.
+
+        The spacing is `h_min` on the boundary and reaches `h_max` at distance `width`. Distances
+        come from one nearest-segment query over a `shapely.STRtree` of the boundary segments,
+        limited to `width`.
+
+        Args:
+            boundary (shapely.geometry.base.BaseGeometry): Boundary lines.
+            h_min (float): Spacing on the boundary.
+            h_max (float): Spacing far from the boundary.
+            width (float): Distance over which the spacing grows from `h_min` to `h_max`.
+        """
+        self.h_min = h_min
+        self.h_max = h_max
+        self.width = width
+        segments = []
+        for line in shapely.get_parts(boundary):
+            coords = shapely.get_coordinates(line)
+            segments.append(shapely.linestrings(np.stack((coords[:-1], coords[1:]), axis=1)))
+        self.tree = shapely.STRtree(np.concatenate(segments) if segments else [])
+
+    def distance(self, x, y):
+        """
+        Distance to the boundary, clipped to `width`.
+
+        Args:
+            x (numpy.ndarray): x coordinates.
+            y (numpy.ndarray): y coordinates.
+
+        Returns:
+            numpy.ndarray: The clipped distances.
+        """
+        distance = np.full(len(x), float(self.width))
+        (query_index, _), found = self.tree.query_nearest(shapely.points(x, y), max_distance=self.width,
+                                                          return_distance=True, all_matches=False)
+        distance[query_index] = found
+        return distance
+
+    def __call__(self, x, y):
+        return self.h_min + (self.h_max - self.h_min) * self.distance(x, y) / self.width
+
+
+def poisson_disk_spacing(region_polygons, num_points):
+    """
+    Estimates the Poisson-disk spacing that yields about `num_points` points in the regions.
+
+    Args:
+        region_polygons (list): List of region Polygon objects.
+        num_points (int): Target number of points.
+
+    Returns:
+        float: The spacing.
+    """
+    total_area = sum(poly.area for poly in region_polygons)
+    return float(np.sqrt(POISSON_DISK_DENSITY * total_area / num_points))
+
+
+def locate_regions(regions, x, y):
+    """
+    Finds the region containing each point.
+
+    Args:
+        regions (list): Prepared region Polygon objects.
+        x (numpy.ndarray): x coordinates.
+        y (numpy.ndarray): y coordinates.
+
+    Returns:
+        numpy.ndarray: int32 array with the index of the first region containing each point, or -1.
+    """
+    region_index = np.full(len(x), -1, dtype=np.int32)
+    for i, region in enumerate(regions):
+        if region.is_empty:
+            continue
+        min_x, min_y, max_x, max_y = region.bounds
+        candidates = np.flatnonzero((region_index < 0) & (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y))
+        inside = shapely.contains_xy(region, x[candidates], y[candidates])
+        region_index[candidates[inside]] = i
+    return region_index
+
+
+def poisson_disk_sample(region_polygons, spacing, boundary_distance=1.0e-5, fixed_points=None, rng=None,
+                        max_attempts=24, refine_every=3, stats=None):
+    """
+    Draws a minimum-separation (Poisson-disk) point set inside the regions.
+
+    Follows Bridson's background grid with cells of width ``spacing / sqrt(2)``, so each cell holds
+    at most one point and a candidate only has to be compared with the 5 x 5 block of cells around
+    it. Instead of growing the set point by point, every round throws one dart into each square of
+    the grid that is not yet covered, and accepts darts in nine interleaved phases whose cells are
+    three cells apart and therefore cannot conflict. Every `refine_every` rounds the remaining squares
+    are split in four and the children that are already covered are dropped, so the darts
+    concentrate on the gaps that are still open. Work per round is linear in the number of open
+    squares, and `max_attempts` rounds play the role of Bridson's rejection limit.
+
+    Args:
+        region_polygons (list): List of region Polygon objects.
+        spacing (float): Minimum distance between points.
+        boundary_distance (float, optional): Distance to buffer the polygons. Defaults to 1.0e-5.
+        fixed_points (numpy.ndarray, optional): (m, 2) array of points already placed, such as the boundary
+                                                points, that new points must also keep `spacing` away from.
+        rng (numpy.random.Generator, optional): Random generator. Defaults to a fresh ``default_rng()``.
+        max_attempts (int, optional): Number of dart-throwing rounds. Defaults to 24.
+        refine_every (int, optional): Number of rounds between two subdivisions of the open squares. Defaults to 3.
+        stats (dict, optional): Receives the number of darts 'drawn' and 'accepted' and of 'rounds' played.
+
+    Returns:
+        tuple: An (n, 2) coordinate array and an (n,) integer array with the index of the region
+               each point belongs to, ordered by region.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    regions = [poly.buffer(-boundary_distance) for poly in region_polygons]
+    for region in regions:
+        prepare(region)
+    non_empty = [region for region in regions if not region.is_empty]
+    if not non_empty:
+        return np.empty((0, 2), dtype=np.float64), np.empty(0, dtype=np.int32)
+    outline = shapely.union_all(shapely.boundary(non_empty))
+    prepare(outline)
+
+    min_x, min_y, max_x, max_y = shapely.total_bounds(non_empty)
+    cell = spacing / np.sqrt(2.0)
+    nx = max(int(np.ceil((max_x - min_x) / cell)), 1)
+    ny = max(int(np.ceil((max_y - min_y) / cell)), 1)
+    pad = 2  # Padding so that the 5 x 5 neighbourhood of every cell stays inside the grid
+    grid = np.full((ny + 2 * pad, nx + 2 * pad), -1, dtype=np.int64)
+    # 5 x 5 block without its corners, which are always at least spacing away
+    offsets = [(di, dj) for dj in range(-2, 3) for di in range(-2, 3) if abs(di) + abs(dj) < 4]
+    fixed = GridIndex(fixed_points, spacing) if fixed_points is not None and len(fixed_points) else None
+
+    coordinates = np.empty((0, 2), dtype=np.float64)
+    region_index = np.empty(0, dtype=np.int32)
+    count = 0
+
+    def open_squares(x0, y0, size):
+        """Keeps the squares that may still receive a point."""
+        ci = np.floor((x0 - min_x) / cell + 1e-9).astype(np.int64)
+        cj = np.floor((y0 - min_y) / cell + 1e-9).astype(np.int64)
+        keep = grid[cj + pad, ci + pad] < 0
+        # Drop squares entirely outside the regions
+        cx, cy = x0 + 0.5 * size, y0 + 0.5 * size
+        outside = keep & (locate_regions(regions, cx, cy) < 0)
+        outside[outside] = ~shapely.dwithin(outline, shapely.points(cx[outside], cy[outside]),
+                                             0.75 * size[outside])
+        keep &= ~outside
+        # Drop squares covered by a single point, or, once they are small, whose corners, edge
+        # midpoints and centre are all within spacing of some point. All squares share one size.
+        small = len(size) and size[0] <= cell / 4
+        probes = [(fx, fy) for fy in (0.0, 0.5, 1.0) for fx in (0.0, 0.5, 1.0)] if small else []
+        covered = np.zeros(len(x0), dtype=bool)
+        probe_covered = np.zeros((len(probes), len(x0)), dtype=bool)
+        neighbours = [(grid[cj + pad + dj, ci + pad + di], None) for di, dj in offsets]
+        if fixed is not None:
+            query_index, point_index = fixed.pairs(np.column_stack((cx, cy)), 2)
+            neighbours.append((point_index, query_index))
+        for neighbour, query_index in neighbours:
+            if query_index is None:
+                query_index = np.flatnonzero(keep & (neighbour >= 0))
+                px, py = coordinates[neighbour[query_index], 0], coordinates[neighbour[query_index], 1]
+            else:
+                px, py = fixed.points[neighbour, 0], fixed.points[neighbour, 1]
+            qx, qy, qs = x0[query_index], y0[query_index], size[query_index]
+            far_x = np.maximum(np.abs(px - qx), np.abs(px - qx - qs))
+            far_y = np.maximum(np.abs(py - qy), np.abs(py - qy - qs))
+            covered[query_index[far_x * far_x + far_y * far_y <= spacing * spacing]] = True
+            for k, (fx, fy) in enumerate(probes):
+                delta_x = px - qx - fx * qs
+                delta_y = py - qy - fy * qs
+                probe_covered[k, query_index[delta_x * delta_x + delta_y * delta_y <= spacing * spacing]] = True
+        if probes:
+            covered |= probe_covered.all(axis=0)
+        keep &= ~covered
+        return x0[keep], y0[keep], size[keep], ci[keep], cj[keep]
+
+    ci, cj = np.meshgrid(np.arange(nx), np.arange(ny))
+    x0, y0, size, ci, cj = open_squares(min_x + ci.ravel() * cell, min_y + cj.ravel() * cell,
+                                        np.full(nx * ny, cell))
+
+    for attempt in range(max_attempts):
+        if attempt and attempt % refine_every == 0:
+            # Split the open squares in four and keep the children that are still open
+            x0, y0, size, ci, cj = open_squares(x0, y0, size)
+            half = 0.5 * size
+            x0 = np.concatenate((x0, x0 + half, x0, x0 + half))
+            y0 = np.concatenate((y0, y0, y0 + half, y0 + half))
+            size = np.tile(half, 4)
+            x0, y0, size, ci, cj = open_squares(x0, y0, size)
+        if len(x0) == 0:
+            break
+        _count(stats, drawn=len(x0), rounds=1)
+
+        x = x0 + rng.random(len(x0)) * size
+        y = y0 + rng.random(len(x0)) * size
+        candidate_region = locate_regions(regions, x, y)
+        valid = candidate_region >= 0
+        if fixed is not None:
+            valid[valid] = ~fixed.any_within(np.column_stack((x[valid], y[valid])), spacing)
+
+        candidates = np.flatnonzero(valid)
+        phase = (cj[candidates] % 3) * 3 + ci[candidates] % 3
+        candidates = candidates[np.argsort(phase, kind='stable')]
+        bounds = np.searchsorted(np.sort(phase), np.arange(10))
+        for p in range(9):
+            batch = candidates[bounds[p]:bounds[p + 1]]
+            # At most one dart per grid cell, since a cell holds at most one point
+            batch = batch[np.unique(cj[batch] * nx + ci[batch], return_index=True)[1]]
+            if len(batch) == 0:
+                continue
+            bx, by, bi, bj = x[batch], y[batch], ci[batch], cj[batch]
+
+            # Reject darts closer than spacing to a point accepted earlier
+            conflict = np.zeros(len(batch), dtype=bool)
+            for di, dj in offsets:
+                neighbour = grid[bj + pad + dj, bi + pad + di]
+                occupied = np.flatnonzero(neighbour >= 0)
+                delta_x = bx[occupied] - coordinates[neighbour[occupied], 0]
+                delta_y = by[occupied] - coordinates[neighbour[occupied], 1]
+                conflict[occupied[delta_x * delta_x + delta_y * delta_y < spacing * spacing]] = True
+            keep = ~conflict
+            if not keep.any():
+                continue
+
+            if count + keep.sum() > len(coordinates):
+                capacity = max(2 * len(coordinates), count + int(keep.sum()))
+                coordinates = np.resize(coordinates, (capacity, 2))
+                region_index = np.resize(region_index, capacity)
+            new = np.arange(count, count + keep.sum())
+            coordinates[new, 0], coordinates[new, 1] = bx[keep], by[keep]
+            region_index[new] = candidate_region[batch[keep]]
+            grid[bj[keep] + pad, bi[keep] + pad] = new
+            count += len(new)
+
+        # Squares in a cell that just received a point are closed
+        free = grid[cj + pad, ci + pad] < 0
+        x0, y0, size, ci, cj = x0[free], y0[free], size[free], ci[free], cj[free]
+
+    _count(stats, accepted=count)
+    order = np.argsort(region_index[:count], kind='stable')
+    return coordinates[:count][order], region_index[:count][order]
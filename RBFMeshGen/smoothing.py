@@ -0,0 +1,120 @@
+import numpy as np
+import shapely
+
+from .spatial_index import GridIndex
+
+# Fractions of a rejected move tried, in order, before a node is left where it was
+BACKTRACK_FRACTIONS = (0.5, 0.25, 0.125)
+
+
+def _repulsion(block, block_index, nodes, neighbours, step):
+    """Displacement of each node of a block away from its neighbours, and the local spacing."""
+    delta = block[:, None, :] - nodes[neighbours]
+    distances = np.sqrt(np.einsum('ijk,ijk->ij', delta, delta))
+    # The node itself, and exact duplicates, sit at distance 0 and exert no force
+    valid = (neighbours != block_index[:, None]) & (distances > 0.0)
+    safe = np.where(valid, distances, np.inf)
+    h = safe.min(axis=1)  # Distance to the nearest other node, the local spacing
+    h[~np.isfinite(h)] = 0.0
+
+    # Coulomb-like force h**2 * sum(r / |r|**3), which stays of order one whatever the spacing
+    weight = np.where(valid, h[:, None] ** 2 / safe ** 3, 0.0)
+    force = np.einsum('ij,ijk->ik', weight, delta)
+    return step * h[:, None] * force, h
+
+
+def _contained(regions, region_index, xy):
+    """Checks that each point lies in its region, testing the points of one region at a time."""
+    inside = np.zeros(len(xy), dtype=bool)
+    order = np.argsort(region_index, kind='stable')
+    bounds = np.searchsorted(region_index[order], np.arange(len(regions) + 1))
+    for i, region in enumerate(regions):
+        members = order[bounds[i]:bounds[i + 1]]
+        if len(members):
+            inside[members] = shapely.contains_xy(region, xy[members, 0], xy[members, 1])
+    return inside
+
+
+def repel_nodes(points, fixed_points=None, regions=None, region_index=None, iterations=10, k=7, step=0.1,
+                rebuild_every=3, chunk_size=100_000, stats=None):
+    """
+    Spreads nodes apart with nearest-neighbour repulsion.
+
+    Every iteration indexes all the nodes in a GridIndex, finds the k nearest neighbours of each movable
+    node with batched queries and moves it by ``step * h * h**2 * sum(r / |r|**3)``, where the sum runs
+    over the vectors r from the neighbours and h is the distance to the nearest of them. The force is
+    thus scale free and nodes keep their local spacing while irregular gaps and clusters even out.
+    Moves are computed from the positions at the start of the iteration and applied together, so the
+    cost of an iteration is that of building the index and of the kNN queries. As nodes move by a small
+    fraction of the spacing, the neighbour lists can be kept for `rebuild_every` iterations, which
+    leaves only the force evaluation in the other iterations.
+
+    When `regions` are given, a node whose move leaves its region is pulled back along the move by the
+    BACKTRACK_FRACTIONS, and stays where it was if none of them is inside.
+
+    Args:
+        points (numpy.ndarray): Array of shape (n, 2) with the movable nodes.
+        fixed_points (numpy.ndarray, optional): Array of shape (m, 2) with nodes that repel but never move,
+                                                such as the boundary points.
+        regions (list, optional): Prepared Polygon objects the nodes must stay in. Defaults to no constraint.
+        region_index (numpy.ndarray, optional): Index in `regions` of the region of each node. Nodes with a
+                                                negative index are not moved. Required with `regions`.
+        iterations (int, optional): Number of repulsion steps. Defaults to 10.
+        k (int, optional): Number of neighbours pushing each node. Defaults to 7.
+        step (float, optional): Step size, as a fraction of the local spacing. Defaults to 0.1.
+        rebuild_every (int, optional): Number of iterations between two neighbour searches. Defaults to 3.
+        chunk_size (int, optional): Number of nodes whose neighbours are searched at once. Defaults to 100000.
+        stats (dict, optional): Receives the number of moves 'pulled_back' inside their region and
+                                'reverted', summed over the iterations, and the mean move relative to the
+                                local spacing of the last iteration, 'mean_move'.
+
+    Returns:
+        numpy.ndarray: Array of shape (n, 2) with the moved nodes.
+    """
+    points = np.array(points, dtype=np.float64).reshape(-1, 2)
+    fixed_points = np.empty((0, 2)) if fixed_points is None else np.asarray(fixed_points, dtype=np.float64)
+    movable = np.ones(len(points), dtype=bool) if region_index is None else np.asarray(region_index) >= 0
+    if stats is not None:
+        stats.update(pulled_back=0, reverted=0, mean_move=0.0)
+    if len(points) + len(fixed_points) <= k or not movable.any():
+        return points
+    active = np.flatnonzero(movable)
+
+    neighbours = np.empty((len(active), k + 1), dtype=np.int32)
+    for iteration in range(iterations):
+        nodes = np.concatenate((points, fixed_points))
+        if iteration % rebuild_every == 0:
+            index = GridIndex(nodes)
+            for start in range(0, len(active), chunk_size):
+                neighbours[start:start + chunk_size] = index.knn(points[active[start:start + chunk_size]], k + 1,
+                                                                 chunk_size)[0]
+        displacement = np.empty((len(active), 2))
+        spacing = np.empty(len(active))
+        for start in range(0, len(active), chunk_size):
+            block_index = active[start:start + chunk_size]
+            displacement[start:start + len(block_index)], spacing[start:start + len(block_index)] = _repulsion(
+                points[block_index], block_index, nodes, neighbours[start:start + len(block_index)], step)
+
+        old = points[active]
+        new = old + displacement
+        if regions is not None:
+            active_regions = region_index[active]
+            outside = np.flatnonzero(~_contained(regions, active_regions, new))
+            pulled_back = len(outside)
+            for fraction in BACKTRACK_FRACTIONS:
+                if not len(outside):
+                    break
+                new[outside] = old[outside] + fraction * displacement[outside]
+                outside = outside[~_contained(regions, active_regions[outside], new[outside])]
+            new[outside] = old[outside]
+            if stats is not None:
+                stats['pulled_back'] += pulled_back - len(outside)
+                stats['reverted'] += len(outside)
+        points[active] = new
+
+        if stats is not None:
+            moved = np.sqrt(np.einsum('ij,ij->i', new - old, new - old))
+            positive = spacing > 0
+            stats['mean_move'] = float((moved[positive] / spacing[positive]).mean()) if positive.any() else 0.0
+
+    return points
@@ -0,0 +1,547 @@
+import numpy as np
+
+# Bits per coordinate of the quadtree keys, so that the keys of both coordinates fit in 64 bits
+QUADTREE_BITS = 30
+
+
+def _spread_bits(values):
+    """Inserts a zero bit after each of the low 32 bits of unsigned 64-bit integers."""
+    values = values & np.uint64(0x00000000FFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def _split_by_total(counts, max_total):
+    """Splits range(len(counts)) into consecutive blocks whose counts add up to about `max_total` at most."""
+    cumulative = np.cumsum(counts)
+    bounds = np.searchsorted(cumulative, np.arange(max_total, cumulative[-1] if len(counts) else 0, max_total),
+                             side='right')
+    return [block for block in np.split(np.arange(len(counts)), bounds) if len(block)]
+
+
+class GridIndex:
+    def __init__(self, points, cell_size=None):
+        """
+        Uniform background grid over a point set, stored in compressed (CSR) form.
+
+        Points are sorted by the id of the cell that contains them, and `offsets[c]:offsets[c + 1]`
+        gives the slice of `order` holding the points of cell `c`. Every query is answered with
+        vectorized gathers over a fixed block of neighbouring cells, never with all-pairs distances.
+
+        Args:
+            points (numpy.ndarray): Array of shape (n, 2) with the indexed coordinates.
+            cell_size (float, optional): Width of the grid cells. Defaults to the spacing that puts
+                                         about one point in each cell.
+
+        Attributes:
+            points (numpy.ndarray): The indexed coordinates.
+            cell_size (float): Width of the grid cells.
+            origin (numpy.ndarray): Lower left corner of the grid.
+            shape (tuple): Number of cells along x and y.
+            order (numpy.ndarray): Point indices sorted by cell.
+            offsets (numpy.ndarray): Start of each cell in `order`, with a final sentinel.
+        """
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(self.points)
+        if n == 0:
+            lower, upper = np.zeros(2), np.ones(2)
+        else:
+            lower, upper = self.points.min(axis=0), self.points.max(axis=0)
+        if cell_size is None:
+            extent = np.maximum(upper - lower, np.finfo(np.float64).eps)
+            cell_size = float(np.sqrt(extent[0] * extent[1] / max(n, 1)))
+            cell_size = max(cell_size, float(extent.max()) / 4096)  # Keep the dense offsets array bounded
+        self.cell_size = cell_size
+        self.origin = lower
+        self.shape = tuple(int(v) for v in np.floor((upper - lower) / cell_size).astype(np.int64) + 1)
+
+        cells = self._cell_ids(*self._cell_coordinates(self.points))
+        self.order = np.argsort(cells, kind='stable')
+        self.offsets = np.searchsorted(cells[self.order], np.arange(self.shape[0] * self.shape[1] + 1))
+        self._quadtree = None  # Built by `nearest_distance` on first use, see _tree
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell_coordinates(self, points):
+        ij = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return ij[:, 0], ij[:, 1]
+
+    def _cell_ids(self, i, j):
+        return j * self.shape[0] + i
+
+    def pairs(self, queries, rings=1):
+        """
+        Lists the indexed points lying in the block of cells around each query point.
+
+        Args:
+            queries (numpy.ndarray): Array of shape (m, 2) with the query coordinates.
+            rings (int, optional): Number of cell rings searched around the cell of each query.
+                                   Defaults to 1, which covers a 3 x 3 block.
+
+        Returns:
+            tuple: Two integer arrays (query_index, point_index) with one entry per candidate pair.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        qi, qj = self._cell_coordinates(queries)
+        query_index = []
+        point_index = []
+        if len(queries) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Offsets that fall outside the grid for every query are skipped
+        di_range = range(max(-rings, -int(qi.max())), min(rings, self.shape[0] - 1 - int(qi.min())) + 1)
+        dj_range = range(max(-rings, -int(qj.max())), min(rings, self.shape[1] - 1 - int(qj.min())) + 1)
+        for dj in dj_range:
+            for di in di_range:
+                i, j = qi + di, qj + dj
+                valid = np.flatnonzero((i >= 0) & (i < self.shape[0]) & (j >= 0) & (j < self.shape[1]))
+                cells = self._cell_ids(i[valid], j[valid])
+                start = self.offsets[cells]
+                counts = self.offsets[cells + 1] - start
+                total = counts.sum()
+                if total == 0:
+                    continue
+                first = np.cumsum(counts) - counts
+                position = np.arange(total) - np.repeat(first, counts) + np.repeat(start, counts)
+                query_index.append(np.repeat(valid, counts))
+                point_index.append(self.order[position])
+        if not query_index:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(query_index), np.concatenate(point_index)
+
+    def any_within(self, queries, radius, chunk_size=100_000):
+        """
+        Checks which query points have an indexed point closer than `radius`.
+
+        Args:
+            queries (numpy.ndarray): Array of shape (m, 2) with the query coordinates.
+            radius (float): Search radius.
+            chunk_size (int, optional): Number of queries processed at once. Defaults to 100000.
+
+        Returns:
+            numpy.ndarray: Boolean array of length m.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        found = np.zeros(len(queries), dtype=bool)
+        rings = int(np.ceil(radius / self.cell_size))
+        for start in range(0, len(queries), chunk_size):
+            block = queries[start:start + chunk_size]
+            query_index, point_index = self.pairs(block, rings)
+            delta = block[query_index] - self.points[point_index]
+            close = np.einsum('ij,ij->i', delta, delta) < radius * radius
+            found[start:start + len(block)] = np.bincount(query_index[close], minlength=len(block)) > 0
+        return found
+
+    def knn(self, queries, k, chunk_size=100_000, max_per_cell=8):
+        """
+        Finds the `k` indexed points closest to each query point.
+
+        Every query starts with the block of cells expected to hold about `k` points. Once `k`
+        candidates are found, the block is widened until it covers the distance to the k-th of them,
+        which makes the answer exact. The candidates of a chunk of queries are scattered into a dense
+        (queries, candidates) table and reduced with `numpy.argpartition`. Queries whose block holds more
+        than `max_per_cell` points per cell, as in clusters far denser than the average, are answered by
+        the quadtree of `nearest_distance` instead.
+
+        Args:
+            queries (numpy.ndarray): Array of shape (m, 2) with the query coordinates.
+            k (int): Number of neighbours.
+            chunk_size (int, optional): Number of queries processed at once. Defaults to 100000.
+            max_per_cell (int, optional): Largest average number of points per cell of the block of a query
+                                          searched in the grid. Defaults to 8.
+
+        Returns:
+            tuple: An (m, k) int32 array with the indices of the neighbours, sorted by distance, and an
+                   (m, k) float array with the distances.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if not 0 < k <= len(self.points):
+            raise ValueError(f'k must be between 1 and the number of indexed points ({len(self.points)})')
+        indices = np.empty((len(queries), k), dtype=np.int32)
+        distances = np.empty((len(queries), k), dtype=np.float64)
+        density = len(self.points) / (self.shape[0] * self.shape[1])
+        first_rings = max(int(np.ceil(np.sqrt(k / density) / 2)), 1)
+
+        # Queries are processed in cell order so that neighbouring queries share candidate cells
+        qi, qj = self._cell_coordinates(queries)
+        by_cell = np.argsort(self._cell_ids(np.clip(qi, 0, self.shape[0] - 1), np.clip(qj, 0, self.shape[1] - 1)),
+                             kind='stable')
+        for start in range(0, len(queries), chunk_size):
+            pending = by_cell[start:start + chunk_size]
+            rings = np.full(len(pending), first_rings)
+            while len(pending):
+                # Queries needing the same block size are searched together
+                ring = rings.min()
+                batch = pending[rings == ring]
+                if (2 * ring + 1) ** 2 >= len(self.points) and len(self.points) <= max_per_cell * k:
+                    # Few points and a block holding more cells than points: compare with all of them
+                    indices[batch], distances[batch] = self._knn_all(queries[batch], k)
+                    pending, rings = pending[rings != ring], rings[rings != ring]
+                    continue
+                # Crowded blocks, as in clusters far denser than the average, and blocks spanning more
+                # cells than there are points go to the quadtree
+                crowded = ((self._block_rows(queries[batch], ring)[1] > max_per_cell * (2 * ring + 1) ** 2)
+                           | ((2 * ring + 1) ** 2 >= len(self.points)))
+                if crowded.any():
+                    found_index, found_squared = self._tree().knn(queries[batch[crowded], 0],
+                                                                  queries[batch[crowded], 1], k)
+                    indices[batch[crowded]], distances[batch[crowded]] = found_index, np.sqrt(found_squared)
+                    batch = batch[~crowded]
+                found_index, found_distance, enough = self._knn_block(queries[batch], k, ring)
+                indices[batch[enough]] = found_index[enough]
+                distances[batch[enough]] = found_distance[enough]
+
+                retry = ~enough
+                # Grow to the distance of the k-th candidate, rounded up to a power of two so that
+                # few distinct block sizes are searched
+                needed = np.where(np.isfinite(found_distance[retry, -1]),
+                                  np.ceil(found_distance[retry, -1] / self.cell_size), 2 * ring)
+                grown = 2 ** np.ceil(np.log2(np.maximum(needed, ring + 1))).astype(np.int64)
+                left = rings != ring
+                pending = np.concatenate((pending[left], batch[retry]))
+                rings = np.concatenate((rings[left], grown))
+        return indices, distances
+
+    def nearest_distance(self, queries=None, chunk_size=1_000_000):
+        """
+        Distance from each query point to the closest indexed point.
+
+        A lighter form of `knn` with k = 1 for bulk queries. The cells of one row of the block around a
+        query are consecutive in `order`, so the candidates of a row form a single slice, and they are
+        reduced with `numpy.minimum.reduceat` without building a candidate table. Queries are searched in
+        a 3 x 3 block, then those whose closest candidate is farther than one cell, and so may miss a
+        point outside the block, in a 5 x 5 block. The few left after that, and the queries whose block is
+        too crowded to scan, as in clusters far denser than the average, are answered by a quadtree built
+        over the points on first use, whose cells refine down to the local density.
+
+        Args:
+            queries (numpy.ndarray, optional): Array of shape (m, 2) with the query coordinates. Defaults to
+                                               the indexed points, each ignoring itself, which gives the
+                                               distance from every point to its nearest neighbour.
+            chunk_size (int, optional): Number of queries processed at once. Defaults to 1000000.
+
+        Returns:
+            numpy.ndarray: Float array of length m with the distances, inf when no point qualifies.
+        """
+        # Queries are processed in cell order, and coordinates gathered one axis at a time, so that
+        # the candidates of neighbouring queries are close in memory
+        x, y = self.points[self.order, 0], self.points[self.order, 1]
+        self_query = queries is None
+        if self_query:
+            by_cell, query_x, query_y = self.order, x, y
+        else:
+            queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+            qi, qj = self._cell_coordinates(queries)
+            by_cell = np.argsort(self._cell_ids(np.clip(qi, 0, self.shape[0] - 1),
+                                                np.clip(qj, 0, self.shape[1] - 1)), kind='stable')
+            query_x, query_y = queries[by_cell, 0], queries[by_cell, 1]
+
+        squared = np.full(len(by_cell), np.inf)
+        for start in range(0, len(by_cell), chunk_size):
+            pending = np.arange(start, min(start + chunk_size, len(by_cell)))
+            crowded = []
+            for rings in (1, 2):
+                found, skipped = self._nearest_block(query_x[pending], query_y[pending], x, y, rings,
+                                                     pending if self_query else None)
+                squared[pending] = found
+                crowded.append(pending[skipped])
+                # The block holds every point closer than `rings` cells to the query
+                pending = pending[~skipped & (found > (rings * self.cell_size) ** 2)]
+
+            pending = np.concatenate(crowded + [pending])
+            if len(pending) and len(self.points):
+                squared[pending] = self._tree().nearest(query_x[pending], query_y[pending],
+                                                        by_cell[pending] if self_query else None)
+
+        distances = np.empty(len(by_cell))
+        distances[by_cell] = np.sqrt(squared)
+        return distances
+
+    def _tree(self):
+        """Returns the quadtree over the points, built on first use."""
+        if self._quadtree is None:
+            self._quadtree = _Quadtree(self.points)
+        return self._quadtree
+
+    def _block_rows(self, queries, rings):
+        """
+        Slices of `order` holding the rows of cells of the block of `rings` cells around each query.
+
+        Returns:
+            tuple: A list with one (start, count) pair of arrays per row of the block, and the number of
+                   points in the block of each query.
+        """
+        qi, qj = self._cell_coordinates(queries)
+        low = np.clip(qi - rings, 0, self.shape[0] - 1)
+        high = np.clip(qi + rings, 0, self.shape[0] - 1)
+        overlaps = (qi + rings >= 0) & (qi - rings < self.shape[0])
+        rows = []
+        total = np.zeros(len(queries), dtype=np.int64)
+        for dj in range(-rings, rings + 1):
+            j = qj + dj
+            row = np.clip(j, 0, self.shape[1] - 1)
+            row_start = self.offsets[self._cell_ids(low, row)]
+            counts = np.where(overlaps & (j >= 0) & (j < self.shape[1]),
+                              self.offsets[self._cell_ids(high, row) + 1] - row_start, 0)
+            rows.append((row_start, counts))
+            total += counts
+        return rows, total
+
+    def _nearest_block(self, query_x, query_y, x, y, rings, own=None, max_per_cell=8, max_candidates=10_000_000):
+        """
+        Squared distance to the closest point in the block of `rings` cells, skipping the positions `own`.
+
+        Queries whose block holds more than `max_per_cell` points per cell are skipped, with an inf distance,
+        and flagged in the returned mask. The others are scanned about `max_candidates` candidates at a time.
+        """
+        rows, total = self._block_rows(np.column_stack((query_x, query_y)), rings)
+        best = np.full(len(query_x), np.inf)
+        crowded = total > max_per_cell * (2 * rings + 1) ** 2
+        scanned = np.flatnonzero(~crowded)
+        for block in _split_by_total(total[scanned], max_candidates):
+            block = scanned[block]
+            for row_start, counts in rows:
+                row_start, counts = row_start[block], counts[block]
+                occupied = counts > 0
+                valid, row_start, counts = block[occupied], row_start[occupied], counts[occupied]
+                if not len(valid):
+                    continue
+                # Candidates of one query are contiguous, starting at `first`
+                first = np.cumsum(counts) - counts
+                position = np.arange(counts.sum()) - np.repeat(first - row_start, counts)
+                owner = np.repeat(valid, counts)
+                dx, dy = query_x[owner] - x[position], query_y[owner] - y[position]
+                candidate = dx * dx + dy * dy
+                if own is not None:
+                    candidate[position == own[owner]] = np.inf
+                best[valid] = np.minimum(best[valid], np.minimum.reduceat(candidate, first))
+        return best, crowded
+
+    def _knn_block(self, queries, k, rings, max_table=10_000_000):
+        """Returns the k nearest candidates within `rings` and whether they are guaranteed exact."""
+        # The candidates are counted from the offsets before any pair is built
+        counts = self._block_rows(queries, rings)[1]
+        width = max(int(counts.max()) if len(counts) else 0, k)
+        if len(queries) > 1 and len(queries) * width > max_table:
+            # Keep the dense table below `max_table` entries by splitting the queries
+            half = len(queries) // 2
+            head, tail = self._knn_block(queries[:half], k, rings), self._knn_block(queries[half:], k, rings)
+            return tuple(np.concatenate(parts) for parts in zip(head, tail))
+        query_index, point_index = self.pairs(queries, rings)
+        if len(query_index) == 0:
+            return (np.full((len(queries), k), -1, dtype=np.int64), np.full((len(queries), k), np.inf),
+                    np.zeros(len(queries), dtype=bool))
+        delta = queries[query_index] - self.points[point_index]
+        squared = np.einsum('ij,ij->i', delta, delta)
+
+        # Scatter the candidates of each query into one row of a dense table
+        order = np.argsort(query_index, kind='stable')
+        column = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+        table = np.full((len(queries), width), np.inf)
+        table[query_index[order], column] = squared[order]
+
+        nearest = np.argpartition(table, k - 1, axis=1)[:, :k]
+        nearest_squared = np.take_along_axis(table, nearest, axis=1)
+        by_distance = np.argsort(nearest_squared, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, by_distance, axis=1)
+        found_distance = np.sqrt(np.take_along_axis(nearest_squared, by_distance, axis=1))
+        # Map the table columns back to point indices through the sorted candidate list
+        row_start = (np.cumsum(counts) - counts)[:, None]
+        found_index = np.where(np.isfinite(found_distance),
+                               point_index[order][np.minimum(row_start + nearest, len(order) - 1)], -1)
+
+        # The block holds every point closer than `rings` cells to the query
+        enough = (counts >= k) & (found_distance[:, -1] <= rings * self.cell_size)
+        return found_index, found_distance, enough
+
+    def _knn_all(self, queries, k):
+        """Brute-force k nearest neighbours, in blocks of queries against all the points."""
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float64)
+        rows = max(1, 4_000_000 // len(self.points))
+        for start in range(0, len(queries), rows):
+            delta = queries[start:start + rows, None, :] - self.points[None, :, :]
+            squared = np.einsum('ijk,ijk->ij', delta, delta)
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+            by_distance = np.argsort(nearest_squared, axis=1, kind='stable')
+            indices[start:start + rows] = np.take_along_axis(nearest, by_distance, axis=1)
+            distances[start:start + rows] = np.sqrt(np.take_along_axis(nearest_squared, by_distance, axis=1))
+        return indices, distances
+
+
+class _Quadtree:
+    def __init__(self, points, leaf_size=16, max_candidates=10_000_000):
+        """
+        Linear quadtree over a point set, for nearest-neighbour queries on strongly non-uniform densities.
+
+        Points are sorted by the Morton key of their coordinates quantized to QUADTREE_BITS bits. The
+        points of any quadtree cell are then a contiguous slice of the sorted keys, found by binary
+        search, so the cells never need to be stored and are refined only where there are points.
+
+        Args:
+            points (numpy.ndarray): Array of shape (n, 2) with the indexed coordinates, n > 0.
+            leaf_size (int, optional): Cells holding at most this many points are scanned instead of
+                                       refined. Defaults to 16.
+            max_candidates (int, optional): Largest number of candidate distances computed at once.
+                                            Defaults to 10000000.
+        """
+        self.leaf_size = leaf_size
+        self.max_candidates = max_candidates
+        self.lower = points.min(axis=0)
+        extent = float((points.max(axis=0) - self.lower).max())
+        self.extent = extent if extent > 0 else 1.0
+        keys = self._keys(*self._quantize(points[:, 0], points[:, 1]))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.x, self.y = points[self.order, 0], points[self.order, 1]
+
+    def _quantize(self, x, y):
+        scale = 2.0 ** QUADTREE_BITS / self.extent
+        top = 2.0 ** QUADTREE_BITS - 1
+        return (np.clip(np.floor((x - self.lower[0]) * scale), 0, top).astype(np.uint64),
+                np.clip(np.floor((y - self.lower[1]) * scale), 0, top).astype(np.uint64))
+
+    @staticmethod
+    def _keys(i, j):
+        return _spread_bits(i) | (_spread_bits(j) << np.uint64(1))
+
+    def nearest(self, query_x, query_y, own=None):
+        """Squared distance from each query to the closest point, skipping the point `own[q]` of query q."""
+        return self.knn(query_x, query_y, 1, own)[1][:, 0]
+
+    def knn(self, query_x, query_y, k, own=None):
+        """
+        Finds the `k` points closest to each query, skipping the point `own[q]` of query q.
+
+        The k-th closest of the `window` points on each side of the query along the Morton curve, with
+        `window` at least k, gives an upper bound d. The search then starts from the cells of the level
+        whose width is at least 4 d, at most 2 x 2 of which meet the disk of radius d, and refines every
+        cell closer than the k-th best distance found so far down to cells of at most `leaf_size` points,
+        which are scanned. The far corner of every cell holding at least k points also bounds the k-th
+        distance on the way down.
+
+        Returns:
+            tuple: An (m, k) int64 array with the indices of the points, sorted by distance, -1 past the
+                   last point found, and an (m, k) float array with the squared distances.
+        """
+        n = len(self.keys)
+        m = len(query_x)
+        best_index = np.full((m, k), -1, dtype=np.int64)
+        best = np.full((m, k), np.inf)
+        # Points a cell must hold for its far corner to bound the k-th distance
+        enough = k + (own is not None)
+
+        # Bound from the neighbours along the curve, which are scanned again later and so only bound
+        window = max(8, k)
+        rank = np.searchsorted(self.keys, self._keys(*self._quantize(query_x, query_y)))
+        position = rank[:, None] + np.arange(-window, window + 1)
+        inside = (position >= 0) & (position < n)
+        position = np.clip(position, 0, n - 1)
+        dx, dy = query_x[:, None] - self.x[position], query_y[:, None] - self.y[position]
+        candidate = np.where(inside, dx * dx + dy * dy, np.inf)
+        if own is not None:
+            candidate[self.order[position] == own[:, None]] = np.inf
+        limit = np.partition(candidate, k - 1, axis=1)[:, k - 1] if candidate.shape[1] >= k else np.full(m, np.inf)
+
+        # Start from the level whose cells are at least 4 d wide, where the disk of radius d meets at most the
+        # cell holding its lower left corner and the next cells along each axis. Corners are quantized like
+        # the points, so that no point of the disk falls in an earlier cell through rounding.
+        distance = np.sqrt(limit)
+        with np.errstate(divide='ignore'):
+            level = np.floor(np.log2(self.extent / (4 * distance)))
+        level = np.clip(np.nan_to_num(level, neginf=0.0), 0, QUADTREE_BITS).astype(np.int64)
+        # Queries are visited along the curve, so that the cells searched in turn are close in `keys`
+        query = np.argsort(rank, kind='stable')
+        corner_i, corner_j = self._quantize(query_x[query] - distance[query], query_y[query] - distance[query])
+        shift = (QUADTREE_BITS - level[query]).astype(np.uint64)
+        query, level = np.repeat(query, 4), np.repeat(level[query], 4)
+        i = np.repeat((corner_i >> shift).astype(np.int64), 4) + np.tile([0, 1, 0, 1], m)
+        j = np.repeat((corner_j >> shift).astype(np.int64), 4) + np.tile([0, 0, 1, 1], m)
+        inside = (i < 2 ** level) & (j < 2 ** level)
+        query, level, i, j = query[inside], level[inside], i[inside], j[inside]
+
+        # Cell bounds are padded by more than the rounding of the coordinates, which grows with their magnitude
+        pad = (float(np.abs(self.lower).max()) + self.extent) * 2.0 ** -40
+        while len(query):
+            shift = (2 * (QUADTREE_BITS - level)).astype(np.uint64)
+            prefix = self._keys(i.astype(np.uint64), j.astype(np.uint64))
+            start = np.searchsorted(self.keys, prefix << shift)
+            stop = np.searchsorted(self.keys, (prefix + np.uint64(1)) << shift)
+            width = self.extent / 2.0 ** level
+            left, bottom = self.lower[0] + i * width, self.lower[1] + j * width
+            near_x = np.maximum(np.maximum(left - query_x[query], query_x[query] - left - width), 0.0)
+            near_y = np.maximum(np.maximum(bottom - query_y[query], query_y[query] - bottom - width), 0.0)
+            gap = np.maximum(np.sqrt(near_x * near_x + near_y * near_y) - pad, 0.0)
+            far_x = np.maximum(np.abs(query_x[query] - left), np.abs(query_x[query] - left - width))
+            far_y = np.maximum(np.abs(query_y[query] - bottom), np.abs(query_y[query] - bottom - width))
+            bounding = stop - start >= enough
+            np.minimum.at(limit, query[bounding], (np.sqrt(far_x * far_x + far_y * far_y)[bounding] + pad) ** 2)
+            # The bounds are reached by points that are yet to be scanned, so cells at exactly that distance stay
+            keep = (stop > start) & (gap * gap <= np.minimum(limit, best[:, -1])[query])
+            query, level, i, j, start, stop = query[keep], level[keep], i[keep], j[keep], start[keep], stop[keep]
+
+            leaf = (stop - start <= self.leaf_size) | (level == QUADTREE_BITS)
+            self._scan_cells(best, best_index, limit, query[leaf], start[leaf], stop[leaf], query_x, query_y, own)
+            split = ~leaf
+            query, level = np.repeat(query[split], 4), np.repeat(level[split] + 1, 4)
+            i = np.repeat(2 * i[split], 4) + np.tile([0, 1, 0, 1], int(split.sum()))
+            j = np.repeat(2 * j[split], 4) + np.tile([0, 0, 1, 1], int(split.sum()))
+        return best_index, best
+
+    def _scan_cells(self, best, best_index, limit, query, start, stop, query_x, query_y, own):
+        """
+        Merges the points of each (query, cell) pair into the k best, about `max_candidates` at a time.
+        Points farther than the bound `limit` on the k-th distance of their query are skipped.
+        """
+        counts = stop - start
+        m, k = best.shape
+        for block in _split_by_total(counts, self.max_candidates):
+            block_counts = counts[block]
+            first = np.cumsum(block_counts) - block_counts
+            position = np.arange(block_counts.sum()) - np.repeat(first - start[block], block_counts)
+            owner = np.repeat(query[block], block_counts)
+            dx, dy = query_x[owner] - self.x[position], query_y[owner] - self.y[position]
+            candidate = dx * dx + dy * dy
+            if own is not None:
+                candidate[self.order[position] == own[owner]] = np.inf
+            if k == 1:
+                # The minimum of each pair, then of each query, and the point that reached it
+                pair_best = np.minimum.reduceat(candidate, first)
+                pair_query = query[block]
+                improved = pair_best < best[pair_query, 0]
+                if not improved.any():
+                    continue
+                at = np.minimum.reduceat(np.where(candidate == np.repeat(pair_best, block_counts),
+                                                  np.arange(len(candidate)), len(candidate)), first)
+                pair_query, pair_best, at = pair_query[improved], pair_best[improved], at[improved]
+                # The closest pair of each query wins
+                order = np.lexsort((pair_best, pair_query))
+                pair_query, pair_best, at = pair_query[order], pair_best[order], at[order]
+                winner = np.ones(len(order), dtype=bool)
+                winner[1:] = pair_query[1:] != pair_query[:-1]
+                best[pair_query[winner], 0] = pair_best[winner]
+                best_index[pair_query[winner], 0] = self.order[position[at[winner]]]
+                continue
+            # Only candidates closer than the current k-th best and within the bound can enter it
+            closer = (candidate < best[owner, -1]) & (candidate <= limit[owner])
+            if not closer.any():
+                continue
+            owner, position, candidate = owner[closer], position[closer], candidate[closer]
+            # Sort the current k best and the candidates of every query together and keep the first k
+            touched = np.sort(owner)
+            touched = touched[np.append(True, touched[1:] != touched[:-1])]
+            merged_query = np.concatenate((np.repeat(touched, k), owner))
+            merged = np.concatenate((best[touched].ravel(), candidate))
+            merged_index = np.concatenate((best_index[touched].ravel(), self.order[position]))
+            # By distance, then stably by query, which is faster than a lexsort
+            order = np.argsort(merged)
+            order = order[np.argsort(merged_query[order].astype(np.int32 if m < 2 ** 31 else np.int64),
+                                     kind='stable')]
+            group = np.searchsorted(merged_query[order], touched)
+            rank = np.arange(len(order)) - np.repeat(group, np.diff(np.append(group, len(order))))
+            kept = order[rank < k]
+            best[touched] = merged[kept].reshape(-1, k)
+            best_index[touched] = merged_index[kept].reshape(-1, k)
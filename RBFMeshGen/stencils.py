@@ -0,0 +1,94 @@
+import numpy as np
+
+from .spatial_index import GridIndex
+
+
+def node_coordinates(nodes):
+    """
+    Returns the (n, 2) coordinate array of a node set.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes. For an RBFMesh all the
+                                                                  points are used, border points first.
+
+    Returns:
+        numpy.ndarray: Array of shape (n, 2) with the coordinates.
+    """
+    if hasattr(nodes, 'xy'):
+        nodes = nodes.xy
+    return np.asarray(nodes, dtype=np.float64).reshape(-1, 2)
+
+
+class StencilBuilder:
+    def __init__(self, nodes, cell_size=None):
+        """
+        Nearest-neighbour stencils over a node set.
+
+        The nodes are indexed once in a GridIndex, and stencils are then answered with batched
+        k-nearest-neighbour queries, so the cost grows linearly with the number of nodes.
+
+        Args:
+            nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes. For an RBFMesh the stencil
+                                                                      indices refer to the rows of ``mesh.xy``.
+            cell_size (float, optional): Width of the grid cells. Defaults to about one node per cell.
+
+        Attributes:
+            points (numpy.ndarray): The (n, 2) node coordinates.
+            index (GridIndex): Spatial index of the nodes.
+        """
+        self.points = node_coordinates(nodes)
+        self.index = GridIndex(self.points, cell_size)
+
+    def __len__(self):
+        return len(self.points)
+
+    def build(self, k, chunk_size=100_000):
+        """
+        Builds the stencil of every node: the node itself followed by its k - 1 nearest neighbours.
+
+        Args:
+            k (int): Number of nodes in each stencil.
+            chunk_size (int, optional): Number of nodes queried at once. Defaults to 100000.
+
+        Returns:
+            tuple: An (n, k) int32 array with the node indices of each stencil, sorted by distance to
+                   its centre, and an (n, k) float array with the distances.
+        """
+        indices, distances = self.query(self.points, k, chunk_size)
+        # Duplicated nodes tie at distance 0: move the centre to the first column
+        rows = np.arange(len(indices))
+        is_centre = indices == rows[:, None]
+        swap = np.flatnonzero(~is_centre[:, 0] & is_centre.any(axis=1))
+        column = is_centre[swap].argmax(axis=1)
+        indices[swap, column] = indices[swap, 0]
+        indices[swap, 0] = swap
+        return indices, distances
+
+    def query(self, points, k, chunk_size=100_000):
+        """
+        Finds the k nodes closest to arbitrary points.
+
+        Args:
+            points (numpy.ndarray): Array of shape (m, 2) with the query coordinates.
+            k (int): Number of nodes in each stencil.
+            chunk_size (int, optional): Number of points queried at once. Defaults to 100000.
+
+        Returns:
+            tuple: An (m, k) int32 array with the node indices and an (m, k) float array with the distances.
+        """
+        return self.index.knn(points, k, chunk_size)
+
+
+def build_stencils(nodes, k, chunk_size=100_000):
+    """
+    Builds the k-nearest-neighbour stencil of every node of a mesh or node set.
+
+    Args:
+        nodes (RBFMesh, PointStore, PointView or numpy.ndarray): The nodes.
+        k (int): Number of nodes in each stencil, the centre node included.
+        chunk_size (int, optional): Number of nodes queried at once. Defaults to 100000.
+
+    Returns:
+        tuple: An (n, k) int32 index array and an (n, k) float array with the distances.
+    """
+    return StencilBuilder(nodes).build(k, chunk_size)
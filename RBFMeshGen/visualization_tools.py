@@ -2,7 +2,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from .mesh_generation import RBFMesh
-from .geometry_utils import MeshPoint
+
+# Number of points above which plot_points draws only a regular subset of them
+DEFAULT_MAX_PLOT_POINTS = 200_000
 
 
 def plot_each_polygon_separately(polygons):
@@ -62,43 +64,109 @@ def plot_all_polygons_in_one_figure(polygons):
     plt.show()
 
 
-def plot_points(points, border_size=5, interior_size=2, title='Random Mesh Points by Label'):
+def _point_arrays(points):
+    """Returns the x, y, label code and border arrays and the label table of a point set."""
+    if hasattr(points, 'xy'):
+        xy = np.asarray(points.xy)
+        return xy[:, 0], xy[:, 1], np.asarray(points.labels), np.asarray(points.is_border), points.label_table
+    points = list(points)
+    label_table = list(dict.fromkeys(p.label for p in points))
+    label_codes = {label: code for code, label in enumerate(label_table)}
+    x = np.array([p.x for p in points], dtype=np.float64)
+    y = np.array([p.y for p in points], dtype=np.float64)
+    codes = np.array([label_codes[p.label] for p in points], dtype=np.int32)
+    is_border = np.array([p.is_border for p in points], dtype=bool)
+    return x, y, codes, is_border, label_table
+
+
+def _decimate(index, budget):
+    """Keeps every k-th entry of `index` so that at most `budget` remain."""
+    if budget is None or len(index) <= budget:
+        return index
+    return index[::int(np.ceil(len(index) / max(budget, 1)))]
+
+
+def _rasterize(ax, x, y, codes, code_colors, bins):
+    """Draws points as an image whose pixels take the colour of a label they hold and an opacity
+    growing with their number of points."""
+    min_x, max_x, min_y, max_y = x.min(), x.max(), y.min(), y.max()
+    width, height = max(max_x - min_x, 1e-300), max(max_y - min_y, 1e-300)
+    nx = bins if width >= height else max(int(round(bins * width / height)), 1)
+    ny = bins if height >= width else max(int(round(bins * height / width)), 1)
+    ix = np.minimum(((x - min_x) / width * nx).astype(np.int64), nx - 1)
+    iy = np.minimum(((y - min_y) / height * ny).astype(np.int64), ny - 1)
+    pixel = iy * nx + ix
+
+    counts = np.bincount(pixel, minlength=nx * ny)
+    # Regions do not overlap, so almost every pixel holds a single label: keep the last one written
+    pixel_codes = np.zeros(nx * ny, dtype=np.int64)
+    pixel_codes[pixel] = codes
+    image = code_colors[pixel_codes].copy()
+    image[:, 3] = np.where(counts > 0, 0.25 + 0.75 * counts / counts.max(), 0.0)
+    ax.imshow(image.reshape(ny, nx, 4), origin='lower', extent=(min_x, max_x, min_y, max_y),
+              interpolation='nearest', aspect='auto')
+
+
+def plot_points(points, border_size=5, interior_size=2, title='Random Mesh Points by Label',
+                max_points=DEFAULT_MAX_PLOT_POINTS, raster=False, bins=512):
     """
     Plot points with different labels and border status.
 
+    Points are drawn from their coordinate arrays and integer label codes, with one scatter call for
+    the interior points and one for the border points, coloured through the 'tab10' colormap. Above
+    `max_points` points, the plot keeps every k-th point so that about `max_points` are drawn; with
+    `raster` the interior points are instead binned into a `bins` wide image, which shows every point
+    at a cost that does not depend on how many there are.
+
     Args:
-        points (list): List of Point objects.
+        points (list or PointStore): List of Point objects, or a PointStore/PointView holding the point arrays.
         title (str): Title of the plot.
         border_size (int): Size of border points.
         interior_size (int): Size of interior points.
+        max_points (int, optional): Largest number of points drawn as markers. None draws them all.
+                                    Defaults to DEFAULT_MAX_PLOT_POINTS.
+        raster (bool, optional): Whether to draw the interior points as a 2D histogram image. Defaults to False.
+        bins (int, optional): Number of pixels along the longest side of the image. Defaults to 512.
     Returns:
         None
     """
     # Prepare data for plotting
-    x = [p.x for p in points]
-    y = [p.y for p in points]
-    labels = [p.label for p in points]
-    is_border = [p.is_border for p in points]  # Extract border status
-
-    # Define point sizes based on border status
-    sizes = [border_size if border else interior_size for border in is_border]  # Larger size for border points
+    x, y, codes, is_border, label_table = _point_arrays(points)
 
     # Unique labels and their corresponding colors
-    unique_labels = list(set(labels))
-
-    colors = plt.cm.get_cmap('tab10', len(unique_labels))
-
-    # Create a color map from labels to colors
-    color_map = {label: colors(i) for i, label in enumerate(unique_labels)}
+    used_codes = np.unique(codes)
+    unique_labels = [label_table[code] for code in used_codes]
+    colors = plt.get_cmap('tab10', max(len(unique_labels), 1))
+    code_colors = np.zeros((max(len(label_table), 1), 4))
+    code_colors[used_codes] = colors(np.arange(len(used_codes)))
+
+    border = np.flatnonzero(is_border)
+    interior = np.flatnonzero(~is_border)
+    if max_points is not None:
+        border = _decimate(border, max_points)
+        if not raster:
+            interior = _decimate(interior, max(max_points - len(border), 0))
+    shown = len(border) + len(interior)
+    if shown < len(x) and not raster:
+        title = f'{title} ({shown} of {len(x)} points)'
 
     # Plotting
     fig, ax = plt.subplots()
-    ax.scatter(x, y, c=[color_map[label] for label in labels], s=sizes, alpha=0.6)
+    if raster and len(interior):
+        _rasterize(ax, x[interior], y[interior], codes[interior], code_colors, bins)
+    elif len(interior):
+        ax.scatter(x[interior], y[interior], c=code_colors[codes[interior]], s=interior_size, alpha=0.6,
+                   linewidths=0, rasterized=len(interior) > 10_000)
+    if len(border):
+        # Larger size for border points, drawn on top of the interior
+        ax.scatter(x[border], y[border], c=code_colors[codes[border]], s=border_size, alpha=0.6, linewidths=0)
 
     # Create a legend with label colors
-    legend_labels = {label: ax.plot([], [], marker="o", ls="", markersize=10, color=color_map[label])[0] for label in
-                     unique_labels}
-    ax.legend(legend_labels.values(), legend_labels.keys(), title="Labels")
+    legend_labels = {label: ax.plot([], [], marker="o", ls="", markersize=10, color=code_colors[code])[0]
+                     for code, label in zip(used_codes.tolist(), unique_labels)}
+    # Searching the 'best' location tests every marker, which dominates the drawing time of large plots
+    ax.legend(legend_labels.values(), legend_labels.keys(), title="Labels",
+              loc='best' if shown <= 10_000 else 'upper right')
 
     ax.set_xlabel('X Coordinate')
     ax.set_ylabel('Y Coordinate')
@@ -107,7 +175,8 @@ def plot_points(points, border_size=5, interior_size=2, title='Random Mesh Point
     plt.show()
 
 
-def plot_mesh(mesh: RBFMesh, border_size=5, interior_size=2, title='Random Mesh Points by Label'):
+def plot_mesh(mesh: RBFMesh, border_size=5, interior_size=2, title='Random Mesh Points by Label',
+              max_points=DEFAULT_MAX_PLOT_POINTS, raster=False, bins=512):
     """
     Plot points with different labels and border status.
 
@@ -116,6 +185,9 @@ def plot_mesh(mesh: RBFMesh, border_size=5, interior_size=2, title='Random Mesh
         title (str): Title of the plot.
         border_size (int): Size of border points.
         interior_size (int): Size of interior points.
+        max_points (int, optional): Largest number of points drawn as markers, see `plot_points`.
+        raster (bool, optional): Whether to draw the interior points as a 2D histogram image. Defaults to False.
+        bins (int, optional): Number of pixels along the longest side of the image. Defaults to 512.
 
     Returns:
         None
@@ -124,8 +196,8 @@ def plot_mesh(mesh: RBFMesh, border_size=5, interior_size=2, title='Random Mesh
     if len(mesh.Points) == 0 or len(mesh.Boundary_Points) == 0:
         print("No points to plot")
         return
-    points = mesh.Points + mesh.Boundary_Points
-    plot_points(points, border_size=border_size, interior_size=interior_size, title=title)
+    plot_points(mesh.point_store, border_size=border_size, interior_size=interior_size, title=title,
+                max_points=max_points, raster=raster, bins=bins)
 
 
 def plot_borders_with_orientation(borders):
@@ -141,9 +213,8 @@ def plot_borders_with_orientation(borders):
     plt.figure(figsize=(10, 8))
 
     for border in borders:
-        final_p = border.end_point
-        points = border.generate_points() + [MeshPoint(final_p[0], final_p[1])]
-        x, y = zip(*[(p.x, p.y) for p in points])
+        points = np.vstack((border.generate_points(), border.end_point))
+        x, y = points[:, 0], points[:, 1]
 
         plt.plot(x, y, label=border.label)
 
@@ -0,0 +1,72 @@
+"""
+asv benchmarks of the mesh construction stages and of point generation.
+
+Run them with ``asv run`` from the repository root, or without asv through ``python -m benchmarks.run``.
+``peakmem_*`` benchmarks report the peak resident memory of the process.
+"""
+from RBFMeshGen import RBFMesh
+from RBFMeshGen.geometry_utils import find_polygons
+from RBFMeshGen.mesh_generation import resolve_multiple_overlaps
+
+from .geometries import ABS_TOL, GEOMETRIES, make_borders, outer_polygons
+
+# Node counts of the point generation benchmarks
+NUM_POINTS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+class FindPolygons:
+    params = [list(GEOMETRIES)]
+    param_names = ['geometry']
+    number = 1
+
+    def setup(self, geometry):
+        self.borders = make_borders(geometry)
+
+    def time_find_polygons(self, geometry):
+        find_polygons(self.borders, ABS_TOL, return_junctions=True)
+
+
+class ProcessPolygons:
+    params = [list(GEOMETRIES)]
+    param_names = ['geometry']
+    number = 1
+    timeout = 300
+
+    def setup(self, geometry):
+        self.borders = make_borders(geometry)
+
+    def time_process_polygons(self, geometry):
+        RBFMesh(*self.borders, abs_tol=ABS_TOL)
+
+    def peakmem_process_polygons(self, geometry):
+        RBFMesh(*self.borders, abs_tol=ABS_TOL)
+
+
+class ResolveMultipleOverlaps:
+    params = [list(GEOMETRIES)]
+    param_names = ['geometry']
+    number = 1
+
+    def setup(self, geometry):
+        self.polygons = outer_polygons(make_borders(geometry))
+
+    def time_resolve_multiple_overlaps(self, geometry):
+        resolve_multiple_overlaps(self.polygons)
+
+
+class GeneratePoints:
+    params = [list(GEOMETRIES), NUM_POINTS, ['rejection', 'triangulate', 'halton', 'sobol']]
+    param_names = ['geometry', 'num_points', 'method']
+    number = 1
+    repeat = (1, 5, 60.0)
+    timeout = 1200
+
+    def setup(self, geometry, num_points, method):
+        # A fresh mesh for every sample, since generate_points adds to the points already in the mesh
+        self.mesh = RBFMesh(*make_borders(geometry), abs_tol=ABS_TOL)
+
+    def time_generate_points(self, geometry, num_points, method):
+        self.mesh.generate_points(num_points, method=method, seed=0)
+
+    def peakmem_generate_points(self, geometry, num_points, method):
+        self.mesh.generate_points(num_points, method=method, seed=0)
@@ -0,0 +1,153 @@
+"""
+Geometries of the benchmark suite.
+
+Each builder returns a fresh list of Border objects with their number of segments set, so that
+timings never profit from the points memoized by borders built for a previous run.
+"""
+import numpy as np
+from shapely.geometry import Polygon
+
+from RBFMeshGen import Border
+from RBFMeshGen.geometry_utils import find_polygons
+from RBFMeshGen.mesh_generation import exclude_nested_polygons
+
+# Absolute tolerance used by every benchmark, the RBFMesh default
+ABS_TOL = 1e-04
+
+
+def _circle(radius, center=(0.0, 0.0)):
+    def parametric_function(t):
+        return center[0] + radius * np.cos(t), center[1] + radius * np.sin(t)
+    return parametric_function
+
+
+def example_1():
+    """Annulus of examples/example_1.py."""
+    return [Border(_circle(1.0), label=1, t_start=0, t_end=np.pi)(100),
+            Border(_circle(1.0), label=1, t_start=np.pi, t_end=2 * np.pi)(200),
+            Border(_circle(0.5), label=1, t_start=0, t_end=2 * np.pi)(-100)]
+
+
+def example_2():
+    """Polygon with a shared inner border of examples/example_2.py."""
+    n = 100
+    return [Border(lambda t: (0, -1 + t), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1.5 - 1.5 * t, -1), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1.5, -t), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1 + 0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5 + 0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5, -0.5 * t), label='inner', t_start=0, t_end=1)(n),
+            Border(lambda t: (0.5 + 0.5 * t, -0.5), label='inner', t_start=0, t_end=1)(n),
+            Border(lambda t: (1, -0.5 + 0.5 * t), label='inner', t_start=0, t_end=1)(n)]
+
+
+def _airfoil(t):
+    return 0.17735 * np.sqrt(t) - 0.075597 * t - 0.212836 * (t ** 2) + 0.17363 * (t ** 3) - 0.06254 * (t ** 4)
+
+
+def example_3():
+    """Airfoil inside a circle of examples/example_3.py."""
+    return [Border(_circle(0.8, (0.5, 0.0)), label='circle', t_start=0, t_end=2 * np.pi)(300),
+            Border(lambda t: (t, _airfoil(t)), label='upper', t_start=0, t_end=1)(305),
+            Border(lambda t: (t, -_airfoil(t)), label='lower', t_start=1, t_end=0)(305)]
+
+
+def example_4():
+    """Three overlapping circles of examples/example_4.py."""
+    return [Border(_circle(1.0, center), label=1, t_start=0, t_end=2.0 * np.pi)(100)
+            for center in ((0.0, 0.0), (-1.0, 0.0), (0.0, -1.0))]
+
+
+def example_5():
+    """Three concentric circles of examples/example_5.py."""
+    return [Border(_circle(radius), label=1, t_start=0, t_end=2.0 * np.pi)(100) for radius in (1.0, 0.8, 0.3)]
+
+
+def many_borders(n_borders=4000):
+    """
+    Disk whose outline is split into half of the borders, with a grid of small holes made of four arcs each.
+
+    Args:
+        n_borders (int, optional): Approximate number of borders. Defaults to 4000.
+    """
+    n_outline = n_borders // 2
+    edges = np.linspace(0.0, 2 * np.pi, n_outline + 1)
+    borders = [Border(_circle(10.0), label='outer', t_start=edges[i], t_end=edges[i + 1])(4)
+               for i in range(n_outline)]
+    side = max(1, int(np.sqrt((n_borders - n_outline) / 4)))
+    quarters = np.linspace(0.0, 2 * np.pi, 5)
+    for x in np.linspace(-6.0, 6.0, side):
+        for y in np.linspace(-6.0, 6.0, side):
+            borders += [Border(_circle(0.1, (x, y)), label='hole', t_start=quarters[i], t_end=quarters[i + 1])(-8)
+                        for i in range(4)]
+    return borders
+
+
+def overlapping_circles(n_circles=200, seed=0):
+    """
+    Randomly placed circles with many mutual overlaps.
+
+    Args:
+        n_circles (int, optional): Number of circles. Defaults to 200.
+        seed (int, optional): Seed of the centres and radii. Defaults to 0.
+    """
+    rng = np.random.default_rng(seed)
+    extent = np.sqrt(n_circles / 2.0)
+    centres = rng.uniform(0.0, extent, (n_circles, 2))
+    radii = rng.uniform(0.3, 1.0, n_circles)
+    return [Border(_circle(radius, tuple(centre)), label='circle', t_start=0, t_end=2 * np.pi)(64)
+            for centre, radius in zip(centres.tolist(), radii.tolist())]
+
+
+def thin_annulus(width=0.01, n_segments=2000):
+    """
+    Annulus of unit outer radius whose area is a small fraction of its bounding box.
+
+    Args:
+        width (float, optional): Distance between the two circles. Defaults to 0.01.
+        n_segments (int, optional): Number of segments of each circle. Defaults to 2000.
+    """
+    return [Border(_circle(1.0), label='outer', t_start=0, t_end=2 * np.pi)(n_segments),
+            Border(_circle(1.0 - width), label='inner', t_start=0, t_end=2 * np.pi)(-n_segments)]
+
+
+GEOMETRIES = {
+    'example_1': example_1,
+    'example_2': example_2,
+    'example_3': example_3,
+    'example_4': example_4,
+    'example_5': example_5,
+    'many_borders': many_borders,
+    'overlapping_circles': overlapping_circles,
+    'thin_annulus': thin_annulus,
+}
+
+
+def make_borders(name):
+    """
+    Builds the borders of a benchmark geometry.
+
+    Args:
+        name (str): Key of GEOMETRIES.
+
+    Returns:
+        list: Border objects with their number of segments set.
+    """
+    return GEOMETRIES[name]()
+
+
+def outer_polygons(borders, abs_tol=ABS_TOL):
+    """
+    Builds the outer polygons that `resolve_multiple_overlaps` receives in `RBFMesh.process_polygons`.
+
+    Args:
+        borders (list): Border objects with their number of segments set.
+        abs_tol (float, optional): Absolute tolerance. Defaults to ABS_TOL.
+
+    Returns:
+        list: The counter-clockwise polygons, with nested polygons excluded.
+    """
+    polygons = [Polygon(np.concatenate([border.generate_points() for border in polygon]))
+                for polygon in find_polygons(borders, abs_tol)]
+    return exclude_nested_polygons([polygon for polygon in polygons if polygon.exterior.is_ccw])
@@ -0,0 +1,234 @@
+"""
+Stand-alone runner of the benchmark suite, writing the timings and peak memory to JSON.
+
+Examples:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --geometries example_1 thin_annulus --sizes 1000 100000 --output quick.json
+    python -m benchmarks.run --compare baseline.json results.json
+
+Peak memory is measured in an extra, untimed run under `tracemalloc`. It covers the allocations made
+through Python and NumPy, not the memory GEOS allocates for shapely geometries.
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import shapely
+
+from RBFMeshGen import RBFMesh
+from RBFMeshGen.geometry_utils import find_polygons
+from RBFMeshGen.mesh_generation import resolve_multiple_overlaps
+
+from .bench_mesh import NUM_POINTS
+from .geometries import ABS_TOL, GEOMETRIES, make_borders, outer_polygons
+
+# Stages timed on every geometry. Each maps to a function returning the arguments of a run, built
+# outside the timed section, and the function timed on them.
+GEOMETRY_STAGES = {
+    'find_polygons': (lambda geometry: (make_borders(geometry), ABS_TOL, True), find_polygons),
+    'process_polygons': (lambda geometry: make_borders(geometry), lambda *borders: RBFMesh(*borders, abs_tol=ABS_TOL)),
+    'resolve_multiple_overlaps': (lambda geometry: (outer_polygons(make_borders(geometry)),),
+                                  resolve_multiple_overlaps),
+}
+
+STAGES = list(GEOMETRY_STAGES) + ['generate_points']
+
+
+def _git_revision():
+    """Returns the commit of the working tree and whether it has local changes, or (None, None)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.strip(), bool(status.strip())
+
+
+def environment():
+    """
+    Describes the machine and the library versions of a run.
+
+    Returns:
+        dict: Commit, timestamp, platform and versions.
+    """
+    commit, dirty = _git_revision()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'shapely': shapely.__version__,
+    }
+
+
+def measure(make_arguments, function, repeat=3, memory=True):
+    """
+    Times a function, building its arguments again before every run.
+
+    Args:
+        make_arguments (callable): Returns the tuple of arguments of one run. Not timed.
+        function (callable): The function to time.
+        repeat (int, optional): Number of timed runs. Defaults to 3.
+        memory (bool, optional): Whether to measure the peak memory in an extra run. Defaults to True.
+
+    Returns:
+        dict: The run times in seconds, their minimum and median, and the peak traced memory in bytes
+              (None when `memory` is False).
+    """
+    times = []
+    for _ in range(repeat):
+        arguments = make_arguments()
+        gc.collect()
+        start = time.perf_counter()
+        function(*arguments)
+        times.append(time.perf_counter() - start)
+        del arguments
+
+    peak_memory = None
+    if memory:
+        arguments = make_arguments()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(*arguments)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'times': times, 'best': min(times), 'median': float(np.median(times)), 'peak_memory': peak_memory}
+
+
+def _generate_points_arguments(geometry, num_points, method):
+    mesh = RBFMesh(*make_borders(geometry), abs_tol=ABS_TOL)
+    return mesh, num_points, method
+
+
+def _generate_points(mesh, num_points, method):
+    mesh.generate_points(num_points, method=method, seed=0)
+
+
+def run(geometries=None, stages=None, sizes=None, method='rejection', repeat=3, memory=True, log=print):
+    """
+    Runs the benchmarks.
+
+    Args:
+        geometries (list, optional): Keys of GEOMETRIES. Defaults to all of them.
+        stages (list, optional): Stages among STAGES. Defaults to all of them.
+        sizes (list, optional): Node counts of the 'generate_points' stage. Defaults to NUM_POINTS.
+        method (str, optional): Sampling method of `RBFMesh.generate_points`. Defaults to 'rejection'.
+        repeat (int, optional): Number of timed runs of each benchmark. Defaults to 3.
+        memory (bool, optional): Whether to measure peak memory. Defaults to True.
+        log (callable, optional): Receives one line per benchmark. Defaults to print.
+
+    Returns:
+        list: One dict per benchmark with its geometry, stage, num_points, method and measurements.
+    """
+    geometries = list(GEOMETRIES) if geometries is None else geometries
+    stages = STAGES if stages is None else stages
+    sizes = NUM_POINTS if sizes is None else sizes
+    results = []
+    for geometry in geometries:
+        for stage in stages:
+            if stage == 'generate_points':
+                cases = [(num_points, lambda n=num_points: _generate_points_arguments(geometry, n, method),
+                          _generate_points) for num_points in sizes]
+            else:
+                stage_arguments, function = GEOMETRY_STAGES[stage]
+                cases = [(None, lambda: stage_arguments(geometry), function)]
+            for num_points, make_arguments, function in cases:
+                result = {'geometry': geometry, 'stage': stage, 'num_points': num_points,
+                          'method': method if stage == 'generate_points' else None}
+                result.update(measure(make_arguments, function, repeat, memory))
+                results.append(result)
+                log(_format(result))
+    return results
+
+
+def _format(result):
+    name = f"{result['geometry']:<20} {result['stage']:<26}"
+    if result['num_points'] is not None:
+        name += f" n={result['num_points']:<9}"
+    else:
+        name += ' ' * 12
+    memory = '' if result['peak_memory'] is None else f"  peak {result['peak_memory'] / 2 ** 20:9.1f} MiB"
+    return f"{name} best {result['best']:10.4f} s  median {result['median']:10.4f} s{memory}"
+
+
+def _key(result):
+    return result['geometry'], result['stage'], result['num_points'], result['method']
+
+
+def compare(baseline, current, threshold=1.2, log=print):
+    """
+    Compares two result files benchmark by benchmark.
+
+    Args:
+        baseline (dict): Content of the reference result file.
+        current (dict): Content of the new result file.
+        threshold (float, optional): Ratio of the best times above which a benchmark counts as a
+                                     regression. Defaults to 1.2.
+        log (callable, optional): Receives one line per benchmark. Defaults to print.
+
+    Returns:
+        list: Keys (geometry, stage, num_points, method) of the regressions.
+    """
+    reference = {_key(result): result for result in baseline['results']}
+    regressions = []
+    log(f"baseline {baseline['environment']['commit']}  current {current['environment']['commit']}")
+    for result in current['results']:
+        old = reference.get(_key(result))
+        if old is None:
+            continue
+        ratio = result['best'] / old['best'] if old['best'] > 0 else float('inf')
+        line = f"{_format(result)}  x{ratio:5.2f} time"
+        if result['peak_memory'] and old['peak_memory']:
+            line += f"  x{result['peak_memory'] / old['peak_memory']:5.2f} memory"
+        if ratio > threshold:
+            regressions.append(_key(result))
+            line += '  REGRESSION'
+        log(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--geometries', nargs='+', choices=list(GEOMETRIES), help='Geometries to run (default: all)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, help='Stages to time (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, help=f'Node counts of generate_points (default: {NUM_POINTS})')
+    parser.add_argument('--method', default='rejection', choices=['rejection', 'triangulate', 'halton', 'sobol'],
+                        help='Sampling method of generate_points (default: rejection)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory measurement')
+    parser.add_argument('--output', help='JSON file receiving the results')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='Compare two result files instead of running the benchmarks')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Time ratio reported as a regression by --compare (default: 1.2)')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as handle:
+            baseline = json.load(handle)
+        with open(args.compare[1]) as handle:
+            current = json.load(handle)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    results = run(args.geometries, args.stages, args.sizes, args.method, args.repeat, not args.no_memory)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'environment': environment(), 'results': results}, handle, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,12 +9,15 @@ setup(
     long_description=open('README.md').read(),
     long_description_content_type="text/markdown",
     url="https://github.com/LDBreton/RBFMeshGen",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "tests", "tests.*"]),
     install_requires=[
         'numpy',        # For numerical operations
         'matplotlib',   # For any plotting capabilities
         'shapely'       # Shapely for geometrical operations
     ],
+    extras_require={
+        'sparse': ['scipy'],  # Sparse RBF-FD differentiation matrices
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
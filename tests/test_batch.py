@@ -0,0 +1,41 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from RBFMeshGen import Border
+from RBFMeshGen.batch import SUMMARY_FILE, generate_meshes
+
+
+def _disk(radius=1.0):
+    return [Border(lambda t: (radius * np.cos(t), radius * np.sin(t)), 'outer', 0, 2 * np.pi)(100)]
+
+
+def _broken():
+    raise RuntimeError('no borders')
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_failing_jobs_do_not_stop_the_others(tmp_path, workers):
+    specs = [{'borders': _disk(), 'num_points': 300, 'seed': 1},
+             {'borders': _broken, 'num_points': 300},
+             {'borders': _disk(2.0), 'num_points': 200, 'method': 'unknown'},
+             {'borders': lambda: _disk(0.5), 'num_points': 100, 'method': 'sobol', 'seed': 2}]
+    reported = []
+    results = generate_meshes(specs, directory=tmp_path, workers=workers, on_result=reported.append)
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert sorted(result.index for result in reported) == [0, 1, 2, 3]
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert 'RuntimeError: no borders' in results[1].error and 'no borders' in results[1].traceback
+    assert 'unknown' in results[2].error and results[2].directory is None
+    with pytest.raises(ValueError, match='Job 2 failed'):
+        results[2].load()
+    for result, count in zip((results[0], results[3]), (300, 100)):
+        points = result.load()
+        assert result.num_points == len(points) == count + 100
+        assert np.count_nonzero(~np.asarray(points.is_border)) == count
+    with open(os.path.join(tmp_path, SUMMARY_FILE)) as handle:
+        summary = json.load(handle)
+    assert [entry['error'] is None for entry in summary] == [True, False, False, True]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from shapely.ops import unary_union
+
+from RBFMeshGen import Border, RBFMesh
+
+
+def _arc(radius, t_start, t_end, center=(0.0, 0.0), bulge=0.0):
+    def parametric_function(t):
+        r = radius + bulge * np.sin(np.pi * (np.asarray(t) - t_start) / (t_end - t_start))
+        return center[0] + r * np.cos(t), center[1] + r * np.sin(t)
+    return parametric_function
+
+
+def _borders():
+    # A disk outline split into 16 arcs around a grid of holes made of four arcs each
+    edges = np.linspace(0.0, 2 * np.pi, 17)
+    borders = [Border(_arc(10.0, t0, t1), 'outer', t0, t1)(8) for t0, t1 in zip(edges[:-1], edges[1:])]
+    quarters = np.linspace(0.0, 2 * np.pi, 5)
+    for x in (-4.0, 0.0, 4.0):
+        for y in (-4.0, 0.0, 4.0):
+            borders += [Border(_arc(0.5, t0, t1, (x, y)), 'hole', t0, t1)(-8)
+                        for t0, t1 in zip(quarters[:-1], quarters[1:])]
+    return borders
+
+
+def _boundary(mesh):
+    labels = mesh.point_store.decoded_labels(mesh.labels[mesh.is_border])
+    return sorted(zip(map(tuple, mesh.xy[mesh.is_border].tolist()), labels))
+
+
+def _edits(borders):
+    hole = Border(_arc(1.0, 0.0, 2 * np.pi, (7.0, 0.0)), 'hole', 0.0, 2 * np.pi)(-32)
+    outline = borders[3]
+    moved = Border(_arc(10.0, outline.t_start, outline.t_end, bulge=0.5), 'outer', outline.t_start, outline.t_end)(8)
+    return {
+        'add hole': lambda mesh: mesh.add_border(hole),
+        'remove hole arc': lambda mesh: mesh.remove_border(borders[20]),
+        'move outline border': lambda mesh: mesh.update_border(outline, moved),
+        'hole across outline': lambda mesh: mesh.add_border(
+            Border(_arc(1.0, 0.0, 2 * np.pi, (10.0, 0.0)), 'hole', 0.0, 2 * np.pi)(-32)),
+    }
+
+
+@pytest.mark.parametrize('edit', list(_edits(_borders())))
+def test_edits_match_a_fresh_mesh(edit):
+    borders = _borders()
+    mesh = RBFMesh(*borders)
+    mesh.generate_points(2000, seed=1)
+    before = mesh.Points.xy.copy()
+    _edits(borders)[edit](mesh)
+    fresh = RBFMesh(*mesh.borders)
+
+    # Only the changed part of the geometry was processed again
+    assert 'update_regions' in mesh.stats and 'generate_regions' not in mesh.stats
+    assert len(mesh.region_polygons) == len(fresh.region_polygons)
+    assert unary_union(mesh.region_polygons).symmetric_difference(unary_union(fresh.region_polygons)).area < 1e-9
+    assert _boundary(mesh) == _boundary(fresh)
+    # The interior points far from every edit are kept as they were
+    far = np.hypot(before[:, 0] - 8.5, before[:, 1]) > 3.0
+    kept = set(map(tuple, mesh.Points.xy.tolist()))
+    assert all(point in kept for point in map(tuple, before[far].tolist()))
+
+
+def test_edits_after_a_cache_hit_process_all_the_borders_once():
+    borders = _borders()
+    RBFMesh(*borders, cache=True)
+    mesh = RBFMesh(*borders, cache=True)
+    hole = Border(_arc(1.0, 0.0, 2 * np.pi, (7.0, 0.0)), 'hole', 0.0, 2 * np.pi)(-32)
+    mesh.add_border(hole)
+    assert 'generate_regions' in mesh.stats
+    mesh.remove_border(hole)
+    assert 'update_regions' in mesh.stats
+    assert _boundary(mesh) == _boundary(RBFMesh(*borders))
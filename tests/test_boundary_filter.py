@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point
+
+from RBFMeshGen import Border, RBFMesh
+from RBFMeshGen import mesh_generation
+from RBFMeshGen.mesh_generation import boundary_point_mask
+
+
+def _circle(radius, center=(0.0, 0.0)):
+    def parametric_function(t):
+        return center[0] + radius * np.cos(t), center[1] + radius * np.sin(t)
+    return parametric_function
+
+
+def _annulus():
+    return [Border(_circle(1.0), label=1, t_start=0, t_end=np.pi)(100),
+            Border(_circle(1.0), label=1, t_start=np.pi, t_end=2 * np.pi)(200),
+            Border(_circle(0.5), label=1, t_start=0, t_end=2 * np.pi)(-100)]
+
+
+def _shared_border():
+    n = 100
+    return [Border(lambda t: (0, -1 + t), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1.5 - 1.5 * t, -1), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1.5, -t), label='upper', t_start=0, t_end=1)(-n),
+            Border(lambda t: (1 + 0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5 + 0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5 * t, 0), label='others', t_start=0, t_end=1)(-n),
+            Border(lambda t: (0.5, -0.5 * t), label='inner', t_start=0, t_end=1)(n),
+            Border(lambda t: (0.5 + 0.5 * t, -0.5), label='inner', t_start=0, t_end=1)(n),
+            Border(lambda t: (1, -0.5 + 0.5 * t), label='inner', t_start=0, t_end=1)(n)]
+
+
+def _overlapping_circles():
+    return [Border(_circle(1.0, center), label=1, t_start=0, t_end=2.0 * np.pi)(100)
+            for center in ((0.0, 0.0), (-1.0, 0.0), (0.0, -1.0))]
+
+
+def _point_loop_mask(boundary_line, points, abs_tol):
+    """The per-point filter that `boundary_point_mask` replaced."""
+    return np.array([boundary_line.distance(Point(x, y)) < abs_tol for x, y in points.tolist()], dtype=bool)
+
+
+@pytest.mark.parametrize('make_borders', [_annulus, _shared_border, _overlapping_circles])
+def test_boundary_points_match_point_loop(monkeypatch, make_borders):
+    batched = RBFMesh(*make_borders())
+    monkeypatch.setattr(mesh_generation, 'boundary_point_mask', _point_loop_mask)
+    looped = RBFMesh(*make_borders())
+
+    assert batched.stats['boundary_filter']['candidates'] == looped.stats['boundary_filter']['candidates']
+    assert len(batched.Boundary_Points) == len(looped.Boundary_Points)
+    np.testing.assert_array_equal(batched.Boundary_Points.xy, looped.Boundary_Points.xy)
+    np.testing.assert_array_equal(batched.Boundary_Points.labels, looped.Boundary_Points.labels)
+
+
+def test_boundary_point_mask_matches_point_loop_near_tolerance():
+    boundary_line = LineString([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)])
+    abs_tol = 1e-4
+    rng = np.random.default_rng(0)
+    points = np.column_stack((rng.uniform(-0.1, 1.1, 10_000), rng.uniform(-3 * abs_tol, 3 * abs_tol, 10_000)))
+
+    np.testing.assert_array_equal(boundary_point_mask(boundary_line, points, abs_tol),
+                                  _point_loop_mask(boundary_line, points, abs_tol))
+
+
+def test_boundary_point_mask_rejects_points_at_tolerance():
+    boundary_line = LineString([(0.0, 0.0), (1.0, 0.0)])
+    abs_tol = 0.25
+    # Exactly abs_tol away, just inside and just outside
+    points = np.array([[0.5, abs_tol], [0.5, np.nextafter(abs_tol, 0.0)], [0.5, np.nextafter(abs_tol, 1.0)]])
+
+    assert boundary_line.distance(Point(points[0])) == abs_tol
+    np.testing.assert_array_equal(boundary_point_mask(boundary_line, points, abs_tol), [False, True, False])
+    np.testing.assert_array_equal(boundary_point_mask(boundary_line, points, abs_tol),
+                                  _point_loop_mask(boundary_line, points, abs_tol))
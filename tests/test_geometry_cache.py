@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from RBFMeshGen import Border, GeometryCache, RBFMesh
+
+
+def _annulus(outer_label, inner_label):
+    def circle(radius):
+        return lambda t: (radius * np.cos(t), radius * np.sin(t))
+    return [Border(circle(1.0), outer_label, 0, 2 * np.pi)(100), Border(circle(0.5), inner_label, 0, 2 * np.pi)(-50)]
+
+
+@pytest.mark.parametrize('labels', [(np.int64(1), np.int64(2)), (('outer', 1), ('inner', 2))])
+def test_disk_entries_keep_their_labels(tmp_path, labels):
+    borders = _annulus(*labels)
+    mesh = RBFMesh(*borders, cache=GeometryCache(directory=tmp_path))
+    cache = GeometryCache(directory=tmp_path)
+    cached = RBFMesh(*borders, cache=cache)
+
+    assert cache.hits == 1
+    assert cached.label_table == mesh.label_table
+    np.testing.assert_array_equal(cached.labels, mesh.labels)
+
+
+def test_failed_disk_writes_are_skipped_with_a_warning(tmp_path):
+    cache = GeometryCache(directory=tmp_path / 'cache')
+    with pytest.warns(RuntimeWarning, match='was not written'):
+        RBFMesh(*_annulus(object(), 'inner'), cache=cache)
+    assert len(cache) == 1 and os.listdir(tmp_path / 'cache') == []
+
+    # The directory turned into a file: the entry stays in memory only
+    os.rmdir(tmp_path / 'cache')
+    (tmp_path / 'cache').write_text('')
+    with pytest.warns(RuntimeWarning, match='was not written'):
+        RBFMesh(*_annulus('outer', 'inner'), cache=cache)
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize('directory', [False, True])
+def test_cache_hits_return_the_same_regions(tmp_path, directory):
+    borders = _annulus('outer', 'inner') + [Border(lambda t: (3 + 0.5 * np.cos(t), 0.5 * np.sin(t)), 'side', 0,
+                                                   2 * np.pi)(60)]
+    mesh = RBFMesh(*borders, cache=GeometryCache(directory=tmp_path if directory else None))
+    cache = GeometryCache(directory=tmp_path) if directory else mesh.cache
+    cached = RBFMesh(*borders, cache=cache)
+
+    assert cache.hits == 1
+    assert len(cached.region_polygons) == len(mesh.region_polygons) == 2
+    assert all(a.equals_exact(b, 0.0) for a, b in zip(cached.region_polygons, mesh.region_polygons))
+    assert all(a.equals_exact(b, 0.0) for a, b in zip(cached.holes_polygons, mesh.holes_polygons))
+    np.testing.assert_array_equal(cached.xy, mesh.xy)
+    np.testing.assert_array_equal(cached.region_codes(), mesh.region_codes())
+    assert cached.label_table == mesh.label_table
+    # Points drawn in the cached regions are the same for the same seed
+    mesh.generate_points(500, seed=4)
+    cached.generate_points(500, seed=4)
+    np.testing.assert_array_equal(cached.Points.xy, mesh.Points.xy)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from RBFMeshGen.low_discrepancy import ScrambledHalton, ScrambledSobol
+
+
+@pytest.mark.parametrize('m', [4, 7, 10])
+def test_sobol_blocks_are_nets(m):
+    sequence = ScrambledSobol(np.random.default_rng(m))
+    for start in (0, 2 ** m, 5 * 2 ** m):
+        block = sequence.points(start, 2 ** m)
+        # Every elementary box of area 2**-m holds exactly one point of the block, so (t, m, 2)-net with t = 0
+        for a in range(m + 1):
+            boxes = np.floor(block[:, 0] * 2 ** a).astype(np.int64) * 2 ** (m - a) + \
+                np.floor(block[:, 1] * 2 ** (m - a)).astype(np.int64)
+            assert len(np.unique(boxes)) == 2 ** m, (start, a)
+
+
+@pytest.mark.parametrize('kind', [ScrambledSobol, ScrambledHalton])
+def test_sequences_continue_across_calls(kind):
+    sequence = kind(np.random.default_rng(1))
+    parts = [sequence.random(count) for count in (1, 6, 57, 200)]
+
+    assert sequence.index == 264
+    # Halton sums more digit levels over a longer range, which can move the last bit
+    points = np.concatenate(parts)
+    np.testing.assert_allclose(points, kind(np.random.default_rng(1)).points(0, 264), rtol=0, atol=1e-15)
+    assert np.all((points >= 0.0) & (points < 1.0))
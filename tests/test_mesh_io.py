@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from RBFMeshGen import Border, RBFMesh
+from RBFMeshGen.mesh_io import PointFileWriter, load_points, save_npz, save_points
+from RBFMeshGen.point_store import PointStore
+
+
+def _mesh():
+    def circle(radius):
+        return lambda t: (radius * np.cos(t), radius * np.sin(t))
+    return RBFMesh(Border(circle(1.0), 'outer', 0, 2 * np.pi)(100), Border(circle(0.5), ('hole', 1), 0, 2 * np.pi)(-50))
+
+
+def _assert_same_points(points, store):
+    np.testing.assert_array_equal(points.xy, store.xy)
+    np.testing.assert_array_equal(points.labels, store.labels)
+    np.testing.assert_array_equal(points.is_border, store.is_border)
+    assert points.label_table == store.label_table
+
+
+def _store(label_table):
+    xy = np.random.default_rng(0).random((2 * len(label_table), 2))
+    codes = np.tile(np.arange(len(label_table)), 2)
+    return PointStore.from_arrays(xy, codes, codes % 2 == 0, label_table)
+
+
+@pytest.mark.parametrize('name', ['points.npz', 'points'])
+def test_labels_keep_their_types(tmp_path, name):
+    store = _store([np.int64(3), ('a', 1), (np.float32(0.5), ('b', None)), 'region 1', True])
+    save_points(tmp_path / name, store)
+    loaded = load_points(str(tmp_path / name))
+
+    assert loaded.label_table == [3, ('a', 1), (0.5, ('b', None)), 'region 1', True]
+    assert [type(label) for label in loaded.label_table] == [int, tuple, tuple, str, bool]
+    copy = loaded if isinstance(loaded, PointStore) else loaded.to_store()
+    assert copy.label_code(('a', 1)) == 1
+    assert copy.decoded_labels() == store.decoded_labels()
+
+
+def test_unsupported_labels_are_rejected(tmp_path):
+    with pytest.raises(TypeError, match='cannot be saved'):
+        save_npz(tmp_path / 'points.npz', _store([object()]))
+
+
+def test_append_extending_the_label_table(tmp_path):
+    xy = np.zeros((1, 2))
+    with PointFileWriter(tmp_path, label_table=['a', 'b']) as writer:
+        writer.append(xy, 1, False)
+    with PointFileWriter(tmp_path, label_table=['a', 'b', 'c'], append=True) as writer:
+        writer.append(xy, 2, False)
+
+    points = load_points(str(tmp_path))
+    assert points.label_table == ['a', 'b', 'c']
+    assert points.decoded_labels() == ['b', 'c']
+
+
+def test_append_merges_other_label_tables(tmp_path):
+    xy = np.zeros((3, 2))
+    with PointFileWriter(tmp_path, label_table=['a', 'b']) as writer:
+        writer.append(xy, [0, 1, 0], False)
+    label_table = ['c', 'a']
+    with PointFileWriter(tmp_path, label_table=label_table, append=True) as writer:
+        writer.append(xy, [0, 1, 0], False)
+        # Labels registered while streaming are merged too
+        label_table.append('b')
+        writer.append(xy[:1], 2, True)
+        with pytest.raises(ValueError, match='Label codes'):
+            writer.append(xy[:1], 3, True)
+
+    points = load_points(str(tmp_path))
+    assert points.label_table == ['a', 'b', 'c']
+    assert points.decoded_labels() == ['a', 'b', 'a', 'c', 'a', 'c', 'b']
+
+
+@pytest.mark.parametrize('name', ['points.npz', 'points'])
+def test_mesh_points_round_trip(tmp_path, name):
+    mesh = _mesh()
+    mesh.generate_points(500, seed=1)
+    mesh.save(str(tmp_path / name))
+    loaded = _mesh().load(str(tmp_path / name))
+
+    _assert_same_points(loaded.point_store, mesh.point_store)
+    _assert_same_points(load_points(str(tmp_path / name)), mesh.point_store)
+
+
+def test_streamed_points_round_trip_with_append(tmp_path):
+    mesh = _mesh()
+    assert mesh.save_streaming(str(tmp_path), 400, seed=2) == 550
+    assert mesh.save_streaming(str(tmp_path), 300, append=True, seed=3) == 850
+
+    # The same points as generating both batches in the mesh
+    expected = _mesh()
+    expected.generate_points(400, seed=2)
+    expected.generate_points(300, seed=3)
+    _assert_same_points(load_points(str(tmp_path)), expected.point_store)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from shapely.geometry import Point
+from shapely.ops import unary_union
+
+from RBFMeshGen.mesh_generation import SLIVER_AREA, exclude_nested_polygons, polygonal_part, resolve_multiple_overlaps
+
+
+def _all_pairs_overlaps(polygons):
+    """The all-pairs overlap resolution that `resolve_multiple_overlaps` replaced."""
+    unique_areas = []
+    intersections = []
+    for i, polygon in enumerate(polygons):
+        others = [p for j, p in enumerate(polygons) if j != i]
+        if others:
+            union_of_others = unary_union(others)
+            intersections_union = unary_union(intersections) if intersections else None
+            new_intersection = polygon.intersection(union_of_others)
+            if intersections_union:
+                new_intersection = new_intersection.difference(intersections_union)
+            unique_area = polygon.difference(union_of_others)
+            if not new_intersection.is_empty:
+                intersections.append(new_intersection)
+            if not unique_area.is_empty:
+                unique_areas.append(unique_area)
+        else:
+            unique_areas.append(polygon)
+    return unique_areas + intersections
+
+
+def _positive_regions(polygons, pieces):
+    """Drops the pieces of `_all_pairs_overlaps` that `resolve_multiple_overlaps` leaves out as slivers."""
+    # Every piece belongs to its polygon, whose area sets the sliver threshold
+    min_area = SLIVER_AREA * min(polygon.area for polygon in polygons)
+    return [piece for piece in (polygonal_part(piece, min_area) for piece in pieces) if piece is not None]
+
+
+def _circles(n, seed):
+    rng = np.random.default_rng(seed)
+    extent = np.sqrt(n / 2.0)
+    polygons = [Point(centre).buffer(radius, quad_segs=16)
+                for centre, radius in zip(rng.uniform(0.0, extent, (n, 2)), rng.uniform(0.3, 1.0, n))]
+    return exclude_nested_polygons(polygons)
+
+
+@pytest.mark.parametrize('n, seed', [(3, 0), (20, 0), (20, 1), (20, 2), (60, 3)])
+def test_regions_match_all_pairs_resolution(n, seed):
+    polygons = _circles(n, seed)
+    expected = _positive_regions(polygons, _all_pairs_overlaps(polygons))
+    regions = resolve_multiple_overlaps(polygons)
+
+    assert len(regions) == len(expected)
+    for region, reference in zip(regions, expected):
+        assert region.area == pytest.approx(reference.area, rel=1e-9, abs=1e-12)
+        assert region.symmetric_difference(reference).area < 1e-9
+
+
+def test_regions_are_polygons_with_area():
+    polygons = _circles(60, 3)
+    regions = resolve_multiple_overlaps(polygons)
+
+    assert all(region.geom_type in ('Polygon', 'MultiPolygon') for region in regions)
+    assert min(region.area for region in regions) > SLIVER_AREA * max(p.area for p in polygons)
+    assert sum(region.area for region in regions) == pytest.approx(unary_union(polygons).area)
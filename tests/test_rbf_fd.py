@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from RBFMeshGen.rbf_fd import OPERATORS, monomial_exponents, rbf_fd_weights
+
+
+def _power(x, n):
+    """x**n, with 0 for the negative exponents left by differentiating a constant."""
+    return np.where(n >= 0, x ** np.maximum(n, 0), 0.0)
+
+
+def _exact(operator, a, b, x, y):
+    """Operator applied to the monomial x**a * y**b."""
+    if operator == 'interpolate':
+        return _power(x, a) * _power(y, b)
+    if operator == 'dx':
+        return a * _power(x, a - 1) * _power(y, b)
+    if operator == 'dy':
+        return b * _power(x, a) * _power(y, b - 1)
+    return a * (a - 1) * _power(x, a - 2) * _power(y, b) + b * (b - 1) * _power(x, a) * _power(y, b - 2)
+
+
+def _stencils(points, k):
+    """k-nearest-neighbour stencils by comparing every node with every other."""
+    squared = ((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    return np.argsort(squared, axis=1, kind='stable')[:, :k]
+
+
+@pytest.mark.parametrize('poly_degree', [1, 2, 3])
+@pytest.mark.parametrize('off_nodes', [False, True])
+def test_weights_are_exact_on_polynomials(poly_degree, off_nodes):
+    rng = np.random.default_rng(0)
+    # Away from the origin, so that the shift to the stencil centre matters
+    points = np.array([3.0, -2.0]) + rng.random((300, 2)) * 0.1
+    stencils = _stencils(points, 2 * len(monomial_exponents(poly_degree)) + 1)
+    operators = [operator for operator, order in OPERATORS.items() if order <= poly_degree]
+    centres = points[stencils[:, 0]] + (rng.random((len(points), 2)) - 0.5) * 0.005 if off_nodes else None
+    weights = rbf_fd_weights(points, stencils, operators, centres=centres, poly_degree=poly_degree, chunk_size=64)
+
+    cx, cy = (points[stencils[:, 0]] if centres is None else centres).T
+    for operator in operators:
+        for a, b in monomial_exponents(poly_degree):
+            values = _exact('interpolate', a, b, points[:, 0], points[:, 1])
+            expected = _exact(operator, a, b, cx, cy)
+            approximated = (weights[operator] * values[stencils]).sum(axis=1)
+            # Derivatives of order p scale as 1 / h**p over stencils of width h ~ 0.01
+            scale = 1e-8 * np.abs(values).max() * 100.0 ** OPERATORS[operator]
+            np.testing.assert_allclose(approximated, expected, rtol=0, atol=scale, err_msg=f'{operator} x^{a} y^{b}')
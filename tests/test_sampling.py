@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from RBFMeshGen import Border, RBFMesh
+
+
+def _circle(radius, center=(0.0, 0.0)):
+    return lambda t: (center[0] + radius * np.cos(t), center[1] + radius * np.sin(t))
+
+
+def _disk():
+    return [Border(_circle(1.0), 'outer', 0, 2 * np.pi)(200)]
+
+
+def _two_regions():
+    # A disk with a hole, next to a smaller disk
+    return [Border(_circle(1.0), 'outer', 0, 2 * np.pi)(200), Border(_circle(0.4), 'hole', 0, 2 * np.pi)(-80),
+            Border(_circle(0.5, (3.0, 0.0)), 'side', 0, 2 * np.pi)(100)]
+
+
+def _min_distance(points, others=None):
+    """Smallest distance between two points of `points`, or between `points` and `others`."""
+    squared = ((points[:, None, :] - (points if others is None else others)[None, :, :]) ** 2).sum(axis=2)
+    if others is None:
+        np.fill_diagonal(squared, np.inf)
+    return np.sqrt(squared.min())
+
+
+@pytest.mark.parametrize('spacing', [0.05, 0.11])
+def test_poisson_points_keep_the_spacing(spacing):
+    mesh = RBFMesh(*_two_regions())
+    border = mesh.xy.copy()
+    mesh.generate_points(method='poisson', spacing=spacing, seed=2)
+    interior = mesh.Points.xy
+
+    # The darts fill the regions: no probe inside them is far from every node
+    probes = np.random.default_rng(0).random((4000, 2)) * [2.0, 2.0] - 1.0
+    radius = np.hypot(probes[:, 0], probes[:, 1])
+    probes = probes[(radius > 0.4) & (radius < 1.0)]
+    nearest = np.sqrt(((probes[:, None, :] - mesh.xy[None, :, :]) ** 2).sum(axis=2).min(axis=1))
+    assert nearest.max() < 2 * spacing
+    assert _min_distance(interior) >= spacing * (1 - 1e-12)
+    assert _min_distance(interior, border) >= spacing * (1 - 1e-12)
+    # A second call keeps away from the points of the first
+    mesh.generate_points(method='poisson', spacing=spacing, seed=3)
+    assert _min_distance(mesh.Points.xy) >= spacing * (1 - 1e-12)
+
+
+@pytest.mark.parametrize('method, chunk_size', [('rejection', None), ('triangulate', None), ('sobol', 37),
+                                                ('halton', 1000)])
+def test_iter_points_blocks_concatenate_to_generate_points(method, chunk_size):
+    borders = _two_regions()
+    streamed = RBFMesh(*borders)
+    options = {} if chunk_size is None else {'chunk_size': chunk_size}
+    blocks = list(streamed.iter_points(3000, method=method, seed=5, **options))
+    generated = RBFMesh(*borders)
+    generated.generate_points(3000, method=method, seed=5)
+
+    assert chunk_size is None or max(len(xy) for xy, _ in blocks) <= chunk_size
+    np.testing.assert_array_equal(np.concatenate([xy for xy, _ in blocks]), generated.Points.xy)
+    np.testing.assert_array_equal(np.concatenate([codes for _, codes in blocks]),
+                                  generated.labels[~generated.is_border])
+    # iter_points leaves the mesh as it was
+    assert len(streamed.point_store) == len(streamed.xy[streamed.is_border])
+
+
+@pytest.mark.parametrize('method', ['sobol', 'halton'])
+def test_sequence_points_continue_across_calls(method):
+    split = RBFMesh(*_disk())
+    split.generate_points(500, method=method, seed=7)
+    split.generate_points(300, method=method, seed=8)
+    whole = RBFMesh(*_disk())
+    whole.generate_points(800, method=method, seed=7)
+
+    np.testing.assert_array_equal(split.Points.xy, whole.Points.xy)
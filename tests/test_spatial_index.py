@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from RBFMeshGen.spatial_index import GridIndex
+
+
+def _brute_nearest(points, queries=None):
+    """Nearest distances by comparing every query with every point."""
+    self_query = queries is None
+    queries = points if self_query else queries
+    squared = ((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    if self_query:
+        np.fill_diagonal(squared, np.inf)
+    return np.sqrt(squared.min(axis=1))
+
+
+def _clustered(rng):
+    # A dense cluster in a 1e-3 box among sparse points over a 10 x 10 square
+    return np.concatenate((5 + rng.random((3000, 2)) * 1e-3, rng.random((300, 2)) * 10))
+
+
+POINT_SETS = [
+    lambda rng: rng.random((2000, 2)),
+    _clustered,
+    lambda rng: np.concatenate((np.zeros((200, 2)), rng.random((200, 2)))),
+    lambda rng: np.column_stack((rng.random(500), np.zeros(500))),
+]
+
+
+@pytest.mark.parametrize('make_points', POINT_SETS)
+def test_nearest_distance_matches_brute_force(make_points):
+    rng = np.random.default_rng(0)
+    points = make_points(rng)
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    queries = lower + (rng.random((500, 2)) * 1.5 - 0.25) * (upper - lower)
+    index = GridIndex(points)
+
+    np.testing.assert_array_equal(index.nearest_distance(chunk_size=777), _brute_nearest(points))
+    np.testing.assert_array_equal(index.nearest_distance(queries, chunk_size=77), _brute_nearest(points, queries))
+
+
+def test_nearest_distance_of_single_and_empty_sets():
+    assert GridIndex(np.zeros((1, 2))).nearest_distance().tolist() == [np.inf]
+    assert GridIndex(np.empty((0, 2))).nearest_distance(np.zeros((2, 2))).tolist() == [np.inf, np.inf]
+
+
+@pytest.mark.parametrize('k', [1, 7, 30])
+@pytest.mark.parametrize('make_points', POINT_SETS)
+def test_knn_matches_brute_force(make_points, k):
+    rng = np.random.default_rng(1)
+    points = make_points(rng)
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    queries = np.concatenate((points[rng.integers(0, len(points), 300)],
+                              lower + (rng.random((300, 2)) * 1.5 - 0.25) * (upper - lower)))
+    indices, distances = GridIndex(points).knn(queries, k, chunk_size=97)
+
+    squared = ((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    expected = np.sqrt(np.sort(squared, axis=1)[:, :k])
+    np.testing.assert_array_equal(distances, expected)
+    # The indices point at the reported distances, each neighbour once per query
+    np.testing.assert_array_equal(np.sqrt(np.take_along_axis(squared, indices.astype(np.int64), axis=1)), expected)
+    assert all(len(set(row)) == k for row in indices.tolist())